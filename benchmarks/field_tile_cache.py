@@ -0,0 +1,172 @@
+"""
+Compare the field tile cache with evaluating every lattice point directly.
+
+For each scene, a view is evaluated cold (with an empty cache), warm (the same view again), panned
+by a fifth of its width, and after editing a single charge, and each is timed against evaluating
+the same lattice points directly with ``GraphWindow.electric_field_grid``. Exits with a non-zero
+status if a warm view or a single-charge edit is not faster than direct evaluation, or if a cold
+view takes more than ``COLD_OVERHEAD`` times as long.
+
+Usage: python benchmarks/field_tile_cache.py
+"""
+
+import os
+import sys
+import time
+from typing import Callable, List, Tuple
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+# pylint: disable=import-error,wrong-import-position
+from equations.base_charge import ChargeSnapshot
+from equations.constants import Point2D
+from equations.field_tile_cache import FieldTileCache
+from equations.graph_window import GraphWindow
+from equations.point_charge import PointCharge
+
+# pylint: enable=import-error,wrong-import-position
+
+SCENES = ((500, 100), (2000, 100), (1000, 200))
+"""
+The number of point charges and the resolution (lattice points along each axis) of each scene.
+"""
+
+REPEATS = 5
+"""
+The number of times each measurement is repeated, keeping the fastest.
+"""
+
+COLD_OVERHEAD = 1.5
+"""
+The most a cold view may take, relative to evaluating its lattice points directly.
+"""
+
+VIEW = (-10.0, 10.0)
+"""
+The x and y range of the view.
+"""
+
+
+def fastest(function: Callable[[], object], setup: Callable[[], object] = lambda: None) -> float:
+    """
+    Time a function, keeping the fastest of ``REPEATS`` runs.
+
+    Args:
+        function (Callable[[], object]): The function to time.
+        setup (Callable[[], object]): Called, untimed, before each run. Defaults to doing nothing.
+
+    Returns:
+        float: The fastest run, in seconds.
+    """
+
+    best = float("inf")
+    for _ in range(REPEATS):
+        setup()
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+
+def scene(charges: int) -> Tuple[ChargeSnapshot, ...]:
+    """
+    A reproducible scene of random point charges within the view.
+
+    Args:
+        charges (int): The number of point charges.
+
+    Returns:
+        Tuple[ChargeSnapshot, ...]: The charges.
+    """
+
+    rng = np.random.default_rng(charges)
+
+    return tuple(
+        PointCharge(Point2D(*rng.uniform(*VIEW, 2)), float(rng.uniform(-5.0, 5.0))).snapshot()
+        for _ in range(charges))
+
+
+def benchmark(charges: int, resolution: int) -> List[Tuple[str, float, float]]:
+    """
+    Time every kind of view of a scene, cached and direct.
+
+    Args:
+        charges (int): The number of point charges.
+        resolution (int): The number of lattice points along each axis.
+
+    Returns:
+        List[Tuple[str, float, float]]: The name of each kind of view, and the seconds it took
+        cached and direct.
+    """
+
+    snapshot = scene(charges)
+    graph_window = GraphWindow()
+    graph_window.charges_updated = lambda: None
+    graph_window.load_snapshot(snapshot)
+
+    level = FieldTileCache.lattice_level(VIEW[1] - VIEW[0], resolution)
+    shift = (VIEW[1] - VIEW[0]) / 5
+    panned = (VIEW[0] + shift, VIEW[1] + shift)
+
+    def direct(x_range: Tuple[float, float]) -> Callable[[], object]:
+        field = FieldTileCache(memory_cap=0).electric_field(graph_window, x_range, VIEW, level,
+                                                            level)
+        xs, ys = np.meshgrid(field.xs, field.ys, indexing="ij")
+        return lambda: graph_window.electric_field_grid(xs, ys)
+
+    def view(cache: FieldTileCache, x_range: Tuple[float, float]) -> Callable[[], object]:
+        return lambda: cache.electric_field(graph_window, x_range, VIEW, level, level)
+
+    results = []
+
+    cache = FieldTileCache()
+    results.append(("cold", fastest(view(cache, VIEW), cache.clear), fastest(direct(VIEW))))
+    results.append(("warm", fastest(view(cache, VIEW)), fastest(direct(VIEW))))
+
+    def unpan() -> None:
+        cache.clear()
+        cache.electric_field(graph_window, VIEW, VIEW, level, level)
+
+    results.append(("pan", fastest(view(cache, panned), unpan), fastest(direct(panned))))
+
+    # Alternate between two versions of the first charge, so that every run edits one charge.
+    edited = (PointCharge(Point2D(0.5, 0.5), 1.0).snapshot(),) + snapshot[1:]
+    versions = [snapshot, edited]
+    cache.electric_field(graph_window, VIEW, VIEW, level, level)
+
+    def edit() -> None:
+        versions.reverse()
+        graph_window.load_snapshot(versions[0])
+
+    results.append(("edit", fastest(view(cache, VIEW), edit), fastest(direct(VIEW))))
+
+    return results
+
+
+def main() -> None:
+    """
+    Run every benchmark, printing the timings.
+    """
+
+    slower = []
+
+    print(f"{'charges':>8} {'resolution':>10} {'view':>5} {'cached':>9} {'direct':>9} "
+          f"{'speedup':>8}")
+    for charges, resolution in SCENES:
+        for name, cached, direct in benchmark(charges, resolution):
+            print(f"{charges:>8} {resolution:>10} {name:>5} {cached:>8.4f}s {direct:>8.4f}s "
+                  f"{direct / cached:>7.1f}x")
+
+            if (name in ("warm", "edit") and cached >= direct
+                    or name == "cold" and cached > COLD_OVERHEAD * direct):
+                slower.append(f"{name} view of {charges} charges at resolution {resolution}")
+
+    if slower:
+        sys.exit("Too slow compared to direct evaluation: " + ", ".join(slower))
+
+
+if __name__ == "__main__":
+    main()
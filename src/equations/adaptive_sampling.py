@@ -0,0 +1,293 @@
+"""
+Adaptive sampling of the electric field, concentrating sample points where the field varies.
+"""
+
+import heapq
+import math
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+# pylint: disable=import-error
+from equations.graph_window import GraphWindow
+
+# pylint: enable=import-error
+
+AdaptiveField = NamedTuple("AdaptiveField", [("xs", np.ndarray), ("ys", np.ndarray),
+                                             ("e_x", np.ndarray), ("e_y", np.ndarray),
+                                             ("error", float)])
+"""
+The center of every leaf cell, the electric field components at each center, and the largest
+estimated relative error of the field.
+"""
+
+_Cell = Tuple[int, int, int]
+"""
+A square cell of the quadtree, as the integer coordinates of its lower left corner and its size.
+"""
+
+
+class AdaptiveSampler:
+    """
+    Samples the electric field on a quadtree, subdividing the cells where the field changes most.
+
+    The range is split into a few root cells, and the field is evaluated at each cell's corners and
+    center. A cell whose field direction or log-magnitude varies by more than the tolerances is
+    split in four, most varying cells first, until no cell varies too much or the point budget is
+    spent. Points are shared between neighboring cells, and the points of many cells are evaluated
+    together.
+    """
+
+    ANGLE_TOLERANCE = 0.3
+    """
+    The largest change in field direction, in radians, across a cell before it is split.
+    """
+
+    LOG_MAGNITUDE_TOLERANCE = 0.5
+    """
+    The largest change in the natural logarithm of the field magnitude across a cell before it is
+    split.
+    """
+
+    ROOT_CELLS = 4
+    """
+    The number of root cells along the shorter side of the range, unless the point budget only
+    allows fewer.
+    """
+
+    ROOT_POINTS_PER_CELL = 5
+    """
+    The number of points evaluated for each root cell, at most: its four corners and its center.
+    The root cells of a range are limited so that they fit in the point budget.
+    """
+
+    MAX_DEPTH = 8
+    """
+    The most times a root cell can be split.
+    """
+
+    def __init__(self,
+                 graph_window: GraphWindow,
+                 x_range: Tuple[float, float],
+                 y_range: Tuple[float, float],
+                 point_budget: int,
+                 min_cell_size: Tuple[float, float] = (0.0, 0.0)) -> None:
+        """
+        Initialize the sampler over a range.
+
+        Args:
+            graph_window (GraphWindow): The charges to evaluate.
+            x_range (Tuple[float, float]): The minimum and maximum x position.
+            y_range (Tuple[float, float]): The minimum and maximum y position.
+            point_budget (int): The largest number of points to evaluate the field at.
+            min_cell_size (Tuple[float, float]): The smallest width and height of a cell. Defaults
+                to no limit besides ``MAX_DEPTH``.
+        """
+
+        self._graph_window = graph_window
+        self._point_budget = point_budget
+        self._min_cell_size = min_cell_size
+
+        self._x_min, self._y_min = min(x_range), min(y_range)
+        x_span = max(max(x_range) - self._x_min, np.finfo(float).tiny)
+        y_span = max(max(y_range) - self._y_min, np.finfo(float).tiny)
+
+        # Root cells are roughly square, in data coordinates, unless the range is too long and
+        # narrow for that to fit in the budget, in which case they are stretched along it. The
+        # aspect ratio is infinite for a range with no height (or width), and undefined (NaN) for
+        # an infinite range, whose root cells are left square in cell counts.
+        max_cells = max(1, point_budget // AdaptiveSampler.ROOT_POINTS_PER_CELL)
+        short = max(1, min(AdaptiveSampler.ROOT_CELLS, math.isqrt(max_cells)))
+        aspect = max(x_span, y_span) / min(x_span, y_span)
+        long = short
+        if aspect >= 1.0:
+            long = max(short, round(short * min(aspect, max_cells // short / short)))
+        self._x_cells, self._y_cells = (long, short) if x_span >= y_span else (short, long)
+
+        # Cells are addressed in integer units of the smallest possible cell's half-width.
+        self._root_size = 2**(AdaptiveSampler.MAX_DEPTH + 1)
+        self._x_unit = x_span / (self._x_cells * self._root_size)
+        self._y_unit = y_span / (self._y_cells * self._root_size)
+
+        self._fields: Dict[Tuple[int, int], Tuple[float, float]] = {}
+        self._error = 0.0
+
+    def sample(self, cancelled: Optional[Callable[[], bool]] = None) -> Optional[AdaptiveField]:
+        """
+        Sample the field, refining the quadtree until it is fine enough or the budget is spent.
+
+        Args:
+            cancelled (Optional[Callable[[], bool]]): Checked between batches of cells; once it
+                returns True, sampling stops. Defaults to never cancelling.
+
+        Returns:
+            Optional[AdaptiveField]: The field at the center of every leaf cell, or None if
+            sampling was cancelled.
+        """
+
+        size = self._root_size
+        roots = [(i * size, j * size, size)
+                 for i in range(self._x_cells)
+                 for j in range(self._y_cells)]
+        self._evaluate(roots)
+
+        # Max-heap of leaf cells by variation, with a counter to break ties.
+        leaves: List[Tuple[float, int, _Cell]] = [
+            (-self._variation(cell) if self._splittable(cell) else 0.0, index, cell)
+            for index, cell in enumerate(roots)
+        ]
+        heapq.heapify(leaves)
+        counter = len(leaves)
+
+        while leaves and -leaves[0][0] > 1.0:
+            if cancelled is not None and cancelled():
+                return None
+
+            # Split the most varying cells, adding at most 8 new points each, and evaluate all of
+            # their new points together. Each batch spends at most a quarter of the remaining
+            # budget, so that the children of this batch can compete with the cells left over.
+            remaining = self._point_budget - len(self._fields)
+            batch: List[_Cell] = []
+            while (leaves and -leaves[0][0] > 1.0 and 8 * (len(batch) + 1) <= remaining
+                   and len(batch) < max(1, remaining // 32)):
+                batch.append(heapq.heappop(leaves)[2])
+
+            if not batch:
+                break
+
+            children = [child for cell in batch for child in AdaptiveSampler._split(cell)]
+            self._evaluate(children)
+
+            for child in children:
+                # Cells that are too small to split are never considered again.
+                variation = self._variation(child) if self._splittable(child) else 0.0
+                heapq.heappush(leaves, (-variation, counter, child))
+                counter += 1
+
+        return self._leaf_field([cell for _, _, cell in leaves])
+
+    @staticmethod
+    def _split(cell: _Cell) -> List[_Cell]:
+        """
+        Split a cell into its four children.
+
+        Args:
+            cell (_Cell): The cell to split.
+
+        Returns:
+            List[_Cell]: The four children.
+        """
+
+        x_pos, y_pos, size = cell
+        half = size // 2
+
+        return [(x_pos, y_pos, half), (x_pos + half, y_pos, half), (x_pos, y_pos + half, half),
+                (x_pos + half, y_pos + half, half)]
+
+    def _splittable(self, cell: _Cell) -> bool:
+        """
+        Whether a cell is large enough to be split.
+
+        Args:
+            cell (_Cell): The cell to check.
+
+        Returns:
+            bool: True if the cell's children would be no smaller than the smallest cell size.
+        """
+
+        half = cell[2] // 2
+
+        return (half >= 2 and half * self._x_unit >= self._min_cell_size[0]
+                and half * self._y_unit >= self._min_cell_size[1])
+
+    @staticmethod
+    def _points(cell: _Cell) -> List[Tuple[int, int]]:
+        """
+        The points of a cell that the field is sampled at: its four corners and its center.
+
+        Args:
+            cell (_Cell): The cell.
+
+        Returns:
+            List[Tuple[int, int]]: The corners, followed by the center.
+        """
+
+        x_pos, y_pos, size = cell
+        half = size // 2
+
+        return [(x_pos, y_pos), (x_pos + size, y_pos), (x_pos, y_pos + size),
+                (x_pos + size, y_pos + size), (x_pos + half, y_pos + half)]
+
+    def _evaluate(self, cells: List[_Cell]) -> None:
+        """
+        Evaluate the field at every point of some cells that has not been evaluated yet.
+
+        Args:
+            cells (List[_Cell]): The cells to evaluate.
+        """
+
+        new_points = list({
+            point: None
+            for cell in cells
+            for point in AdaptiveSampler._points(cell)
+            if point not in self._fields
+        })
+
+        if not new_points:
+            return
+
+        indices = np.array(new_points, dtype=float)
+        e_x, e_y = self._graph_window.electric_field_grid(
+            self._x_min + indices[:, 0] * self._x_unit, self._y_min + indices[:, 1] * self._y_unit)
+        self._error = max(self._error, self._graph_window.multipole_error)
+
+        self._fields.update(zip(new_points, zip(e_x.tolist(), e_y.tolist())))
+
+    def _variation(self, cell: _Cell) -> float:
+        """
+        How much the field varies across a cell, relative to the tolerances.
+
+        Args:
+            cell (_Cell): The cell.
+
+        Returns:
+            float: The largest of the direction and log-magnitude changes, each divided by its
+            tolerance. The cell should be split if this is greater than 1.
+        """
+
+        fields = np.array([self._fields[point] for point in AdaptiveSampler._points(cell)])
+        magnitudes = np.hypot(fields[:, 0], fields[:, 1])
+
+        if not magnitudes.all():
+            # The field vanishes at a sample point, such as on top of a charge.
+            return np.inf if magnitudes.any() else 0.0
+
+        log_magnitudes = np.log(magnitudes)
+        directions = fields / magnitudes[:, None]
+
+        # Angle between the center's direction and each corner's direction
+        cosines = np.clip(directions[:4] @ directions[4], -1.0, 1.0)
+        angle = float(np.arccos(cosines.min()))
+
+        return max(angle / AdaptiveSampler.ANGLE_TOLERANCE,
+                   float(log_magnitudes.max() - log_magnitudes.min())
+                   / AdaptiveSampler.LOG_MAGNITUDE_TOLERANCE)
+
+    def _leaf_field(self, cells: List[_Cell]) -> AdaptiveField:
+        """
+        Collect the field at the center of each leaf cell.
+
+        Args:
+            cells (List[_Cell]): The leaf cells.
+
+        Returns:
+            AdaptiveField: The field at the center of each cell.
+        """
+
+        centers = [AdaptiveSampler._points(cell)[4] for cell in cells]
+        indices = np.array(centers, dtype=float).reshape(-1, 2)
+        fields = np.array([self._fields[center] for center in centers]).reshape(-1, 2)
+
+        return AdaptiveField(self._x_min + indices[:, 0] * self._x_unit,
+                             self._y_min + indices[:, 1] * self._y_unit, fields[:, 0],
+                             fields[:, 1], self._error)
@@ -3,12 +3,142 @@ An abstract charge, from which subclasses overload.
 """
 
 import abc
-from typing import Callable
+import functools
+from typing import Any, Callable, Dict, NamedTuple, Tuple, Type, TypeVar
 
+import numpy as np
 from PyQt6 import QtCore
 from sympy import Basic
 
-from equations.constants import Point2D  # pylint: disable=import-error
+# pylint: disable=import-error
+from equations.constants import Point2D
+from equations.sympy_helper import bounded_simplify
+
+# pylint: enable=import-error
+
+FieldEquations = NamedTuple("FieldEquations", [("mag", Basic), ("x", Basic), ("y", Basic),
+                                               ("complete", bool)])
+"""
+The simplified equations of a charge's electric field: its signed magnitude, and its x and y
+components. ``complete`` is False if simplifying ran out of time, leaving the equations only partly
+simplified.
+"""
+
+
+def substitute_parameters(template: FieldEquations, values: Dict[Basic, Basic]) -> FieldEquations:
+    """
+    Substitute a charge's parameters into equations built with symbolic parameters.
+
+    Args:
+        template (FieldEquations): The equations, in terms of symbolic parameters.
+        values (Dict[Basic, Basic]): The value of each symbolic parameter.
+
+    Returns:
+        FieldEquations: The equations of the charge.
+    """
+
+    return FieldEquations(template.mag.xreplace(values), template.x.xreplace(values),
+                          template.y.xreplace(values), template.complete)
+
+
+TEMPLATE_ATTEMPTS = 3
+"""
+The number of times ``memoize_templates`` builds a template that is not fully simplified before
+keeping it anyway.
+"""
+
+_Template = TypeVar("_Template", bound=Tuple[Any, ...])
+
+
+def memoize_templates(build: Callable[..., _Template]) -> Callable[..., _Template]:
+    """
+    Memoize a function building equations with symbolic parameters, by its arguments.
+
+    A template that ran out of time while simplifying is built again on the next call, up to
+    ``TEMPLATE_ATTEMPTS`` times, so that one slow build (for example, on a busy machine) does not
+    leave the equations of every later charge of that kind partly simplified.
+
+    Args:
+        build (Callable[..., _Template]): Builds a template, as a tuple whose last element is
+            whether it was fully simplified, such as ``FieldEquations``.
+
+    Returns:
+        Callable[..., _Template]: The memoized function.
+    """
+
+    templates: Dict[Tuple[Any, ...], _Template] = {}
+    attempts: Dict[Tuple[Any, ...], int] = {}
+
+    @functools.wraps(build)
+    def memoized(*args: Any) -> _Template:
+        template = templates.get(args)
+        if template is not None:
+            return template
+
+        template = build(*args)
+        attempts[args] = attempts.get(args, 0) + 1
+        if template[-1] or attempts[args] >= TEMPLATE_ATTEMPTS:
+            templates[args] = template
+
+        return template
+
+    return memoized
+
+
+class ChargeSnapshot:
+    """
+    An immutable copy of a charge's type and parameters.
+
+    Snapshots compare equal exactly when they would construct identical charges, and their hash is
+    computed once up front, so they are cheap keys for caching anything derived from a charge. They
+    can also be pickled and turned back into a charge with ``to_charge``, unlike the charges
+    themselves.
+    """
+
+    __slots__ = ("charge_type", "parameters", "_hash")
+
+    def __init__(self, charge_type: Type["BaseCharge"], parameters: Tuple[Any, ...]) -> None:
+        """
+        Initialize the snapshot.
+
+        Args:
+            charge_type (Type[BaseCharge]): The type of the charge.
+            parameters (Tuple[Any, ...]): The arguments constructing the charge, which must be
+                hashable.
+        """
+
+        object.__setattr__(self, "charge_type", charge_type)
+        object.__setattr__(self, "parameters", parameters)
+        object.__setattr__(self, "_hash", hash((charge_type.__qualname__, parameters)))
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"ChargeSnapshot is immutable, cannot set {name}")
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ChargeSnapshot):
+            return NotImplemented
+
+        return (self._hash == other._hash and self.charge_type is other.charge_type
+                and self.parameters == other.parameters)
+
+    def __repr__(self) -> str:
+        return f"ChargeSnapshot({self.charge_type.__name__}, {self.parameters})"
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return (ChargeSnapshot, (self.charge_type, self.parameters))
+
+    def to_charge(self) -> "BaseCharge":
+        """
+        Construct a new charge from this snapshot.
+
+        Returns:
+            BaseCharge: A charge identical to the one the snapshot was taken of.
+        """
+
+        return self.charge_type(*self.parameters)
 
 
 class BaseCharge(abc.ABC):
@@ -16,6 +146,12 @@ class BaseCharge(abc.ABC):
     An abstract charge, from which subclasses overload.
     """
 
+    EQUATIONS_VERSION = 1
+    """
+    The version of this type of charge's equations. Increment it whenever the equations change, so
+    that equations cached on disk by an older version are never used.
+    """
+
     charge_updated: Callable[[], None]
     """
     A signal to be emitted when an aspect of this charge changes.
@@ -26,6 +162,25 @@ class BaseCharge(abc.ABC):
     emitted from ``Window``.
     """
 
+    def snapshot(self) -> ChargeSnapshot:
+        """
+        Take an immutable, hashable copy of this charge's current parameters.
+
+        Returns:
+            ChargeSnapshot: The snapshot.
+        """
+
+        return ChargeSnapshot(type(self), self.parameters())
+
+    @abc.abstractmethod
+    def parameters(self) -> Tuple[Any, ...]:
+        """
+        The arguments that construct a charge identical to this one.
+
+        Returns:
+            Tuple[Any, ...]: The constructor arguments, all hashable.
+        """
+
     @abc.abstractmethod
     def electric_field_magnitude(self, point: Point2D) -> float:
         """
@@ -62,6 +217,40 @@ class BaseCharge(abc.ABC):
             float: y component of electric field.
         """
 
+    @abc.abstractmethod
+    def electric_field(self, xs: np.ndarray, ys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Calculate both components of the electric field generated by the charge at many points at
+        once.
+
+        ``xs`` and ``ys`` are broadcast against each other, so a grid can be passed either as two
+        full coordinate arrays or as a row and a column. Points where the field is undefined (for
+        example, on top of a point charge) evaluate to zero.
+
+        Args:
+            xs (ndarray): x positions of the test points.
+            ys (ndarray): y positions of the test points.
+
+        Returns:
+            Tuple[ndarray, ndarray]: x and y components of the electric field at each point.
+        """
+
+    @abc.abstractmethod
+    def potential(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """
+        Calculate the electric potential generated by the charge at many points at once.
+
+        ``xs`` and ``ys`` are broadcast against each other, as in ``electric_field``. Points where
+        the potential is undefined (for example, on top of a point charge) evaluate to zero.
+
+        Args:
+            xs (ndarray): x positions of the test points.
+            ys (ndarray): y positions of the test points.
+
+        Returns:
+            ndarray: The electric potential at each point, in V.
+        """
+
     @abc.abstractmethod
     def open_menu(self, pos: QtCore.QPointF) -> bool:
         """
@@ -76,6 +265,26 @@ class BaseCharge(abc.ABC):
             bool: True if this charge should be deleted, False otherwise.
         """
 
+    def field_equations(self) -> FieldEquations:
+        """
+        Build and simplify every equation of this charge's electric field.
+
+        By default, each equation is built and simplified separately, within a time budget (see
+        ``bounded_simplify``). Subclasses override this to substitute their parameters into
+        equations simplified once per type of charge, in terms of symbolic parameters, so that no
+        charge is simplified from scratch.
+
+        Returns:
+            FieldEquations: The simplified equations.
+        """
+
+        mag, x_eqn, y_eqn = (bounded_simplify(eqn) for eqn in (self.electric_field_mag_eqn(),
+                                                                 self.electric_field_x_eqn(),
+                                                                 self.electric_field_y_eqn()))
+
+        return FieldEquations(mag.expression, x_eqn.expression, y_eqn.expression, mag.complete
+                              and x_eqn.complete and y_eqn.complete)
+
     @abc.abstractmethod
     def electric_field_mag_eqn(self) -> Basic:
         """
@@ -0,0 +1,525 @@
+"""
+A columnar store of charges, allowing many charges of the same type to be evaluated at once.
+"""
+
+import math
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# pylint: disable=import-error
+from equations.base_charge import BaseCharge
+from equations.infinite_line_charge import InfiniteLineCharge
+from equations.multipole import PointChargeTree
+from equations.point_charge import PointCharge
+from equations.ring_charge import RingCharge
+
+# pylint: enable=import-error
+
+
+class ChargeColumns:
+    """
+    The parameters of every charge of a single type, one row per charge.
+
+    Rows are kept in the same order as the charges were added.
+    """
+
+    def __init__(self, width: int) -> None:
+        """
+        Initialize an empty set of columns.
+
+        Args:
+            width (int): The number of parameters describing each charge.
+        """
+
+        self.charges: List[BaseCharge] = []
+        """
+        The charge each row was read from.
+        """
+
+        self._data = np.empty((8, width))
+
+    @property
+    def data(self) -> np.ndarray:
+        """
+        The parameters of every charge, as an array of shape (number of charges, width).
+        """
+
+        return self._data[:len(self.charges)]
+
+    def append(self, charge: BaseCharge, row: Sequence[float]) -> None:
+        """
+        Add a charge to the end of the columns.
+
+        Args:
+            charge (BaseCharge): The charge being added.
+            row (Sequence[float]): The parameters of the charge.
+        """
+
+        size = len(self.charges)
+        if size == self._data.shape[0]:
+            # Grow geometrically so that adding many charges one at a time stays cheap.
+            self._data = np.concatenate((self._data, np.empty(self._data.shape)))
+
+        self._data[size] = row
+        self.charges.append(charge)
+
+    def remove(self, charge: BaseCharge) -> None:
+        """
+        Remove a charge from the columns, if it is present.
+
+        Args:
+            charge (BaseCharge): The charge to remove.
+        """
+
+        index = self._index(charge)
+        if index < 0:
+            return
+
+        size = len(self.charges)
+        self._data[index:size - 1] = self._data[index + 1:size]
+        del self.charges[index]
+
+    def __contains__(self, charge: BaseCharge) -> bool:
+        return self._index(charge) >= 0
+
+    def update(self, charge: BaseCharge, row: Sequence[float]) -> None:
+        """
+        Overwrite the parameters of a charge, if it is present.
+
+        Args:
+            charge (BaseCharge): The charge that changed.
+            row (Sequence[float]): The new parameters of the charge.
+        """
+
+        index = self._index(charge)
+        if index >= 0:
+            self._data[index] = row
+
+    def clear(self) -> None:
+        """
+        Remove every charge from the columns.
+        """
+
+        self.charges = []
+
+    def _index(self, charge: BaseCharge) -> int:
+        """
+        Find the row of a charge, searching from the most recently added charge.
+
+        Args:
+            charge (BaseCharge): The charge to find.
+
+        Returns:
+            int: The row of the charge, or -1 if it is not present.
+        """
+
+        for index in range(len(self.charges) - 1, -1, -1):
+            if self.charges[index] is charge:
+                return index
+
+        return -1
+
+
+class ChargeStore:
+    """
+    Per-type columnar copies of a collection of charges.
+
+    Point charges, infinite line charges and rings of charge (including circles) are each stored as
+    arrays of their parameters, so that every charge of a type is evaluated in one broadcast NumPy
+    operation instead of one Python call per charge. Any other charge type is evaluated one charge
+    at a time.
+
+    Large numbers of point charges can optionally be evaluated with a Barnes-Hut quadtree instead,
+    by setting ``multipole_accuracy``.
+    """
+
+    DEFAULT_MEMORY_BUDGET = 2**20
+    """
+    The default number of bytes of temporary arrays a single broadcast evaluation may use.
+    """
+
+    MULTIPOLE_MIN_CHARGES = 2000
+    """
+    The fewest point charges for which the quadtree is used. Below this, direct summation is faster.
+    """
+
+    _TEMPORARY_ARRAYS = 8
+    """
+    Roughly how many (charges x points) temporary arrays a broadcast evaluation allocates.
+    """
+
+    def __init__(self,
+                 charges: Iterable[BaseCharge] = (),
+                 memory_budget: int = DEFAULT_MEMORY_BUDGET) -> None:
+        """
+        Initialize the store with any number of charges.
+
+        Args:
+            charges (Iterable[BaseCharge]): The charges to store. Defaults to no charges.
+            memory_budget (int): The number of bytes of temporary arrays a single broadcast
+                evaluation may use. Defaults to ``DEFAULT_MEMORY_BUDGET``.
+        """
+
+        self.memory_budget = memory_budget
+
+        self.multipole_accuracy: Optional[float] = None
+        """
+        The opening angle of the point charge quadtree, between 0 and 1, or None to always sum point
+        charges directly. Smaller values are more accurate and slower.
+        """
+
+        self.multipole_error = 0.0
+        """
+        The estimated relative (root mean square) error of the most recent evaluation, which is 0
+        unless the quadtree was used.
+        """
+
+        self._point_tree: Optional[PointChargeTree] = None
+
+        self.points = ChargeColumns(3)
+        """
+        Point charges, with columns x, y and charge.
+        """
+
+        self.lines = ChargeColumns(4)
+        """
+        Infinite line charges, with columns a, b, c (from ``ax + by + c = 0``) and λ.
+        """
+
+        self.rings = ChargeColumns(5)
+        """
+        Rings of charge, with columns center x, center y, inner radius, outer radius and density.
+        """
+
+        self.others: List[BaseCharge] = []
+        """
+        Charges of any other type, and rings whose charge density is not a number, evaluated one
+        at a time.
+        """
+
+        for charge in charges:
+            self.add(charge)
+
+    def __len__(self) -> int:
+        return (len(self.points.charges) + len(self.lines.charges) + len(self.rings.charges)
+                + len(self.others))
+
+    def add(self, charge: BaseCharge) -> None:
+        """
+        Add a charge to the store.
+
+        Args:
+            charge (BaseCharge): The charge to add.
+        """
+
+        columns, row = self._columns_and_row(charge)
+
+        if columns is None:
+            self.others.append(charge)
+        else:
+            columns.append(charge, row)
+
+        if columns is self.points:
+            self._point_tree = None
+
+    def remove(self, charge: BaseCharge) -> None:
+        """
+        Remove a charge from the store, if it is present.
+
+        Args:
+            charge (BaseCharge): The charge to remove.
+        """
+
+        columns = self._columns_and_row(charge)[0]
+
+        if columns is None:
+            if charge in self.others:
+                self.others.remove(charge)
+        else:
+            columns.remove(charge)
+
+        if columns is self.points:
+            self._point_tree = None
+
+    def update(self, charge: BaseCharge) -> None:
+        """
+        Re-read the parameters of a charge that has changed.
+
+        Args:
+            charge (BaseCharge): The charge that changed.
+        """
+
+        columns, row = self._columns_and_row(charge)
+
+        # A ring whose charge density changed between a number and an expression moves between
+        # the ring columns and the other charges.
+        if columns is None and isinstance(charge, RingCharge) and charge in self.rings:
+            self.rings.remove(charge)
+            self.others.append(charge)
+        elif columns is self.rings and charge in self.others:
+            self.others.remove(charge)
+            columns.append(charge, row)
+        elif columns is not None:
+            columns.update(charge, row)
+
+        if columns is self.points:
+            self._point_tree = None
+
+    def clear(self) -> None:
+        """
+        Remove every charge from the store.
+        """
+
+        self.points.clear()
+        self.lines.clear()
+        self.rings.clear()
+        self.others = []
+        self._point_tree = None
+
+    def electric_field(self, xs: np.ndarray, ys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Calculate both components of the net electric field of every stored charge.
+
+        Each charge type is evaluated as one (charges x points) broadcast, split into blocks of
+        charges and points (see ``_blocks``) so that the temporary arrays stay within
+        ``memory_budget``. Non-finite contributions are dropped. When enabled, point charges are
+        evaluated with the quadtree instead, and ``multipole_error`` is updated with its error
+        estimate.
+
+        Args:
+            xs (ndarray): 1-dimensional array of x positions to measure the electric field at.
+            ys (ndarray): 1-dimensional array of y positions to measure the electric field at.
+
+        Returns:
+            Tuple[ndarray, ndarray]: x and y components of the net electric field at each point.
+        """
+
+        e_x = np.zeros(xs.shape)
+        e_y = np.zeros(ys.shape)
+
+        self.multipole_error = 0.0
+
+        if xs.size == 0:
+            return e_x, e_y
+
+        point_tree = self._get_point_tree()
+        error = np.zeros(xs.shape)
+        if point_tree is not None:
+            e_x, e_y, error = point_tree.electric_field(xs, ys)
+
+        for columns in (self.points, self.lines, self.rings):
+            if columns is self.points and point_tree is not None:
+                continue
+
+            data = columns.data
+
+            for rows, points in self._blocks(data.shape[0], xs.size):
+                x_inc, y_inc = self._columns_field(columns, data[rows], xs[points], ys[points])
+                e_x[points] += ChargeStore._finite_sum(x_inc)
+                e_y[points] += ChargeStore._finite_sum(y_inc)
+
+        for charge in self.others:
+            x_inc, y_inc = charge.electric_field(xs, ys)
+            e_x += np.where(np.isfinite(x_inc), x_inc, 0.0)
+            e_y += np.where(np.isfinite(y_inc), y_inc, 0.0)
+
+        if point_tree is not None:
+            # Compare the typical size of the error to the typical size of the field, since the
+            # relative error at any single point is unbounded where the field cancels out.
+            rms_field = np.sqrt(np.mean(e_x**2 + e_y**2))
+            self.multipole_error = (float(np.sqrt(np.mean(error**2)) / rms_field)
+                                    if rms_field > 0.0 else 0.0)
+
+        return e_x, e_y
+
+    def potential(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """
+        Calculate the net electric potential of every stored charge.
+
+        Charges are evaluated in the same blocked broadcasts as ``electric_field``, and non-finite
+        contributions are dropped. Point charges are always summed directly, since the quadtree only
+        approximates the field.
+
+        Args:
+            xs (ndarray): 1-dimensional array of x positions to measure the potential at.
+            ys (ndarray): 1-dimensional array of y positions to measure the potential at.
+
+        Returns:
+            ndarray: The net electric potential at each point.
+        """
+
+        total = np.zeros(xs.shape)
+
+        if xs.size == 0:
+            return total
+
+        for columns in (self.points, self.lines, self.rings):
+            data = columns.data
+
+            for rows, points in self._blocks(data.shape[0], xs.size):
+                total[points] += ChargeStore._finite_sum(
+                    self._columns_potential(columns, data[rows], xs[points], ys[points]))
+
+        for charge in self.others:
+            increment = charge.potential(xs, ys)
+            total += np.where(np.isfinite(increment), increment, 0.0)
+
+        return total
+
+    def _get_point_tree(self) -> Optional[PointChargeTree]:
+        """
+        Get the quadtree over the point charges, rebuilding it if the point charges have changed.
+
+        Returns:
+            Optional[PointChargeTree]: The quadtree, or None if the point charges should be summed
+            directly.
+        """
+
+        if (self.multipole_accuracy is None
+                or len(self.points.charges) < ChargeStore.MULTIPOLE_MIN_CHARGES):
+            return None
+
+        if self._point_tree is None or self._point_tree.accuracy != self.multipole_accuracy:
+            data = self.points.data
+            self._point_tree = PointChargeTree(data[:, 0], data[:, 1], data[:, 2],
+                                               self.multipole_accuracy)
+
+        return self._point_tree
+
+    def _blocks(self, charges: int, points: int) -> Iterator[Tuple[slice, slice]]:
+        """
+        Split a (charges x points) broadcast into blocks whose temporary arrays fit in
+        ``memory_budget``.
+
+        Blocks are roughly square, spanning at most the square root of the budget's elements in
+        charges and the rest of the budget in points. This keeps the number of NumPy passes close to
+        the fewest the budget permits, without very long, thin blocks that vectorize poorly.
+
+        Args:
+            charges (int): The number of charges.
+            points (int): The number of points.
+
+        Yields:
+            Tuple[slice, slice]: The charges and the points of each block.
+        """
+
+        elements = max(1, self.memory_budget // (8 * ChargeStore._TEMPORARY_ARRAYS))
+        charge_chunk = max(1, min(charges, math.isqrt(elements)))
+        point_chunk = max(1, elements // charge_chunk)
+
+        for charge_start in range(0, charges, charge_chunk):
+            for point_start in range(0, points, point_chunk):
+                yield (slice(charge_start, charge_start + charge_chunk),
+                       slice(point_start, point_start + point_chunk))
+
+    @staticmethod
+    def _finite_sum(contributions: np.ndarray) -> np.ndarray:
+        """
+        Sum the contributions of every charge at each point, dropping any non-finite contributions.
+
+        Args:
+            contributions (ndarray): Contributions of shape (charges, points).
+
+        Returns:
+            ndarray: The sum at each point.
+        """
+
+        total = contributions.sum(axis=0)
+
+        # A finite total means every contribution was finite, so the (slower) mask is only needed
+        # for the rare points that are not.
+        bad_points = ~np.isfinite(total)
+        if bad_points.any():
+            bad = contributions[:, bad_points]
+            total[bad_points] = np.where(np.isfinite(bad), bad, 0.0).sum(axis=0)
+
+        return total
+
+    def _columns_field(self, columns: ChargeColumns, data: np.ndarray, xs: np.ndarray,
+                       ys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Calculate the electric field of some rows of a set of columns, without summing.
+
+        Args:
+            columns (ChargeColumns): The columns the rows belong to.
+            data (ndarray): The rows of charge parameters to evaluate.
+            xs (ndarray): 1-dimensional array of x positions.
+            ys (ndarray): 1-dimensional array of y positions.
+
+        Returns:
+            Tuple[ndarray, ndarray]: x and y components of the electric field, of shape
+            (charges, points).
+        """
+
+        if columns is self.points:
+            return PointCharge.field_from_offsets(xs - data[:, 0, None], ys - data[:, 1, None],
+                                                  data[:, 2, None])
+
+        if columns is self.lines:
+            return InfiniteLineCharge.field_from_coefficients(xs, ys, data[:, 0, None],
+                                                              data[:, 1, None], data[:, 2, None],
+                                                              data[:, 3, None])
+
+        return RingCharge.field_from_offsets(xs - data[:, 0, None], ys - data[:, 1, None],
+                                             data[:, 2, None], data[:, 3, None], data[:, 4, None])
+
+    def _columns_potential(self, columns: ChargeColumns, data: np.ndarray, xs: np.ndarray,
+                           ys: np.ndarray) -> np.ndarray:
+        """
+        Calculate the electric potential of some rows of a set of columns, without summing.
+
+        Args:
+            columns (ChargeColumns): The columns the rows belong to.
+            data (ndarray): The rows of charge parameters to evaluate.
+            xs (ndarray): 1-dimensional array of x positions.
+            ys (ndarray): 1-dimensional array of y positions.
+
+        Returns:
+            ndarray: The electric potential, of shape (charges, points).
+        """
+
+        if columns is self.points:
+            return PointCharge.potential_from_offsets(xs - data[:, 0, None], ys - data[:, 1, None],
+                                                      data[:, 2, None])
+
+        if columns is self.lines:
+            return InfiniteLineCharge.potential_from_coefficients(xs, ys, data[:, 0, None],
+                                                                  data[:, 1, None],
+                                                                  data[:, 2, None],
+                                                                  data[:, 3, None])
+
+        return RingCharge.potential_from_offsets(xs - data[:, 0, None], ys - data[:, 1, None],
+                                                 data[:, 2, None], data[:, 3, None],
+                                                 data[:, 4, None])
+
+    def _columns_and_row(
+            self, charge: BaseCharge) -> Tuple[Optional[ChargeColumns], Tuple[float, ...]]:
+        """
+        Find the columns a charge belongs in, and its row of parameters.
+
+        Args:
+            charge (BaseCharge): The charge to look up.
+
+        Returns:
+            Tuple[Optional[ChargeColumns], Tuple[float, ...]]: The columns and the row, or None and
+            an empty row if the charge type has no columns, or if it is a ring whose charge density
+            is not a number.
+        """
+
+        if isinstance(charge, PointCharge):
+            return self.points, (charge.position.x, charge.position.y, charge.charge)
+
+        if isinstance(charge, InfiniteLineCharge):
+            return self.lines, (charge.x_coef, charge.y_coef, charge.offset,
+                                charge.charge_density)
+
+        if isinstance(charge, RingCharge):
+            density = charge.numeric_density()
+            if density is None:
+                return None, ()
+
+            return self.rings, (charge.center.x, charge.center.y, charge.inner_radius,
+                                charge.outer_radius, density)
+
+        return None, ()
@@ -2,6 +2,8 @@
 Calculate the electric field of solid circle of charge.
 """
 
+from typing import Any, Tuple
+
 import numpy as np
 from PyQt6 import QtCore, QtWidgets
 
@@ -21,6 +23,18 @@ class CircleCharge(RingCharge):
     def __init__(self, center: Point2D, radius: float, charge_density: float) -> None:
         super().__init__(center, 0.0, radius, charge_density)
 
+    def parameters(self) -> Tuple[Any, ...]:
+        """
+        The arguments that construct a circle of charge identical to this one.
+
+        Returns:
+            Tuple[Any, ...]: The center, radius and charge density.
+        """
+
+        center, _, radius, charge_density = super().parameters()
+
+        return center, radius, charge_density
+
     def open_menu(self, pos: QtCore.QPointF) -> bool:
         """
         Open a context menu for this charge.
@@ -50,10 +64,11 @@ class CircleCharge(RingCharge):
                     self.charge_density = val
                     self.charge_updated()
             elif action == set_radius:
-                val, success = QtWidgets.QInputDialog().getDouble(menu, "Set Radius",
-                                                                  "Set Radius (m)")
-                if success:
-                    self.outer_radius = val
+                (radius,), success = MultiLineInputDialog(["Radius"],
+                                                          menu).get_doubles(minimum=0.0)
+
+                if success and np.isfinite(radius) and radius > 0:
+                    self.outer_radius = radius
                     self.charge_updated()
             elif action == set_center:
                 new_center, success = MultiLineInputDialog(["X Position", "Y Position"],
@@ -17,6 +17,13 @@ COULOMB_CONSTANT = 1 / (4 * np.pi * EPSILON_NOUGHT)
 Coulomb's constant (k), in N m^2 / C^2.
 """
 
+POTENTIAL_REFERENCE_DISTANCE = 1.0
+"""
+The distance from an infinite line charge or a ring of charge at which its electric potential is
+taken to be 0, in m. Their fields fall off as 1/r, so their potential cannot be referenced to
+infinity like a point charge's.
+"""
+
 COULOMB_CONSTANT_SYM = Symbol("k_e")
 """
 The sympy symbol to use for Coulomb's constant (k_e).
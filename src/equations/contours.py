@@ -0,0 +1,291 @@
+"""
+Equipotential contours, extracted from a grid of electric potentials with marching squares.
+"""
+
+import collections
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+# pylint: disable=import-error
+from equations.graph_window import GraphWindow
+
+# pylint: enable=import-error
+
+Contours = NamedTuple("Contours", [("xs", np.ndarray), ("ys", np.ndarray),
+                                   ("levels", np.ndarray)])
+"""
+Every contour segment, as consecutive pairs of points, along with the potential of each contour.
+"""
+
+PotentialGrid = NamedTuple("PotentialGrid", [("xs", np.ndarray), ("ys", np.ndarray),
+                                             ("potential", np.ndarray)])
+"""
+The x and y positions of a grid, and the electric potential on it, indexed [x_index, y_index].
+"""
+
+AUTOMATIC_LEVELS = 16
+"""
+The number of contours drawn when no spacing is given.
+"""
+
+MAX_LEVELS = 200
+"""
+The most contours drawn at once.
+"""
+
+# The corners of a cell, counter-clockwise from its lower left, as offsets from the lower left.
+_CORNERS = np.array([(0, 0), (1, 0), (1, 1), (0, 1)])
+
+# The two corners of each edge of a cell: bottom, right, top and left.
+_EDGE_CORNERS = np.array([(0, 1), (1, 2), (2, 3), (3, 0)])
+
+# The edges joined by the (up to 2) segments through a cell, for each case of which corners are at
+# or above the level (bit n set for corner n). -1 marks a missing segment.
+_SEGMENTS = np.full((16, 2, 2), -1)
+for _case, _edges in {
+        1: [(3, 0)],
+        2: [(0, 1)],
+        3: [(3, 1)],
+        4: [(1, 2)],
+        5: [(3, 0), (1, 2)],
+        6: [(0, 2)],
+        7: [(3, 2)],
+        8: [(2, 3)],
+        9: [(0, 2)],
+        10: [(0, 1), (2, 3)],
+        11: [(1, 2)],
+        12: [(1, 3)],
+        13: [(0, 1)],
+        14: [(3, 0)],
+}.items():
+    _SEGMENTS[_case, :len(_edges)] = _edges
+
+# The two saddle cases are ambiguous. The segments above separate the corners at or above the level;
+# if the cell's center is also at or above the level, the other corners are separated instead.
+_SADDLE_SEGMENTS = _SEGMENTS.copy()
+_SADDLE_SEGMENTS[5] = [(0, 1), (2, 3)]
+_SADDLE_SEGMENTS[10] = [(3, 0), (1, 2)]
+
+
+def contour_levels(potential: np.ndarray, spacing: Optional[float] = None) -> np.ndarray:
+    """
+    Choose the potentials to draw contours at.
+
+    Args:
+        potential (ndarray): The potential on the grid.
+        spacing (Optional[float]): The difference in potential between neighboring contours, or None
+            to spread ``AUTOMATIC_LEVELS`` contours over most of the grid's potentials. Defaults to
+            None.
+
+    Returns:
+        ndarray: The potential of each contour, in increasing order, at most ``MAX_LEVELS`` long.
+    """
+
+    finite = potential[np.isfinite(potential)]
+    if finite.size == 0:
+        return np.empty(0)
+
+    if spacing is None or spacing <= 0.0:
+        # The potential diverges close to charges, so leave out the extremes.
+        low, high = np.percentile(finite, (5, 95))
+        return np.linspace(low, high, AUTOMATIC_LEVELS + 2)[1:-1]
+
+    first, last = np.ceil(finite.min() / spacing), np.floor(finite.max() / spacing)
+    count = int(last - first) + 1
+    if count <= 0:
+        return np.empty(0)
+
+    # Thin out the levels evenly rather than drawing an unbounded number of them.
+    stride = -(-count // MAX_LEVELS)
+    return (first + np.arange(0, count, stride)) * spacing
+
+
+def marching_squares(grid: PotentialGrid,
+                     levels: np.ndarray,
+                     cancelled: Optional[Callable[[], bool]] = None) -> Optional[Contours]:
+    """
+    Extract the contours of a grid at several levels.
+
+    Each level is extracted with a few whole-grid array operations: every cell's corners are
+    classified at once, and the segments through every cell are looked up and interpolated together.
+    Cells with a non-finite corner are skipped.
+
+    Args:
+        grid (PotentialGrid): The grid to extract contours from.
+        levels (ndarray): The potential of each contour.
+        cancelled (Optional[Callable[[], bool]]): Checked before each level; once it returns True,
+            extraction stops. Defaults to never cancelling.
+
+    Returns:
+        Optional[Contours]: Every segment of every contour, or None if extraction was cancelled.
+    """
+
+    xs: List[np.ndarray] = []
+    ys: List[np.ndarray] = []
+    segment_levels: List[np.ndarray] = []
+
+    values = grid.potential
+    corners = np.stack([
+        values[x_off:values.shape[0] - 1 + x_off, y_off:values.shape[1] - 1 + y_off]
+        for x_off, y_off in _CORNERS
+    ])
+    valid = np.isfinite(corners).all(axis=0)
+    center = corners.mean(axis=0)
+
+    for level in levels:
+        if cancelled is not None and cancelled():
+            return None
+
+        above = corners >= level
+        cases = above[0] + 2 * above[1] + 4 * above[2] + 8 * above[3]
+
+        # Only the cells the level passes through have segments.
+        x_cells, y_cells = np.nonzero(valid & (cases != 0) & (cases != 15))
+        if x_cells.size == 0:
+            continue
+
+        cell_cases = cases[x_cells, y_cells]
+        segments = np.where((center[x_cells, y_cells] >= level)[:, None, None],
+                            _SADDLE_SEGMENTS[cell_cases], _SEGMENTS[cell_cases])
+
+        for slot in range(2):
+            present = segments[:, slot, 0] >= 0
+            if not present.any():
+                continue
+
+            for end in range(2):
+                x_pos, y_pos = _edge_points(grid, corners, x_cells[present], y_cells[present],
+                                            segments[present, slot, end], level)
+                xs.append(x_pos)
+                ys.append(y_pos)
+
+            segment_levels.append(np.full(np.count_nonzero(present), level))
+
+    if not segment_levels:
+        return Contours(np.empty(0), np.empty(0), np.empty(0))
+
+    # Each pair of arrays holds the starts and the ends of the same segments, so interleave them.
+    starts_x, ends_x = np.concatenate(xs[0::2]), np.concatenate(xs[1::2])
+    starts_y, ends_y = np.concatenate(ys[0::2]), np.concatenate(ys[1::2])
+
+    return Contours(
+        np.stack((starts_x, ends_x), axis=1).ravel(),
+        np.stack((starts_y, ends_y), axis=1).ravel(), np.concatenate(segment_levels))
+
+
+def _edge_points(grid: PotentialGrid, corners: np.ndarray, x_cells: np.ndarray,
+                 y_cells: np.ndarray, edges: np.ndarray,
+                 level: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find where a level crosses an edge of each of some cells, interpolating linearly.
+
+    Args:
+        grid (PotentialGrid): The grid the cells belong to.
+        corners (ndarray): The potential at each corner of every cell, of shape (4, cells x,
+            cells y).
+        x_cells (ndarray): The x index of each cell.
+        y_cells (ndarray): The y index of each cell.
+        edges (ndarray): The edge of each cell the level crosses.
+        level (float): The level.
+
+    Returns:
+        Tuple[ndarray, ndarray]: The x and y position of each crossing.
+    """
+
+    start, end = _EDGE_CORNERS[edges, 0], _EDGE_CORNERS[edges, 1]
+    start_value = corners[start, x_cells, y_cells]
+    end_value = corners[end, x_cells, y_cells]
+
+    # One corner is at or above the level and the other is below it, so they always differ.
+    fraction = (level - start_value) / (end_value - start_value)
+
+    start_x = grid.xs[x_cells + _CORNERS[start, 0]]
+    end_x = grid.xs[x_cells + _CORNERS[end, 0]]
+    start_y = grid.ys[y_cells + _CORNERS[start, 1]]
+    end_y = grid.ys[y_cells + _CORNERS[end, 1]]
+
+    return start_x + fraction * (end_x - start_x), start_y + fraction * (end_y - start_y)
+
+
+class EquipotentialCache:
+    """
+    Equipotential contours of a graph window, keeping the most recently evaluated potential grids.
+
+    Grids are keyed by the graph window's version and the grid's range and shape, so redrawing the
+    same view with a different contour spacing only re-extracts the contours.
+    """
+
+    MAX_GRIDS = 8
+    """
+    The number of potential grids kept.
+    """
+
+    def __init__(self) -> None:
+        self._grids: Dict[Tuple[int, Tuple[float, float], Tuple[float, float], Tuple[int, int]],
+                          PotentialGrid] = collections.OrderedDict()
+
+    def potential_grid(self, graph_window: GraphWindow, x_range: Tuple[float, float],
+                       y_range: Tuple[float, float], shape: Tuple[int, int]) -> PotentialGrid:
+        """
+        Get the potential on a grid, evaluating it only if it is not cached.
+
+        Args:
+            graph_window (GraphWindow): The charges to evaluate.
+            x_range (Tuple[float, float]): The minimum and maximum x position.
+            y_range (Tuple[float, float]): The minimum and maximum y position.
+            shape (Tuple[int, int]): The number of x and y positions.
+
+        Returns:
+            PotentialGrid: The potential on the grid.
+        """
+
+        key = (graph_window.version, tuple(x_range), tuple(y_range), tuple(shape))
+
+        grid = self._grids.get(key)
+        if grid is not None:
+            self._grids.move_to_end(key)
+            return grid
+
+        xs = np.linspace(x_range[0], x_range[1], max(shape[0], 2))
+        ys = np.linspace(y_range[0], y_range[1], max(shape[1], 2))
+        grid = PotentialGrid(xs, ys, graph_window.potential_grid(xs[:, None], ys[None, :]))
+
+        self._grids[key] = grid
+        while len(self._grids) > EquipotentialCache.MAX_GRIDS:
+            self._grids.popitem(last=False)
+
+        return grid
+
+    def contours(self,
+                 graph_window: GraphWindow,
+                 x_range: Tuple[float, float],
+                 y_range: Tuple[float, float],
+                 shape: Tuple[int, int],
+                 spacing: Optional[float] = None,
+                 cancelled: Optional[Callable[[], bool]] = None) -> Optional[Contours]:
+        """
+        Extract equipotential contours over a grid.
+
+        Args:
+            graph_window (GraphWindow): The charges to evaluate.
+            x_range (Tuple[float, float]): The minimum and maximum x position.
+            y_range (Tuple[float, float]): The minimum and maximum y position.
+            shape (Tuple[int, int]): The number of x and y positions.
+            spacing (Optional[float]): The difference in potential between neighboring contours,
+                or None to choose the contours automatically. Defaults to None.
+            cancelled (Optional[Callable[[], bool]]): Checked after evaluating the potential and
+                before each level; once it returns True, extraction stops. Defaults to never
+                cancelling.
+
+        Returns:
+            Optional[Contours]: Every segment of every contour, or None if extraction was
+            cancelled.
+        """
+
+        grid = self.potential_grid(graph_window, x_range, y_range, shape)
+
+        if cancelled is not None and cancelled():
+            return None
+
+        return marching_squares(grid, contour_levels(grid.potential, spacing), cancelled)
@@ -0,0 +1,151 @@
+"""
+A bounded cache of simplified electric field equations, keyed by charge snapshot.
+"""
+
+import collections
+from typing import Dict, Optional
+
+from sympy import Basic
+
+# pylint: disable=import-error
+from equations.base_charge import ChargeSnapshot, FieldEquations
+from equations.equation_disk_cache import EquationDiskCache
+
+# pylint: enable=import-error
+
+COMPONENTS = ("mag", "x", "y")
+"""
+The equations of each charge: the signed magnitude and the x and y components of its field.
+"""
+
+
+class EquationCache:
+    """
+    Simplified equations of charges, keyed by each charge's snapshot.
+
+    Equations only depend on a charge's type and parameters, so a charge that has not changed (or
+    an identical charge elsewhere) never needs to be simplified again. All of a charge's equations
+    are built together, sharing their common parts (see ``BaseCharge.field_equations``). The least
+    recently used charges are evicted once there are more than ``max_size``.
+    """
+
+    DEFAULT_MAX_SIZE = 256
+    """
+    The default number of charges whose equations are kept.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE) -> None:
+        """
+        Initialize an empty cache.
+
+        Args:
+            max_size (int): The number of charges whose equations are kept. Defaults to
+                ``DEFAULT_MAX_SIZE``.
+        """
+
+        self.max_size = max_size
+
+        self.disk_cache: Optional[EquationDiskCache] = None
+        """
+        A persistent cache behind this one, consulted on a miss and written on every store, or None
+        to only keep equations in memory.
+        """
+
+        self._equations: Dict[ChargeSnapshot, FieldEquations] = collections.OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._equations)
+
+    def equations(self, snapshot: ChargeSnapshot) -> FieldEquations:
+        """
+        Get every simplified equation of a charge, building them only if they are not cached.
+
+        Args:
+            snapshot (ChargeSnapshot): The charge.
+
+        Returns:
+            FieldEquations: The simplified equations.
+        """
+
+        equations = self.get(snapshot)
+        if equations is None:
+            equations = snapshot.to_charge().field_equations()
+            self.put(snapshot, equations)
+
+        return equations
+
+    def get(self, snapshot: ChargeSnapshot) -> Optional[FieldEquations]:
+        """
+        Get the simplified equations of a charge, without building them.
+
+        Args:
+            snapshot (ChargeSnapshot): The charge.
+
+        Returns:
+            Optional[FieldEquations]: The simplified equations, or None if they are not cached in
+            memory or on disk.
+        """
+
+        equations = self._equations.get(snapshot)
+        if equations is not None:
+            self._equations.move_to_end(snapshot)
+            return equations
+
+        if self.disk_cache is None:
+            return None
+
+        equations = self.disk_cache.get(snapshot)
+        if equations is not None:
+            self._remember(snapshot, equations)
+
+        return equations
+
+    def put(self, snapshot: ChargeSnapshot, equations: FieldEquations) -> None:
+        """
+        Cache the simplified equations of a charge, such as ones built in another process.
+
+        Args:
+            snapshot (ChargeSnapshot): The charge.
+            equations (FieldEquations): The simplified equations.
+        """
+
+        self._remember(snapshot, equations)
+
+        if self.disk_cache is not None:
+            self.disk_cache.put(snapshot, equations)
+
+    def equation(self, snapshot: ChargeSnapshot, component: str) -> Basic:
+        """
+        Get one simplified equation of a charge, building the charge's equations only if they are
+        not cached.
+
+        Args:
+            snapshot (ChargeSnapshot): The charge.
+            component (str): The equation to get, one of ``COMPONENTS``.
+
+        Returns:
+            Basic: The simplified equation.
+        """
+
+        return getattr(self.equations(snapshot), component)
+
+    def clear(self) -> None:
+        """
+        Remove every equation cached in memory.
+        """
+
+        self._equations.clear()
+
+    def _remember(self, snapshot: ChargeSnapshot, equations: FieldEquations) -> None:
+        """
+        Keep the simplified equations of a charge in memory, evicting the least recently used.
+
+        Args:
+            snapshot (ChargeSnapshot): The charge.
+            equations (FieldEquations): The simplified equations.
+        """
+
+        self._equations[snapshot] = equations
+        self._equations.move_to_end(snapshot)
+        while len(self._equations) > self.max_size:
+            self._equations.popitem(last=False)
@@ -0,0 +1,243 @@
+"""
+A persistent cache of simplified electric field equations, shared across sessions.
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+from typing import List, Optional, Tuple
+
+import sympy
+from PyQt6 import QtCore
+
+# pylint: disable=import-error
+from equations.base_charge import ChargeSnapshot, FieldEquations
+
+# pylint: enable=import-error
+
+
+class EquationDiskCache:
+    """
+    Simplified equations of charges, pickled to files under the user's cache directory.
+
+    Files are content-addressed: each is named after a hash of everything the equations depend on
+    (the charge's type, the version of its equations and its parameters), so entries never need to
+    be invalidated, only pruned. Files are written atomically, so a crash or a second running
+    instance never leaves a partial entry, and the least recently used files are deleted once the
+    cache grows past ``max_bytes``.
+    """
+
+    FORMAT_VERSION = 2
+    """
+    The version of the file format, part of every key so that old files are never read.
+    """
+
+    DEFAULT_MAX_BYTES = 64 * 2**20
+    """
+    The default size of the cache, in bytes.
+    """
+
+    SUFFIX = ".pickle"
+    """
+    The extension of each cached file.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        """
+        Initialize the cache, without touching the disk.
+
+        Args:
+            directory (Optional[str]): The directory holding the cached files, or None for
+                ``default_directory()``. Defaults to None.
+            max_bytes (int): The total size of the cached files, past which the least recently used
+                files are deleted. Defaults to ``DEFAULT_MAX_BYTES``.
+        """
+
+        self.directory = directory if directory is not None else self.default_directory()
+        self.max_bytes = max_bytes
+
+        # The total size of the cached files, counted on the first write.
+        self._size: Optional[int] = None
+
+    @staticmethod
+    def default_directory() -> str:
+        """
+        The directory of the cache under the user's cache directory, such as ``~/.cache`` on Linux.
+
+        Returns:
+            str: The path of the directory.
+        """
+
+        root = QtCore.QStandardPaths.writableLocation(
+            QtCore.QStandardPaths.StandardLocation.GenericCacheLocation)
+
+        return os.path.join(root, "wavee", "equations")
+
+    @staticmethod
+    def key(snapshot: ChargeSnapshot) -> str:
+        """
+        The name of the file holding a charge's equations.
+
+        Args:
+            snapshot (ChargeSnapshot): The charge.
+
+        Returns:
+            str: A hash of the charge's type, the version of its equations and its parameters, along
+            with the versions of the file format and of sympy (which pickles the equations).
+        """
+
+        charge_type = snapshot.charge_type
+        description = repr((EquationDiskCache.FORMAT_VERSION, sympy.__version__,
+                            charge_type.__module__, charge_type.__qualname__,
+                            charge_type.EQUATIONS_VERSION, snapshot.parameters))
+
+        return hashlib.sha256(description.encode()).hexdigest()
+
+    def get(self, snapshot: ChargeSnapshot) -> Optional[FieldEquations]:
+        """
+        Read the simplified equations of a charge, marking them as recently used.
+
+        Args:
+            snapshot (ChargeSnapshot): The charge.
+
+        Returns:
+            Optional[FieldEquations]: The simplified equations, or None if they are not cached or
+            cannot be read.
+        """
+
+        path = self._path(snapshot)
+
+        try:
+            with open(path, "rb") as file:
+                equations = pickle.load(file)
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except Exception:  # pylint: disable=broad-except
+            # A damaged file, or one pickled by an incompatible version of a charge, is a miss.
+            self._remove(path)
+            return None
+
+        return equations if isinstance(equations, FieldEquations) else None
+
+    def put(self, snapshot: ChargeSnapshot, equations: FieldEquations) -> None:
+        """
+        Write the simplified equations of a charge, pruning the cache if it grows too large.
+
+        Equations that ran out of time while simplifying are not written, so a later session can
+        try again. Failing to write (for example, to a read-only directory) is ignored, since the
+        cache only saves time.
+
+        Args:
+            snapshot (ChargeSnapshot): The charge.
+            equations (FieldEquations): The simplified equations.
+        """
+
+        if not equations.complete:
+            return
+
+        temporary_path = None
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+
+            # Write to a temporary file first, so the entry appears whole or not at all.
+            with tempfile.NamedTemporaryFile("wb", dir=self.directory, suffix=".tmp",
+                                             delete=False) as file:
+                temporary_path = file.name
+                pickle.dump(equations, file, protocol=pickle.HIGHEST_PROTOCOL)
+                size = file.tell()
+
+            os.replace(temporary_path, self._path(snapshot))
+        except OSError:
+            if temporary_path is not None:
+                self._remove(temporary_path)
+            return
+
+        if self._size is None:
+            self._size = sum(entry_size for _, entry_size, _ in self._entries())
+        else:
+            self._size += size
+
+        if self._size > self.max_bytes:
+            self.prune()
+
+    def prune(self) -> None:
+        """
+        Delete the least recently used files until the cache fits in ``max_bytes``.
+        """
+
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        self._size = sum(entry_size for _, entry_size, _ in entries)
+
+        for path, entry_size, _ in entries:
+            if self._size <= self.max_bytes:
+                break
+
+            self._remove(path)
+            self._size -= entry_size
+
+    def clear(self) -> None:
+        """
+        Delete every cached file.
+        """
+
+        for path, _, _ in self._entries():
+            self._remove(path)
+
+        self._size = 0
+
+    def _path(self, snapshot: ChargeSnapshot) -> str:
+        """
+        The path of the file holding a charge's equations.
+
+        Args:
+            snapshot (ChargeSnapshot): The charge.
+
+        Returns:
+            str: The path.
+        """
+
+        return os.path.join(self.directory, self.key(snapshot) + EquationDiskCache.SUFFIX)
+
+    def _entries(self) -> List[Tuple[str, int, float]]:
+        """
+        List every cached file.
+
+        Returns:
+            List[Tuple[str, int, float]]: The path, size and last use time of each file.
+        """
+
+        entries = []
+
+        try:
+            with os.scandir(self.directory) as directory:
+                for entry in directory:
+                    if not entry.name.endswith(EquationDiskCache.SUFFIX):
+                        continue
+
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+
+                    entries.append((entry.path, stat.st_size, stat.st_mtime))
+        except OSError:
+            pass
+
+        return entries
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        """
+        Delete a file, if it still exists.
+
+        Args:
+            path (str): The path of the file.
+        """
+
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -2,82 +2,354 @@
 Implementation of a separate thread for equation rendering.
 """
 
-from typing import List, Optional
+import multiprocessing
+import threading
+from concurrent import futures
+from typing import Callable, Dict, List, Optional, Tuple
 
+import sympy
 from PyQt6 import QtCore
-from sympy import Basic
 
+from equations.base_charge import ChargeSnapshot, FieldEquations
 from equations.graph_window import GraphWindow
-from equations.sympy_helper import round_symbolic
+from equations.printed_equations import PrintedEquationCache, PrintedEquations
+
+# Shown in place of the equations of a charge that could not be built, such as one whose snapshot
+# does not construct a valid charge.
+_FAILED_EQUATIONS = FieldEquations(sympy.nan, sympy.nan, sympy.nan, True)
+
+
+def _build_equations(snapshot: ChargeSnapshot) -> FieldEquations:
+    """
+    Build and simplify every equation of a charge, in a worker process.
+
+    Args:
+        snapshot (ChargeSnapshot): The charge.
+
+    Returns:
+        FieldEquations: The simplified equations.
+    """
+
+    return snapshot.to_charge().field_equations()
 
 
 class EquationThread(QtCore.QThread):
     """
     A standalone thread for equation rendering, because this is highly computationally intensive and
     does not need to be blocking.
+
+    Simplifying is pure Python, so rather than simplifying on this thread (one core, competing with
+    the GUI thread for the interpreter), each charge that is not cached is simplified in a pool of
+    worker processes. This thread only waits on the workers, storing each charge's equations as soon
+    as they arrive, so equations appear one by one and a scene takes about as long as its slowest
+    charge. Rounding and printing (as LaTeX, unless another printer is given) also happen on this
+    thread, remembered per equation and number of digits, and only the charges whose printed
+    equations changed are announced with ``equations_changed``.
+
+    Work is requested as numbered jobs, each on an immutable snapshot of the charges. Only the
+    latest job runs: as soon as a job is superseded, it stops waiting, charges that only it needed
+    are cancelled (unless a worker already started them), and its results are no longer announced.
+    """
+
+    POLL_INTERVAL = 0.05
     """
+    How often, in seconds, a job waiting on the workers checks whether it has been superseded.
+    """
+
+    equations_changed = QtCore.pyqtSignal(int, object)
+    """
+    Emitted with the number of charges of the latest job, and a dictionary from the index of each
+    charge whose printed equations changed since the last emission to its new ``PrintedEquations``
+    (or None while its equations are being built). Applying every emission in order gives the
+    printed equations of each charge.
+    """
+
+    _executor: Optional[futures.ProcessPoolExecutor] = None
 
     def __init__(self,
                  graph_window: GraphWindow,
                  parent: Optional[QtCore.QObject] = None,
-                 default_rounding: int = 2) -> None:
+                 default_rounding: int = 2,
+                 printer: Callable[[sympy.Basic], str] = sympy.latex) -> None:
         super().__init__(parent)
 
         self._graph_window = graph_window
 
         self.rounding = default_rounding
 
-        self._unrounded_mag_eqns: List[Basic] = []
-        self._unrounded_x_eqns: List[Basic] = []
-        self._unrounded_y_eqns: List[Basic] = []
+        self.generation = 0
+        """
+        The number of the latest job.
+        """
+
+        # The latest requested snapshot and the rounding it was requested with, until the thread
+        # picks them up.
+        self._condition = threading.Condition()
+        self._requested: Optional[Tuple[Tuple[ChargeSnapshot, ...], int]] = None
+        self._stopping = False
+
+        # Builds in the worker processes, including ones started for superseded jobs, so they can
+        # be reused by later jobs.
+        self._futures: Dict[ChargeSnapshot, futures.Future] = {}
 
-        self.mag_eqns: List[Basic] = []
-        self.x_eqns: List[Basic] = []
-        self.y_eqns: List[Basic] = []
+        # The equations of each charge of the current job, or None until they are built, and the
+        # printed equations of each charge as last announced.
+        self._equations: List[Optional[FieldEquations]] = []
+        self._emitted: List[Optional[PrintedEquations]] = []
+
+        self._printed = PrintedEquationCache(printer)
+
+    @staticmethod
+    def executor() -> futures.ProcessPoolExecutor:
+        """
+        Get the pool of worker processes shared by every equation thread, starting it if needed.
+
+        Workers are spawned rather than forked, since forking a process running Qt threads is
+        unsafe. One worker is started per core, as needed.
+
+        Returns:
+            ProcessPoolExecutor: The pool.
+        """
+
+        if EquationThread._executor is None:
+            EquationThread._executor = futures.ProcessPoolExecutor(
+                mp_context=multiprocessing.get_context("spawn"))
+
+        return EquationThread._executor
+
+    def request(self, snapshots: Tuple[ChargeSnapshot, ...]) -> int:
+        """
+        Request the equations of some charges, rounded to the current ``rounding``, superseding
+        any earlier request.
+
+        Starts the thread if it is not running yet.
+
+        Args:
+            snapshots (Tuple[ChargeSnapshot, ...]): The charges, usually ``GraphWindow.snapshot()``.
+
+        Returns:
+            int: The generation of the new job.
+        """
+
+        with self._condition:
+            self.generation += 1
+            self._requested = (snapshots, self.rounding)
+            self._condition.notify()
+
+        if not self.isRunning():
+            self.start()
+
+        return self.generation
+
+    def stop(self) -> None:
+        """
+        Stop the thread, abandoning the current job, and wait for it to finish. Then shut down the
+        pool of worker processes, cancelling every build they have not started.
+        """
+
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+
+        self.wait()
+
+        EquationThread.shutdown_executor()
+
+    @staticmethod
+    def shutdown_executor() -> None:
+        """
+        Shut down the pool of worker processes shared by every equation thread, if it was started,
+        without waiting for builds already running. The next build starts a new pool.
+        """
+
+        if EquationThread._executor is not None:
+            EquationThread._executor.shutdown(wait=False, cancel_futures=True)
+            EquationThread._executor = None
 
     def run(self) -> None:
         """
-        Update the equation labels when the charges are changed.
+        Run the latest job whenever one is requested, until the thread is stopped.
         """
 
-        # Load all equations at once.
-        temp_mag_eqns = self._graph_window.electric_field_mag_eqns()
-        temp_x_eqns = self._graph_window.electric_field_x_eqns()
-        temp_y_eqns = self._graph_window.electric_field_y_eqns()
+        while True:
+            with self._condition:
+                while self._requested is None and not self._stopping:
+                    self._condition.wait()
 
-        self._unrounded_mag_eqns = temp_mag_eqns
-        self._unrounded_x_eqns = temp_x_eqns
-        self._unrounded_y_eqns = temp_y_eqns
+                if self._stopping:
+                    for future in self._futures.values():
+                        future.cancel()
+                    return
 
-        self.update_rounding()
+                generation, (snapshots, rounding) = self.generation, self._requested
+                self._requested = None
 
-        self.finished.emit()
+            self._run_job(generation, snapshots, rounding)
 
     def change_rounding(self, increment: int) -> None:
         """
         Increase (or decrease) the rounding by ``increment``, resulting in more (or fewer) digits
         after the decimal place.
 
-        Does not automatically rebuild the equations.
+        Takes effect from the next request.
 
         Args:
             increment (int): The change to the current value of ``rounding``.
         """
 
-        self.rounding += increment
-
         # Make sure rounding never goes below zero.
-        self.rounding = max(self.rounding, 0)
+        with self._condition:
+            self.rounding = max(self.rounding + increment, 0)
+
+    def _superseded(self, generation: int) -> bool:
+        """
+        Check whether a job should stop.
+
+        Args:
+            generation (int): The generation of the job.
+
+        Returns:
+            bool: True if a later job was requested or the thread is stopping.
+        """
+
+        return generation != self.generation or self._stopping
+
+    def _run_job(self, generation: int, snapshots: Tuple[ChargeSnapshot, ...],
+                 rounding: int) -> None:
+        """
+        Fill in the equations of every charge of a job, from the cache or from the workers,
+        stopping as soon as the job is superseded.
+
+        Args:
+            generation (int): The generation of the job.
+            snapshots (Tuple[ChargeSnapshot, ...]): The charges.
+            rounding (int): The number of digits to round the equations to.
+        """
+
+        cache = self._graph_window.equation_cache
+
+        self._equations = [None] * len(snapshots)
+
+        # Identical charges are only built once.
+        indices: Dict[ChargeSnapshot, List[int]] = {}
+        for index, snapshot in enumerate(snapshots):
+            indices.setdefault(snapshot, []).append(index)
+
+        # Keep whatever earlier jobs finished, and cancel what they queued that is no longer needed.
+        for snapshot, future in list(self._futures.items()):
+            if future.done():
+                del self._futures[snapshot]
+                if not future.cancelled():
+                    equations = self._result(snapshot, future)
+                    if equations is not None:
+                        cache.put(snapshot, equations)
+            elif snapshot not in indices and future.cancel():
+                del self._futures[snapshot]
+
+        waiting: Dict[futures.Future, ChargeSnapshot] = {}
+        for snapshot, snapshot_indices in indices.items():
+            equations = cache.get(snapshot)
+            if equations is None:
+                if snapshot not in self._futures:
+                    self._futures[snapshot] = self._submit(snapshot)
+                waiting[self._futures[snapshot]] = snapshot
+                continue
+
+            for index in snapshot_indices:
+                self._equations[index] = equations
+
+        self._emit_changes(generation, rounding)
+
+        while waiting and not self._superseded(generation):
+            done, _ = futures.wait(waiting, EquationThread.POLL_INTERVAL,
+                                   futures.FIRST_COMPLETED)
 
-    def update_rounding(self) -> None:
+            for future in done:
+                snapshot = waiting.pop(future)
+                del self._futures[snapshot]
+
+                equations = self._result(snapshot, future)
+                if equations is None:
+                    equations = _FAILED_EQUATIONS
+                else:
+                    cache.put(snapshot, equations)
+
+                for index in indices[snapshot]:
+                    self._equations[index] = equations
+
+            if done:
+                self._emit_changes(generation, rounding)
+
+    def _submit(self, snapshot: ChargeSnapshot) -> futures.Future:
+        """
+        Start building a charge's equations in a worker process.
+
+        Args:
+            snapshot (ChargeSnapshot): The charge.
+
+        Returns:
+            Future: The charge's simplified equations.
         """
-        Update the rounding on the current equations.
+
+        try:
+            return EquationThread.executor().submit(_build_equations, snapshot)
+        except futures.process.BrokenProcessPool:
+            EquationThread._executor = None
+            return EquationThread.executor().submit(_build_equations, snapshot)
+
+    @staticmethod
+    def _result(snapshot: ChargeSnapshot, future: futures.Future) -> Optional[FieldEquations]:
         """
+        Get the equations built by a finished worker.
+
+        Building a charge's equations can fail, for example if its snapshot does not construct a
+        valid charge. Such a failure is returned as None rather than raised, since raising on this
+        thread would abort the application.
+
+        Args:
+            snapshot (ChargeSnapshot): The charge.
+            future (Future): The finished build of the charge's equations.
+
+        Returns:
+            Optional[FieldEquations]: The simplified equations, or None if building them failed.
+        """
+
+        try:
+            try:
+                return future.result()
+            except futures.process.BrokenProcessPool:
+                # A worker died (or could not start), so build here instead, and start a new pool
+                # for the next build.
+                EquationThread._executor = None
+                return _build_equations(snapshot)
+        except Exception:  # pylint: disable=broad-except
+            return None
+
+    def _emit_changes(self, generation: int, rounding: int) -> None:
+        """
+        Print the equations of the current job, and announce every charge whose printed equations
+        differ from what was last announced, unless the job has been superseded.
+
+        Args:
+            generation (int): The generation of the job.
+            rounding (int): The number of digits to round the equations to.
+        """
+
+        rendered = [
+            self._printed.render(equations, rounding) if equations is not None else None
+            for equations in self._equations
+        ]
+
+        if self._superseded(generation):
+            return
 
-        temp_mag_eqns = [round_symbolic(eqn, self.rounding) for eqn in self._unrounded_mag_eqns]
-        temp_x_eqns = [round_symbolic(eqn, self.rounding) for eqn in self._unrounded_x_eqns]
-        temp_y_eqns = [round_symbolic(eqn, self.rounding) for eqn in self._unrounded_y_eqns]
+        changes = {
+            index: printed
+            for index, printed in enumerate(rendered)
+            if index >= len(self._emitted) or printed != self._emitted[index]
+        }
+        if not changes and len(rendered) == len(self._emitted):
+            return
 
-        self.mag_eqns = temp_mag_eqns
-        self.x_eqns = temp_x_eqns
-        self.y_eqns = temp_y_eqns
+        self._emitted = rendered
+        self.equations_changed.emit(len(rendered), changes)
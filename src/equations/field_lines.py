@@ -0,0 +1,368 @@
+"""
+Tracing of electric field lines, advancing every line together.
+"""
+
+from typing import Callable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+# pylint: disable=import-error
+from equations.graph_window import GraphWindow
+from equations.infinite_line_charge import InfiniteLineCharge
+from equations.point_charge import PointCharge
+from equations.ring_charge import RingCharge
+
+# pylint: enable=import-error
+
+FieldLines = NamedTuple("FieldLines", [("xs", np.ndarray), ("ys", np.ndarray),
+                                       ("connect", np.ndarray)])
+"""
+The points of every field line, one line after another, and whether each point is connected to the
+next (0 at the last point of each line).
+"""
+
+# Dormand-Prince 5(4) coefficients
+_DP_A = [
+    [],
+    [1 / 5],
+    [3 / 40, 9 / 40],
+    [44 / 45, -56 / 15, 32 / 9],
+    [19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729],
+    [9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656],
+    [35 / 384, 0.0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84],
+]
+_DP_ERROR = np.array([
+    35 / 384 - 5179 / 57600, 0.0, 500 / 1113 - 7571 / 16695, 125 / 192 - 393 / 640,
+    -2187 / 6784 + 92097 / 339200, 11 / 84 - 187 / 2100, -1 / 40
+])
+
+
+class FieldLineTracer:
+    """
+    Traces field lines from seeds around every charge, within a range.
+
+    Lines are integrated by arc length with an adaptive Dormand-Prince (RK45) integrator. All lines
+    are advanced together, so each stage of each step is a single vectorized field evaluation. A
+    line stops when it leaves the range, reaches a charge, or reaches a point where the field
+    vanishes (where its step size collapses).
+    """
+
+    LINES_PER_CHARGE = 12
+    """
+    The number of lines seeded around each point charge and ring of charge.
+    """
+
+    LINE_CHARGE_SPACING = 1 / 8
+    """
+    The spacing between lines seeded along each infinite line charge, relative to the range's size.
+    """
+
+    SEED_DISTANCE = 0.01
+    """
+    How far from a charge its lines are seeded, relative to the range's size. Lines also stop within
+    half this distance of a charge.
+    """
+
+    TOLERANCE = 1e-4
+    """
+    The largest error allowed in a single step, relative to the range's size.
+    """
+
+    MAX_STEP = 1 / 50
+    """
+    The longest step, relative to the range's size, so that lines are drawn smoothly.
+    """
+
+    MIN_STEP = 1e-6
+    """
+    The shortest step, relative to the range's size. Lines whose steps shrink below this have
+    reached a point where the field vanishes.
+    """
+
+    MAX_STEPS = 1000
+    """
+    The most steps taken by any line.
+    """
+
+    def __init__(self, graph_window: GraphWindow, x_range: Tuple[float, float],
+                 y_range: Tuple[float, float]) -> None:
+        """
+        Initialize the tracer over a range.
+
+        Args:
+            graph_window (GraphWindow): The charges to trace the field of.
+            x_range (Tuple[float, float]): The minimum and maximum x position.
+            y_range (Tuple[float, float]): The minimum and maximum y position.
+        """
+
+        self._graph_window = graph_window
+
+        self._x_range = (min(x_range), max(x_range))
+        self._y_range = (min(y_range), max(y_range))
+        self._span = float(np.hypot(self._x_range[1] - self._x_range[0],
+                                    self._y_range[1] - self._y_range[0])) or 1.0
+
+        self._seed_distance = FieldLineTracer.SEED_DISTANCE * self._span
+
+        # Charge geometry, for stopping lines that reach a charge
+        points = [charge for charge in graph_window.charges if isinstance(charge, PointCharge)]
+        self._points = np.array([(charge.position.x, charge.position.y) for charge in points],
+                                dtype=float).reshape(-1, 2)
+
+        line_charges = [
+            charge for charge in graph_window.charges if isinstance(charge, InfiniteLineCharge)
+        ]
+        self._lines = np.array([(charge.x_coef, charge.y_coef, charge.offset)
+                                for charge in line_charges],
+                               dtype=float).reshape(-1, 3)
+        self._lines /= np.hypot(self._lines[:, 0], self._lines[:, 1])[:, None]
+
+        rings = [charge for charge in graph_window.charges if isinstance(charge, RingCharge)]
+        self._rings = np.array([(charge.center.x, charge.center.y, charge.inner_radius,
+                                 charge.outer_radius) for charge in rings],
+                               dtype=float).reshape(-1, 4)
+
+    def seeds(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Seed lines around every charge, traced away from positive charges and towards negative
+        charges.
+
+        Returns:
+            Tuple[ndarray, ndarray, ndarray]: The x and y position of each seed, and the direction
+            to trace it in (1 along the field, -1 against it).
+        """
+
+        xs: List[np.ndarray] = []
+        ys: List[np.ndarray] = []
+        directions: List[np.ndarray] = []
+
+        angles = np.linspace(0, 2 * np.pi, FieldLineTracer.LINES_PER_CHARGE, endpoint=False)
+
+        for charge in self._graph_window.charges:
+            if isinstance(charge, PointCharge):
+                if charge.charge == 0:
+                    continue
+
+                xs.append(charge.position.x + self._seed_distance * np.cos(angles))
+                ys.append(charge.position.y + self._seed_distance * np.sin(angles))
+                directions.append(np.full(angles.size, np.sign(charge.charge)))
+
+            elif isinstance(charge, InfiniteLineCharge):
+                if charge.charge_density == 0:
+                    continue
+
+                line_xs, line_ys = self._line_seeds(charge)
+                xs.append(line_xs)
+                ys.append(line_ys)
+                directions.append(np.full(line_xs.size, np.sign(charge.charge_density)))
+
+            elif isinstance(charge, RingCharge):
+                if charge.charge_density == 0:
+                    continue
+
+                radius = charge.outer_radius + self._seed_distance
+                xs.append(charge.center.x + radius * np.cos(angles))
+                ys.append(charge.center.y + radius * np.sin(angles))
+                directions.append(np.full(angles.size, np.sign(charge.charge_density)))
+
+        if not xs:
+            return np.empty(0), np.empty(0), np.empty(0)
+
+        return np.concatenate(xs), np.concatenate(ys), np.concatenate(directions)
+
+    def trace(self, cancelled: Optional[Callable[[], bool]] = None) -> Optional[FieldLines]:
+        """
+        Trace a line from every seed.
+
+        Args:
+            cancelled (Optional[Callable[[], bool]]): Checked between steps; once it returns True,
+                tracing stops. Defaults to never cancelling.
+
+        Returns:
+            Optional[FieldLines]: Every traced line, or None if tracing was cancelled.
+        """
+
+        seed_xs, seed_ys, directions = self.seeds()
+
+        positions = np.stack((seed_xs, seed_ys), axis=1)
+        steps = np.full(seed_xs.size, FieldLineTracer.MAX_STEP * self._span / 10)
+        active = np.arange(seed_xs.size)
+
+        # Every accepted point, as (line, point) pairs, starting with the seeds.
+        line_indices: List[np.ndarray] = [active]
+        points: List[np.ndarray] = [positions.copy()]
+
+        slopes = self._direction(positions, directions)[0]
+
+        for _ in range(FieldLineTracer.MAX_STEPS):
+            if active.size == 0:
+                break
+
+            if cancelled is not None and cancelled():
+                return None
+
+            current = positions[active]
+            new_positions, new_slopes, error, vanished = self._step(
+                current, slopes[active], steps[active], directions[active])
+
+            tolerance = FieldLineTracer.TOLERANCE * self._span
+            accepted = error <= tolerance
+
+            # Standard step size control for a 5th order method, within limits.
+            factor = np.clip(0.9 * (tolerance / np.maximum(error, 1e-300))**0.2, 0.2, 5.0)
+            steps[active] = np.minimum(steps[active] * factor,
+                                       FieldLineTracer.MAX_STEP * self._span)
+
+            accepted_lines = active[accepted]
+            positions[accepted_lines] = new_positions[accepted]
+            slopes[accepted_lines] = new_slopes[accepted]
+
+            line_indices.append(accepted_lines)
+            points.append(new_positions[accepted])
+
+            finished = (vanished | (steps[active] < FieldLineTracer.MIN_STEP * self._span))
+            finished[accepted] |= self._stopped(new_positions[accepted])
+            active = active[~finished]
+
+        return FieldLineTracer._pack(np.concatenate(line_indices), np.concatenate(points))
+
+    def _step(self, positions: np.ndarray, slopes: np.ndarray, steps: np.ndarray,
+              directions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Take one Dormand-Prince step along each line.
+
+        Args:
+            positions (ndarray): The current position of each line, of shape (lines, 2).
+            slopes (ndarray): The unit direction of each line at its current position.
+            steps (ndarray): The step size of each line.
+            directions (ndarray): The direction to trace each line in.
+
+        Returns:
+            Tuple[ndarray, ndarray, ndarray, ndarray]: The new position of each line, the unit
+            direction at the new position, the estimated error of the step, and whether the field
+            vanished at any stage.
+        """
+
+        stages = [slopes]
+        vanished = np.zeros(steps.shape, dtype=bool)
+
+        for coefficients in _DP_A[1:]:
+            increment = sum(coef * stage for coef, stage in zip(coefficients, stages))
+            stage, stage_vanished = self._direction(positions + steps[:, None] * increment,
+                                                    directions)
+            stages.append(stage)
+            vanished |= stage_vanished
+
+        # The last stage is evaluated at the new position (first same as last).
+        new_positions = positions + steps[:, None] * sum(
+            coef * stage for coef, stage in zip(_DP_A[-1], stages))
+        error_vector = steps[:, None] * sum(
+            coef * stage for coef, stage in zip(_DP_ERROR, stages))
+
+        return new_positions, stages[-1], np.hypot(error_vector[:, 0], error_vector[:, 1]), vanished
+
+    def _direction(self, positions: np.ndarray,
+                   directions: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        The unit direction of the field at each position.
+
+        Args:
+            positions (ndarray): The positions, of shape (lines, 2).
+            directions (ndarray): The direction to trace each line in.
+
+        Returns:
+            Tuple[ndarray, ndarray]: The unit direction at each position (0 where the field
+            vanishes), and whether the field vanishes at each position.
+        """
+
+        e_x, e_y = self._graph_window.electric_field_grid(positions[:, 0], positions[:, 1])
+        magnitude = np.hypot(e_x, e_y)
+        vanished = ~(magnitude > 0.0)
+
+        scale = directions / np.where(vanished, 1.0, magnitude)
+        scale[vanished] = 0.0
+
+        return np.stack((e_x * scale, e_y * scale), axis=1), vanished
+
+    def _stopped(self, positions: np.ndarray) -> np.ndarray:
+        """
+        Whether lines at some positions should stop, having left the range or reached a charge.
+
+        Args:
+            positions (ndarray): The positions, of shape (lines, 2).
+
+        Returns:
+            ndarray: True for each line that should stop.
+        """
+
+        xs, ys = positions[:, 0], positions[:, 1]
+
+        stopped = ((xs < self._x_range[0]) | (xs > self._x_range[1]) | (ys < self._y_range[0])
+                   | (ys > self._y_range[1]))
+
+        near = self._seed_distance / 2
+
+        if self._points.size > 0:
+            stopped |= (np.hypot(xs[:, None] - self._points[:, 0], ys[:, None] - self._points[:, 1])
+                        < near).any(axis=1)
+
+        if self._lines.size > 0:
+            stopped |= (np.abs(xs[:, None] * self._lines[:, 0] + ys[:, None] * self._lines[:, 1]
+                               + self._lines[:, 2]) < near).any(axis=1)
+
+        if self._rings.size > 0:
+            radii = np.hypot(xs[:, None] - self._rings[:, 0], ys[:, None] - self._rings[:, 1])
+            stopped |= ((radii >= self._rings[:, 2]) & (radii <= self._rings[:, 3])).any(axis=1)
+
+        return stopped
+
+    def _line_seeds(self, charge: InfiniteLineCharge) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Seed positions along the visible part of an infinite line charge, on both of its sides.
+
+        Args:
+            charge (InfiniteLineCharge): The line charge.
+
+        Returns:
+            Tuple[ndarray, ndarray]: The x and y position of each seed.
+        """
+
+        norm = np.hypot(charge.x_coef, charge.y_coef)
+        normal_x, normal_y = charge.x_coef / norm, charge.y_coef / norm
+
+        # The point on the line closest to the center of the range
+        center_x, center_y = sum(self._x_range) / 2, sum(self._y_range) / 2
+        distance = (charge.x_coef * center_x + charge.y_coef * center_y + charge.offset) / norm
+        base_x, base_y = center_x - distance * normal_x, center_y - distance * normal_y
+
+        spacing = FieldLineTracer.LINE_CHARGE_SPACING * self._span
+        count = int(np.ceil(self._span / 2 / spacing))
+        along = np.repeat(np.arange(-count, count + 1) * spacing, 2)
+        across = np.tile([self._seed_distance, -self._seed_distance], 2 * count + 1)
+
+        return (base_x - normal_y * along + normal_x * across,
+                base_y + normal_x * along + normal_y * across)
+
+    @staticmethod
+    def _pack(line_indices: np.ndarray, points: np.ndarray) -> FieldLines:
+        """
+        Order every accepted point by line, keeping each line's points in the order they were
+        traced.
+
+        Args:
+            line_indices (ndarray): The line of each point.
+            points (ndarray): The points, of shape (points, 2), in the order they were traced.
+
+        Returns:
+            FieldLines: The points of every line, one line after another.
+        """
+
+        order = np.argsort(line_indices, kind="stable")
+        line_indices, points = line_indices[order], points[order]
+
+        connect = np.ones(line_indices.size, dtype=np.ubyte)
+        if connect.size > 0:
+            connect[:-1] = line_indices[1:] == line_indices[:-1]
+            connect[-1] = 0
+
+        return FieldLines(points[:, 0], points[:, 1], connect)
@@ -0,0 +1,70 @@
+"""
+The electric field magnitude on a dense, image-sized grid.
+"""
+
+from typing import Callable, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+# pylint: disable=import-error
+from equations.graph_window import GraphWindow
+
+# pylint: enable=import-error
+
+MagnitudeGrid = NamedTuple("MagnitudeGrid", [("x_range", Tuple[float, float]),
+                                             ("y_range", Tuple[float, float]),
+                                             ("magnitude", np.ndarray), ("error", float)])
+"""
+The range covered by a grid, the electric field magnitude at the center of each of its cells
+(indexed [x_index, y_index]), and the largest estimated relative error of the field.
+"""
+
+CHUNK_POINTS = 2**16
+"""
+The number of points evaluated together. Larger chunks are no faster, since the charge store
+already splits each evaluation to fit its memory budget, and smaller chunks let a superseded
+evaluation stop sooner.
+"""
+
+
+def magnitude_grid(graph_window: GraphWindow,
+                   x_range: Tuple[float, float],
+                   y_range: Tuple[float, float],
+                   shape: Tuple[int, int],
+                   cancelled: Optional[Callable[[], bool]] = None) -> Optional[MagnitudeGrid]:
+    """
+    Evaluate the electric field magnitude at the center of every cell of a grid, such as one cell
+    per screen pixel.
+
+    Args:
+        graph_window (GraphWindow): The charges to evaluate.
+        x_range (Tuple[float, float]): The minimum and maximum x position.
+        y_range (Tuple[float, float]): The minimum and maximum y position.
+        shape (Tuple[int, int]): The number of cells along x and along y.
+        cancelled (Optional[Callable[[], bool]]): Checked between chunks of points; once it returns
+            True, evaluation stops. Defaults to never cancelling.
+
+    Returns:
+        Optional[MagnitudeGrid]: The magnitude on the grid, or None if evaluation was cancelled.
+    """
+
+    x_cells, y_cells = max(shape[0], 1), max(shape[1], 1)
+    x_step = (x_range[1] - x_range[0]) / x_cells
+    y_step = (y_range[1] - y_range[0]) / y_cells
+    xs = x_range[0] + (np.arange(x_cells) + 0.5) * x_step
+    ys = y_range[0] + (np.arange(y_cells) + 0.5) * y_step
+
+    magnitude = np.empty(x_cells * y_cells)
+    error = 0.0
+
+    # Flattened in [x_index, y_index] order, so each chunk is a run of whole or partial columns.
+    for start in range(0, magnitude.size, CHUNK_POINTS):
+        if cancelled is not None and cancelled():
+            return None
+
+        indices = np.arange(start, min(start + CHUNK_POINTS, magnitude.size))
+        e_x, e_y = graph_window.electric_field_grid(xs[indices // y_cells], ys[indices % y_cells])
+        magnitude[indices] = np.hypot(e_x, e_y)
+        error = max(error, graph_window.multipole_error)
+
+    return MagnitudeGrid(x_range, y_range, magnitude.reshape(x_cells, y_cells), error)
@@ -0,0 +1,282 @@
+"""
+A cache of electric field values on a world-aligned lattice, split into fixed-size tiles.
+"""
+
+import collections
+import math
+import sys
+from typing import Callable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+# pylint: disable=import-error
+from equations.graph_window import GraphWindow
+from equations.superposition import SuperpositionGrid, sync_grids
+
+# pylint: enable=import-error
+
+TileKey = NamedTuple("TileKey", [("x_level", int), ("y_level", int), ("tile_x", int),
+                                 ("tile_y", int)])
+"""
+The key of a single tile: the lattice level along each axis, and the index of the tile along each
+axis.
+"""
+
+LatticeField = NamedTuple("LatticeField", [("xs", np.ndarray), ("ys", np.ndarray),
+                                           ("e_x", np.ndarray), ("e_y", np.ndarray),
+                                           ("error", float)])
+"""
+The lattice points along each axis, the electric field components at every lattice point (indexed
+[x_index, y_index]), and the largest estimated relative error of any tile used.
+"""
+
+
+class FieldTileCache:
+    """
+    A least-recently-used cache of electric field values, stored in tiles of a world-aligned
+    lattice.
+
+    Each zoom level has its own lattice of sample points, at integer multiples of the lattice
+    spacing. Because the lattice does not move with the view, panning only evaluates the tiles that
+    were not visible before. The spacing doubles every ``LEVELS_PER_OCTAVE`` levels, so the lattice
+    of a level is always a subset of the lattice ``LEVELS_PER_OCTAVE`` levels below it.
+
+    When the charges change, each tile is brought up to date by re-evaluating only the charges that
+    changed (see ``SuperpositionGrid``). A new tile copies the quarter of its points it shares with
+    a cached tile one octave coarser, so refining a view only evaluates the points in between, and
+    only the points of a tile within a view are evaluated until another view needs the rest. Every
+    point a view needs is evaluated together, however many tiles it spans.
+    """
+
+    TILE_SIZE = 16
+    """
+    The number of lattice points along each side of a tile.
+    """
+
+    LEVELS_PER_OCTAVE = 8
+    """
+    The number of lattice levels between each doubling of the lattice spacing.
+    """
+
+    DEFAULT_MEMORY_CAP = 64 * 2**20
+    """
+    The default number of bytes of field values to keep cached.
+    """
+
+    def __init__(self, memory_cap: int = DEFAULT_MEMORY_CAP) -> None:
+        """
+        Initialize an empty cache.
+
+        Args:
+            memory_cap (int): The number of bytes of field values to keep cached. Defaults to
+                ``DEFAULT_MEMORY_CAP``.
+        """
+
+        self.memory_cap = memory_cap
+
+        self._tiles: "collections.OrderedDict[TileKey, SuperpositionGrid]" = (
+            collections.OrderedDict())
+        self._bytes = 0
+
+    @staticmethod
+    def lattice_level(span: float, points: int) -> int:
+        """
+        The finest lattice level which fits at most ``points`` lattice points in ``span``.
+
+        Args:
+            span (float): The distance to fit the lattice points in.
+            points (int): The largest number of lattice points to fit.
+
+        Returns:
+            int: The lattice level.
+        """
+
+        intervals = max(points - 1, 1)
+        span = max(span, sys.float_info.min * intervals)
+
+        return math.ceil(FieldTileCache.LEVELS_PER_OCTAVE * math.log2(span / intervals))
+
+    @staticmethod
+    def lattice_spacing(level: int) -> float:
+        """
+        The distance between neighboring lattice points of a level.
+
+        Args:
+            level (int): The lattice level.
+
+        Returns:
+            float: The lattice spacing.
+        """
+
+        octave, step = divmod(level, FieldTileCache.LEVELS_PER_OCTAVE)
+
+        # Scaling by an exact power of 2 keeps the lattices of different octaves exactly nested.
+        return math.ldexp(2.0**(step / FieldTileCache.LEVELS_PER_OCTAVE), octave)
+
+    def clear(self) -> None:
+        """
+        Remove every tile from the cache.
+        """
+
+        self._tiles.clear()
+        self._bytes = 0
+
+    def electric_field(
+            self,
+            graph_window: GraphWindow,
+            x_range: Tuple[float, float],
+            y_range: Tuple[float, float],
+            x_level: int,
+            y_level: int,
+            cancelled: Optional[Callable[[], bool]] = None) -> Optional[LatticeField]:
+        """
+        Get the electric field at every lattice point within a range, evaluating only the points
+        that are not already cached or whose charges have changed.
+
+        If the tiles within the range would not all fit in the cache at once, every lattice point
+        is evaluated directly instead, and the cache is left as it is.
+
+        Args:
+            graph_window (GraphWindow): The charges to evaluate.
+            x_range (Tuple[float, float]): The minimum and maximum x position.
+            y_range (Tuple[float, float]): The minimum and maximum y position.
+            x_level (int): The lattice level along the x axis.
+            y_level (int): The lattice level along the y axis.
+            cancelled (Optional[Callable[[], bool]]): Checked between chunks of points; once it
+                returns True, evaluation stops. Defaults to never cancelling.
+
+        Returns:
+            Optional[LatticeField]: The lattice points within the range and the field at each of
+            them, or None if evaluation was cancelled.
+        """
+
+        x_spacing = FieldTileCache.lattice_spacing(x_level)
+        y_spacing = FieldTileCache.lattice_spacing(y_level)
+
+        x_first, x_last = FieldTileCache._index_range(x_range, x_spacing)
+        y_first, y_last = FieldTileCache._index_range(y_range, y_spacing)
+
+        xs = np.arange(x_first, x_last + 1) * x_spacing
+        ys = np.arange(y_first, y_last + 1) * y_spacing
+
+        size = FieldTileCache.TILE_SIZE
+        tiles_x = range(x_first // size, x_last // size + 1)
+        tiles_y = range(y_first // size, y_last // size + 1)
+
+        # Caching a view that does not fit would only evict its own tiles before they are reused.
+        if len(tiles_x) * len(tiles_y) * size**2 * SuperpositionGrid.BYTES_PER_POINT > (
+                self.memory_cap):
+            grid = SuperpositionGrid(np.repeat(xs, ys.size), np.tile(ys, xs.size))
+            if not sync_grids(graph_window, [(grid, np.ones(grid.xs.shape, dtype=bool))],
+                              cancelled):
+                return None
+
+            return LatticeField(xs, ys, grid.e_x.reshape(xs.size, ys.size),
+                                grid.e_y.reshape(xs.size, ys.size), grid.error)
+
+        # Each tile within the range, the part of the range it covers, and that part of the tile.
+        parts: List[Tuple[TileKey, SuperpositionGrid, Tuple[slice, slice],
+                          Tuple[slice, slice]]] = []
+        for tile_x in tiles_x:
+            x_lo, x_hi = max(x_first, tile_x * size), min(x_last, tile_x * size + size - 1)
+
+            for tile_y in tiles_y:
+                y_lo, y_hi = max(y_first, tile_y * size), min(y_last, tile_y * size + size - 1)
+
+                key = TileKey(x_level, y_level, tile_x, tile_y)
+                tile = self._tiles.get(key)
+                if tile is None:
+                    tile = self._new_tile(key)
+
+                parts.append((key, tile, (slice(x_lo - x_first, x_hi - x_first + 1),
+                                          slice(y_lo - y_first, y_hi - y_first + 1)),
+                              (slice(x_lo - tile_x * size, x_hi - tile_x * size + 1),
+                               slice(y_lo - tile_y * size, y_hi - tile_y * size + 1))))
+
+        needed = []
+        for _, tile, _, src in parts:
+            mask = np.zeros((size, size), dtype=bool)
+            mask[src] = True
+            needed.append((tile, mask.ravel()))
+
+        if not sync_grids(graph_window, needed, cancelled):
+            return None
+
+        e_x = np.empty((xs.size, ys.size))
+        e_y = np.empty(e_x.shape)
+        error = 0.0
+
+        for key, tile, out, src in parts:
+            if self._tiles.pop(key, None) is not None:
+                self._bytes -= tile.nbytes
+            self._tiles[key] = tile
+            self._bytes += tile.nbytes
+
+            e_x[out] = tile.e_x.reshape(size, size)[src]
+            e_y[out] = tile.e_y.reshape(size, size)[src]
+            error = max(error, tile.error)
+
+        # Evict the least recently used tiles. The tiles of this range were used last, and fit.
+        while self._bytes > self.memory_cap:
+            _, evicted = self._tiles.popitem(last=False)
+            self._bytes -= evicted.nbytes
+
+        return LatticeField(xs, ys, e_x, e_y, error)
+
+    def _new_tile(self, key: TileKey) -> SuperpositionGrid:
+        """
+        Create a tile, copying the points it shares with a cached tile one octave coarser.
+
+        Args:
+            key (TileKey): The tile to create.
+
+        Returns:
+            SuperpositionGrid: The tile, with its lattice points flattened in [x_index, y_index]
+            order.
+        """
+
+        size = FieldTileCache.TILE_SIZE
+        indices = np.arange(size)
+        tile_xs = (key.tile_x * size + indices) * FieldTileCache.lattice_spacing(key.x_level)
+        tile_ys = (key.tile_y * size + indices) * FieldTileCache.lattice_spacing(key.y_level)
+
+        tile = SuperpositionGrid(np.repeat(tile_xs, size), np.tile(tile_ys, size))
+
+        # Every other point of this tile is also a point of the next coarser lattice.
+        coarse = self._tiles.get(
+            TileKey(key.x_level + FieldTileCache.LEVELS_PER_OCTAVE,
+                    key.y_level + FieldTileCache.LEVELS_PER_OCTAVE, key.tile_x // 2,
+                    key.tile_y // 2))
+        if coarse is not None:
+            half = size // 2
+            shared = np.arange(0, size, 2)
+            coarse_shared = np.arange(half)
+
+            tile.seed(
+                coarse,
+                ((key.tile_x % 2 * half + coarse_shared)[:, None] * size
+                 + (key.tile_y % 2 * half + coarse_shared)[None, :]).ravel(),
+                (shared[:, None] * size + shared[None, :]).ravel())
+
+        return tile
+
+    @staticmethod
+    def _index_range(value_range: Tuple[float, float], spacing: float) -> Tuple[int, int]:
+        """
+        The first and last lattice indices within a range, always including at least one index.
+
+        Args:
+            value_range (Tuple[float, float]): The minimum and maximum position.
+            spacing (float): The lattice spacing.
+
+        Returns:
+            Tuple[int, int]: The first and last lattice index.
+        """
+
+        first = math.ceil(min(value_range) / spacing)
+        last = math.floor(max(value_range) / spacing)
+
+        if last < first:
+            first = last = round((value_range[0] + value_range[1]) / 2 / spacing)
+
+        return first, last
@@ -0,0 +1,445 @@
+"""
+Evaluation of the electric field on a background thread, keeping only the newest request.
+"""
+
+import math
+import time
+from typing import NamedTuple, Optional, Sequence, Tuple
+
+from PyQt6 import QtCore
+
+# pylint: disable=import-error
+from equations.adaptive_sampling import AdaptiveSampler
+from equations.base_charge import ChargeSnapshot
+from equations.contours import EquipotentialCache
+from equations.field_magnitude import magnitude_grid
+from equations.field_lines import FieldLineTracer
+from equations.field_tile_cache import FieldTileCache
+from equations.graph_window import GraphWindow
+
+# pylint: enable=import-error
+
+FieldRequest = NamedTuple("FieldRequest", [("generation", int),
+                                           ("snapshot", Tuple[ChargeSnapshot, ...]),
+                                           ("multipole_accuracy", Optional[float]),
+                                           ("x_range", Tuple[float, float]),
+                                           ("y_range", Tuple[float, float]),
+                                           ("levels", Tuple[Tuple[int, int], ...])])
+"""
+Everything needed to evaluate the field on a series of lattices, independently of the charges on
+the main thread. ``levels`` holds the x and y lattice level of each pass, from coarsest to finest.
+"""
+
+AdaptiveRequest = NamedTuple("AdaptiveRequest", [("generation", int),
+                                                 ("snapshot", Tuple[ChargeSnapshot, ...]),
+                                                 ("multipole_accuracy", Optional[float]),
+                                                 ("x_range", Tuple[float, float]),
+                                                 ("y_range", Tuple[float, float]),
+                                                 ("point_budget", int),
+                                                 ("min_cell_size", Tuple[float, float])])
+"""
+Everything needed to sample the field adaptively (see ``AdaptiveSampler``), independently of the
+charges on the main thread.
+"""
+
+FieldLineRequest = NamedTuple("FieldLineRequest", [("generation", int),
+                                                   ("snapshot", Tuple[ChargeSnapshot, ...]),
+                                                   ("multipole_accuracy", Optional[float]),
+                                                   ("x_range", Tuple[float, float]),
+                                                   ("y_range", Tuple[float, float])])
+"""
+Everything needed to trace field lines (see ``FieldLineTracer``), independently of the charges on
+the main thread.
+"""
+
+EquipotentialRequest = NamedTuple("EquipotentialRequest",
+                                  [("generation", int), ("snapshot", Tuple[ChargeSnapshot, ...]),
+                                   ("x_range", Tuple[float, float]),
+                                   ("y_range", Tuple[float, float]), ("shape", Tuple[int, int]),
+                                   ("spacing", Optional[float])])
+"""
+Everything needed to extract equipotential contours (see ``EquipotentialCache``), independently of
+the charges on the main thread.
+"""
+
+MagnitudeRequest = NamedTuple("MagnitudeRequest", [("generation", int),
+                                                   ("snapshot", Tuple[ChargeSnapshot, ...]),
+                                                   ("multipole_accuracy", Optional[float]),
+                                                   ("x_range", Tuple[float, float]),
+                                                   ("y_range", Tuple[float, float]),
+                                                   ("shape", Tuple[int, int])])
+"""
+Everything needed to evaluate the field magnitude on a dense grid (see ``magnitude_grid``),
+independently of the charges on the main thread.
+"""
+
+
+class FieldWorker(QtCore.QObject):
+    """
+    Evaluates the electric field on a single background thread, so the GUI never blocks on it.
+
+    The worker never touches the caller's charges. Each request carries a snapshot of them, which
+    the worker's own ``GraphWindow`` is brought in line with (only re-evaluating the charges that
+    differ). Each request supersedes every earlier one: superseded requests that have not started
+    are dropped, and a running request stops at the next tile. Only the newest result is emitted.
+
+    A request can be refined over several passes, from a coarse lattice to a fine one, emitting the
+    result of each pass. Passes too coarse to be worth showing are skipped: evaluation starts at the
+    finest pass expected to finish within ``FRAME_BUDGET``.
+    """
+
+    FRAME_BUDGET = 1 / 60
+    """
+    The number of seconds the first pass of a request should take to evaluate.
+    """
+
+    field_ready = QtCore.pyqtSignal(int, object)
+    """
+    Emitted with the generation of a request and its result once it (or each of its passes) has been
+    evaluated. The result is a ``LatticeField`` for ``request``, an ``AdaptiveField`` for
+    ``request_adaptive``, ``FieldLines`` for ``request_field_lines``, ``Contours`` for
+    ``request_equipotentials`` and a ``MagnitudeGrid`` for ``request_magnitude``.
+    """
+
+    def __init__(self, parent: Optional[QtCore.QObject] = None) -> None:
+        super().__init__(parent)
+
+        self.generation = 0
+        """
+        The generation of the newest request. Results of any other generation are stale.
+        """
+
+        # A single thread, so the graph window and the tile cache are only ever used by one thread.
+        self._pool = QtCore.QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+
+        self._graph_window = GraphWindow()
+        self._graph_window.charges_updated = lambda: None
+
+        self._tile_cache = FieldTileCache()
+        self._equipotentials = EquipotentialCache()
+
+        # Estimate of the evaluation time per lattice point, for choosing the first pass. Unknown
+        # until the first pass has been evaluated, so the first request starts at its coarsest pass.
+        self._seconds_per_point = math.inf
+
+    def request(self, snapshot: Tuple[ChargeSnapshot, ...], multipole_accuracy: Optional[float],
+                x_range: Tuple[float, float], y_range: Tuple[float, float],
+                levels: Sequence[Tuple[int, int]]) -> int:
+        """
+        Request the electric field on a series of lattices, superseding any earlier request.
+
+        Args:
+            snapshot (Tuple[ChargeSnapshot, ...]): The charges to evaluate.
+            multipole_accuracy (Optional[float]): The multipole accuracy to evaluate with.
+            x_range (Tuple[float, float]): The minimum and maximum x position.
+            y_range (Tuple[float, float]): The minimum and maximum y position.
+            levels (Sequence[Tuple[int, int]]): The x and y lattice level of each pass, from
+                coarsest to finest.
+
+        Returns:
+            int: The generation of the request, emitted alongside each of its results.
+        """
+
+        self.cancel()
+
+        request = FieldRequest(self.generation, snapshot, multipole_accuracy, x_range, y_range,
+                               tuple(levels))
+        self._pool.start(lambda: self._evaluate(request))
+
+        return request.generation
+
+    def request_adaptive(self, snapshot: Tuple[ChargeSnapshot, ...],
+                         multipole_accuracy: Optional[float], x_range: Tuple[float, float],
+                         y_range: Tuple[float, float], point_budget: int,
+                         min_cell_size: Tuple[float, float]) -> int:
+        """
+        Request the electric field sampled adaptively, superseding any earlier request.
+
+        Args:
+            snapshot (Tuple[ChargeSnapshot, ...]): The charges to evaluate.
+            multipole_accuracy (Optional[float]): The multipole accuracy to evaluate with.
+            x_range (Tuple[float, float]): The minimum and maximum x position.
+            y_range (Tuple[float, float]): The minimum and maximum y position.
+            point_budget (int): The largest number of points to evaluate the field at.
+            min_cell_size (Tuple[float, float]): The smallest width and height of a cell.
+
+        Returns:
+            int: The generation of the request, emitted alongside its result.
+        """
+
+        self.cancel()
+
+        request = AdaptiveRequest(self.generation, snapshot, multipole_accuracy, x_range, y_range,
+                                  point_budget, min_cell_size)
+        self._pool.start(lambda: self._evaluate_adaptive(request))
+
+        return request.generation
+
+    def request_field_lines(self, snapshot: Tuple[ChargeSnapshot, ...],
+                            multipole_accuracy: Optional[float], x_range: Tuple[float, float],
+                            y_range: Tuple[float, float]) -> int:
+        """
+        Request field lines traced within a range, superseding any earlier request.
+
+        Args:
+            snapshot (Tuple[ChargeSnapshot, ...]): The charges to trace the field of.
+            multipole_accuracy (Optional[float]): The multipole accuracy to evaluate with.
+            x_range (Tuple[float, float]): The minimum and maximum x position.
+            y_range (Tuple[float, float]): The minimum and maximum y position.
+
+        Returns:
+            int: The generation of the request, emitted alongside its result.
+        """
+
+        self.cancel()
+
+        request = FieldLineRequest(self.generation, snapshot, multipole_accuracy, x_range,
+                                   y_range)
+        self._pool.start(lambda: self._trace_field_lines(request))
+
+        return request.generation
+
+    def request_equipotentials(self, snapshot: Tuple[ChargeSnapshot, ...],
+                               x_range: Tuple[float, float], y_range: Tuple[float, float],
+                               shape: Tuple[int, int], spacing: Optional[float]) -> int:
+        """
+        Request equipotential contours over a grid, superseding any earlier request.
+
+        Args:
+            snapshot (Tuple[ChargeSnapshot, ...]): The charges to evaluate.
+            x_range (Tuple[float, float]): The minimum and maximum x position.
+            y_range (Tuple[float, float]): The minimum and maximum y position.
+            shape (Tuple[int, int]): The number of x and y positions of the grid.
+            spacing (Optional[float]): The difference in potential between neighboring contours,
+                or None to choose the contours automatically.
+
+        Returns:
+            int: The generation of the request, emitted alongside its result.
+        """
+
+        self.cancel()
+
+        request = EquipotentialRequest(self.generation, snapshot, x_range, y_range, shape,
+                                       spacing)
+        self._pool.start(lambda: self._extract_equipotentials(request))
+
+        return request.generation
+
+    def request_magnitude(self, snapshot: Tuple[ChargeSnapshot, ...],
+                          multipole_accuracy: Optional[float], x_range: Tuple[float, float],
+                          y_range: Tuple[float, float], shape: Tuple[int, int]) -> int:
+        """
+        Request the electric field magnitude on a dense grid, superseding any earlier request.
+
+        Args:
+            snapshot (Tuple[ChargeSnapshot, ...]): The charges to evaluate.
+            multipole_accuracy (Optional[float]): The multipole accuracy to evaluate with.
+            x_range (Tuple[float, float]): The minimum and maximum x position.
+            y_range (Tuple[float, float]): The minimum and maximum y position.
+            shape (Tuple[int, int]): The number of cells along x and along y.
+
+        Returns:
+            int: The generation of the request, emitted alongside its result.
+        """
+
+        self.cancel()
+
+        request = MagnitudeRequest(self.generation, snapshot, multipole_accuracy, x_range, y_range,
+                                   shape)
+        self._pool.start(lambda: self._evaluate_magnitude(request))
+
+        return request.generation
+
+    def cancel(self) -> None:
+        """
+        Cancel every outstanding request.
+        """
+
+        self.generation += 1
+        self._pool.clear()
+
+    def wait(self) -> None:
+        """
+        Block until every outstanding request has finished or been cancelled.
+        """
+
+        self._pool.waitForDone()
+
+    def _evaluate(self, request: FieldRequest) -> None:
+        """
+        Evaluate a request on the worker thread, emitting its result unless it was superseded.
+
+        Args:
+            request (FieldRequest): The request to evaluate.
+        """
+
+        def superseded() -> bool:
+            return request.generation != self.generation
+
+        if superseded():
+            return
+
+        if not self._load_snapshot(request.snapshot):
+            return
+        self._graph_window.multipole_accuracy = request.multipole_accuracy
+
+        for x_level, y_level in request.levels[self._first_pass(request):]:
+            start = time.perf_counter()
+            field = self._tile_cache.electric_field(self._graph_window, request.x_range,
+                                                    request.y_range, x_level, y_level, superseded)
+
+            if field is None or superseded():
+                return
+
+            # Passes served from the cache are much faster than evaluating, so only let the
+            # estimate decay slowly towards them.
+            seconds_per_point = (time.perf_counter() - start) / field.e_x.size
+            self._seconds_per_point = (seconds_per_point if math.isinf(self._seconds_per_point)
+                                       else max(seconds_per_point, self._seconds_per_point / 2))
+            self.field_ready.emit(request.generation, field)
+
+    def _evaluate_adaptive(self, request: AdaptiveRequest) -> None:
+        """
+        Sample a request on the worker thread, emitting its result unless it was superseded.
+
+        Args:
+            request (AdaptiveRequest): The request to sample.
+        """
+
+        def superseded() -> bool:
+            return request.generation != self.generation
+
+        if superseded():
+            return
+
+        if not self._load_snapshot(request.snapshot):
+            return
+        self._graph_window.multipole_accuracy = request.multipole_accuracy
+
+        field = AdaptiveSampler(self._graph_window, request.x_range, request.y_range,
+                                request.point_budget, request.min_cell_size).sample(superseded)
+
+        if field is not None and not superseded():
+            self.field_ready.emit(request.generation, field)
+
+    def _trace_field_lines(self, request: FieldLineRequest) -> None:
+        """
+        Trace the field lines of a request on the worker thread, emitting them unless the request
+        was superseded.
+
+        Args:
+            request (FieldLineRequest): The request to trace.
+        """
+
+        def superseded() -> bool:
+            return request.generation != self.generation
+
+        if superseded():
+            return
+
+        if not self._load_snapshot(request.snapshot):
+            return
+        self._graph_window.multipole_accuracy = request.multipole_accuracy
+
+        lines = FieldLineTracer(self._graph_window, request.x_range,
+                                request.y_range).trace(superseded)
+
+        if lines is not None and not superseded():
+            self.field_ready.emit(request.generation, lines)
+
+    def _extract_equipotentials(self, request: EquipotentialRequest) -> None:
+        """
+        Extract the contours of a request on the worker thread, emitting them unless the request was
+        superseded.
+
+        Args:
+            request (EquipotentialRequest): The request to extract.
+        """
+
+        def superseded() -> bool:
+            return request.generation != self.generation
+
+        if superseded():
+            return
+
+        if not self._load_snapshot(request.snapshot):
+            return
+
+        contours = self._equipotentials.contours(self._graph_window, request.x_range,
+                                                 request.y_range, request.shape, request.spacing,
+                                                 superseded)
+
+        if contours is not None and not superseded():
+            self.field_ready.emit(request.generation, contours)
+
+    def _evaluate_magnitude(self, request: MagnitudeRequest) -> None:
+        """
+        Evaluate the magnitude grid of a request on the worker thread, emitting it unless the
+        request was superseded.
+
+        Args:
+            request (MagnitudeRequest): The request to evaluate.
+        """
+
+        def superseded() -> bool:
+            return request.generation != self.generation
+
+        if superseded():
+            return
+
+        if not self._load_snapshot(request.snapshot):
+            return
+        self._graph_window.multipole_accuracy = request.multipole_accuracy
+
+        grid = magnitude_grid(self._graph_window, request.x_range, request.y_range, request.shape,
+                              superseded)
+
+        if grid is not None and not superseded():
+            self.field_ready.emit(request.generation, grid)
+
+    def _load_snapshot(self, snapshot: Tuple[ChargeSnapshot, ...]) -> bool:
+        """
+        Change the worker's charges to match a request's snapshot.
+
+        A charge that cannot be rebuilt from its snapshot would otherwise raise on a pool thread and
+        abort the application, so the request is dropped instead, leaving the charges unchanged.
+
+        Args:
+            snapshot (Tuple[ChargeSnapshot, ...]): The charges of the request.
+
+        Returns:
+            bool: Whether the charges were loaded.
+        """
+
+        try:
+            self._graph_window.load_snapshot(snapshot)
+        except Exception:  # pylint: disable=broad-except
+            return False
+
+        return True
+
+    def _first_pass(self, request: FieldRequest) -> int:
+        """
+        Find the finest pass of a request expected to evaluate within ``FRAME_BUDGET``.
+
+        Args:
+            request (FieldRequest): The request to evaluate.
+
+        Returns:
+            int: The index of the first pass to evaluate, or 0 if even the coarsest pass is too
+            slow.
+        """
+
+        x_span = abs(request.x_range[1] - request.x_range[0])
+        y_span = abs(request.y_range[1] - request.y_range[0])
+
+        for index in range(len(request.levels) - 1, 0, -1):
+            x_level, y_level = request.levels[index]
+            points = ((x_span / FieldTileCache.lattice_spacing(x_level) + 1)
+                      * (y_span / FieldTileCache.lattice_spacing(y_level) + 1))
+
+            if points * self._seconds_per_point <= FieldWorker.FRAME_BUDGET:
+                return index
+
+        return 0
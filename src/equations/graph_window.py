@@ -2,23 +2,39 @@
 A graph window, holding the electric field of arbitrary charge distributions.
 """
 
-from typing import Callable, List, Optional
+import collections
+import functools
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
 
 import numpy as np
 from sympy import Basic
 
 # pylint: disable=import-error
-from equations.base_charge import BaseCharge
+from equations.base_charge import BaseCharge, ChargeSnapshot
+from equations.charge_store import ChargeStore
 from equations.constants import Point2D
+from equations.equation_cache import EquationCache
 
 # pylint: enable=import-error
 
+ChargeChanges = NamedTuple("ChargeChanges", [("removed", List[ChargeSnapshot]),
+                                             ("added", List[ChargeSnapshot])])
+"""
+The charges removed and added between two versions of a ``GraphWindow``. A charge that was edited is
+removed with its old parameters and added with its new ones.
+"""
+
 
 class GraphWindow:
     """
     A collection of charges, to be graphed
     """
 
+    MAX_CHANGES = 256
+    """
+    The number of most recent changes remembered by ``charge_changes``.
+    """
+
     charges_updated: Callable[[], None]
     """
     A signal to be emitted when an aspect of any charge, or the list of charges, changes.
@@ -39,6 +55,66 @@ class GraphWindow:
 
         self._removed_charges: List[BaseCharge] = []
 
+        self.version = 0
+        """
+        A counter incremented on every change to the charges, so that results computed from the
+        charges can be cached until they change.
+        """
+
+        # The charges removed and added by each of the most recent changes, starting at version
+        # ``_changes_start``. None marks a change that invalidates every cached result.
+        self._changes: List[Optional[ChargeChanges]] = []
+        self._changes_start = 0
+
+        # The parameters of every connected charge when it was last seen, keyed by ``id``, so that
+        # updates which change nothing can be ignored.
+        self._snapshots: Dict[int, ChargeSnapshot] = {}
+
+        # Columnar copy of ``charges``, kept in sync with every change so that charges of the same
+        # type are evaluated together.
+        self._store = ChargeStore(self.charges)
+
+        self.equation_cache = EquationCache()
+        """
+        The simplified equations of recently seen charges, so only new or edited charges are
+        simplified again.
+        """
+
+        for charge in self.charges:
+            self._connect_charge(charge)
+
+    @property
+    def multipole_accuracy(self) -> Optional[float]:
+        """
+        The opening angle (between 0 and 1) used to evaluate large numbers of point charges with a
+        Barnes-Hut quadtree, or None to always sum every charge directly.
+
+        Smaller values are more accurate and slower. The quadtree is only used once there are at
+        least ``ChargeStore.MULTIPOLE_MIN_CHARGES`` point charges.
+        """
+
+        return self._store.multipole_accuracy
+
+    @multipole_accuracy.setter
+    def multipole_accuracy(self, accuracy: Optional[float]) -> None:
+        if accuracy is not None and not 0.0 < accuracy < 1.0:
+            raise RuntimeError(f"Multipole accuracy {accuracy} must be between 0 and 1")
+
+        if accuracy != self._store.multipole_accuracy:
+            self._store.multipole_accuracy = accuracy
+
+            # Approximate fields computed with a different accuracy are no longer valid.
+            self._record_change(None)
+
+    @property
+    def multipole_error(self) -> float:
+        """
+        The estimated relative (root mean square) error of the most recent ``electric_field_grid``
+        call, which is 0 unless the quadtree was used.
+        """
+
+        return self._store.multipole_error
+
     def add_charge(self, point_charge: BaseCharge) -> None:
         """
         Add point charge to the test window.
@@ -48,9 +124,11 @@ class GraphWindow:
         """
 
         self.charges.append(point_charge)
+        self._store.add(point_charge)
 
-        point_charge.charge_updated = self.charges_updated
+        self._connect_charge(point_charge)
 
+        self._record_change(ChargeChanges([], [self._snapshots[id(point_charge)]]))
         self.charges_updated()
 
     def remove_last_charge(self) -> None:
@@ -61,8 +139,11 @@ class GraphWindow:
         if len(self.charges) > 0:
             charge = self.charges.pop()
             self._removed_charges.append(charge)
-            charge.charge_updated = lambda: None
+            self._store.remove(charge)
+            snapshot = self._snapshots[id(charge)]
+            self._disconnect_charge(charge)
 
+            self._record_change(ChargeChanges([snapshot], []))
             self.charges_updated()
 
     def undo_charge_removal(self) -> None:
@@ -73,8 +154,10 @@ class GraphWindow:
         if len(self._removed_charges) > 0:
             charge = self._removed_charges.pop()
             self.charges.append(charge)
-            charge.charge_updated = self.charges_updated
+            self._store.add(charge)
+            self._connect_charge(charge)
 
+            self._record_change(ChargeChanges([], [self._snapshots[id(charge)]]))
             self.charges_updated()
 
     def remove_all_charges(self) -> None:
@@ -84,11 +167,15 @@ class GraphWindow:
         """
 
         if len(self.charges) > 0:
+            removed = [self._snapshots[id(charge)] for charge in self.charges]
+
             for charge in self.charges:
-                charge.charge_updated = lambda: None
+                self._disconnect_charge(charge)
                 self._removed_charges.append(charge)
 
+            self._record_change(ChargeChanges(removed, []))
             self.charges = []
+            self._store.clear()
             self.charges_updated()
 
     def readd_all_charges(self) -> None:
@@ -99,12 +186,60 @@ class GraphWindow:
 
         if len(self._removed_charges) > 0:
             for charge in self._removed_charges:
-                charge.charge_updated = self.charges_updated
+                self._connect_charge(charge)
                 self.charges.append(charge)
+                self._store.add(charge)
 
+            added = [self._snapshots[id(charge)] for charge in self._removed_charges]
+            self._record_change(ChargeChanges([], added))
             self._removed_charges = []
             self.charges_updated()
 
+    def load_snapshot(self, snapshot: Tuple[ChargeSnapshot, ...]) -> None:
+        """
+        Change the charges to match a snapshot, keeping every charge that is already present.
+
+        Only the charges that differ between the current charges and the snapshot are removed or
+        added, so results cached from the current charges can be updated incrementally. The order
+        of ``charges`` may differ from the order of the snapshot.
+
+        Args:
+            snapshot (Tuple[ChargeSnapshot, ...]): The charges to match, such as from ``snapshot``.
+        """
+
+        remaining = collections.Counter(snapshot)
+        kept: List[BaseCharge] = []
+        removed: List[BaseCharge] = []
+
+        for charge in self.charges:
+            charge_snapshot = self._snapshots[id(charge)]
+            if remaining[charge_snapshot] > 0:
+                remaining[charge_snapshot] -= 1
+                kept.append(charge)
+            else:
+                removed.append(charge)
+
+        added_snapshots = list(remaining.elements())
+        added = [charge_snapshot.to_charge() for charge_snapshot in added_snapshots]
+
+        if not removed and not added:
+            return
+
+        removed_snapshots = [self._snapshots[id(charge)] for charge in removed]
+
+        for charge in removed:
+            self._store.remove(charge)
+            self._disconnect_charge(charge)
+
+        for charge in added:
+            self._store.add(charge)
+            self._connect_charge(charge)
+
+        self.charges = kept + added
+
+        self._record_change(ChargeChanges(removed_snapshots, added_snapshots))
+        self.charges_updated()
+
     def net_electric_field(self, position: Point2D) -> float:
         """
         Calculate the net electric field magnitude at a point
@@ -116,7 +251,9 @@ class GraphWindow:
             float: magnitude of electric field
         """
 
-        return np.sqrt(self.electric_field_x(position)**2 + self.electric_field_y(position)**2)
+        e_x, e_y = self.electric_field_grid(position.x, position.y)
+
+        return float(np.hypot(e_x, e_y))
 
     def electric_field_x(self, position: Point2D) -> float:
         """
@@ -158,6 +295,93 @@ class GraphWindow:
 
         return e_y
 
+    def electric_field_grid(self, xs: np.ndarray,
+                            ys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Calculate both components of the net electric field at many points at once.
+
+        ``xs`` and ``ys`` are broadcast against each other. Non-finite contributions from any charge
+        are dropped, matching ``electric_field_x`` and ``electric_field_y``. Charges of the same
+        type are evaluated together, in chunks bounded by the store's memory budget.
+
+        Args:
+            xs (ndarray): x positions to measure the electric field at.
+            ys (ndarray): y positions to measure the electric field at.
+
+        Returns:
+            Tuple[ndarray, ndarray]: x and y components of the net electric field at each point.
+        """
+
+        xs, ys = np.broadcast_arrays(np.asarray(xs, dtype=float), np.asarray(ys, dtype=float))
+
+        e_x, e_y = self._store.electric_field(xs.ravel(), ys.ravel())
+
+        return e_x.reshape(xs.shape), e_y.reshape(ys.shape)
+
+    def potential_grid(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """
+        Calculate the net electric potential at many points at once.
+
+        ``xs`` and ``ys`` are broadcast against each other, and non-finite contributions from any
+        charge are dropped, as in ``electric_field_grid``.
+
+        Args:
+            xs (ndarray): x positions to measure the potential at.
+            ys (ndarray): y positions to measure the potential at.
+
+        Returns:
+            ndarray: The net electric potential at each point.
+        """
+
+        xs, ys = np.broadcast_arrays(np.asarray(xs, dtype=float), np.asarray(ys, dtype=float))
+
+        return self._store.potential(xs.ravel(), ys.ravel()).reshape(xs.shape)
+
+    def snapshot(self) -> Tuple[ChargeSnapshot, ...]:
+        """
+        Take an immutable, hashable copy of every charge's current parameters.
+
+        Returns:
+            Tuple[ChargeSnapshot, ...]: A snapshot of each charge, in the same order as ``charges``.
+        """
+
+        return tuple(self._snapshots[id(charge)] for charge in self.charges)
+
+    def charge_changes(self, version: int) -> Optional[ChargeChanges]:
+        """
+        Get the charges removed and added since a version.
+
+        A charge that was added and then removed again (or edited and then changed back) cancels
+        out, so only the net change is returned.
+
+        Args:
+            version (int): The version to compare against.
+
+        Returns:
+            Optional[ChargeChanges]: The charges removed and added since ``version``, or None if the
+            changes are no longer known or cannot be described per charge.
+        """
+
+        if version < self._changes_start or version > self.version:
+            return None
+
+        removed: "collections.Counter[ChargeSnapshot]" = collections.Counter()
+        added: "collections.Counter[ChargeSnapshot]" = collections.Counter()
+
+        for change in self._changes[version - self._changes_start:]:
+            if change is None:
+                return None
+
+            for snapshot in change.removed:
+                if added[snapshot] > 0:
+                    added[snapshot] -= 1
+                else:
+                    removed[snapshot] += 1
+
+            added.update(change.added)
+
+        return ChargeChanges(list(removed.elements()), list(added.elements()))
+
     def electric_field_mag_eqns(self) -> List[Basic]:
         """
         Get each charge's electric field magnitude equation.
@@ -167,7 +391,7 @@ class GraphWindow:
             magnitude.
         """
 
-        return [charge.electric_field_mag_eqn().simplify() for charge in self.charges]
+        return [self.equation_cache.equation(snapshot, "mag") for snapshot in self.snapshot()]
 
     def electric_field_x_eqns(self) -> List[Basic]:
         """
@@ -179,7 +403,7 @@ class GraphWindow:
             x-component equation.
         """
 
-        return [charge.electric_field_x_eqn().simplify() for charge in self.charges]
+        return [self.equation_cache.equation(snapshot, "x") for snapshot in self.snapshot()]
 
     def electric_field_y_eqns(self) -> List[Basic]:
         """
@@ -191,4 +415,64 @@ class GraphWindow:
             y-component equation.
         """
 
-        return [charge.electric_field_y_eqn().simplify() for charge in self.charges]
+        return [self.equation_cache.equation(snapshot, "y") for snapshot in self.snapshot()]
+
+    def _record_change(self, change: Optional[ChargeChanges]) -> None:
+        """
+        Increment ``version``, remembering which charges the change removed and added.
+
+        Args:
+            change (Optional[ChargeChanges]): The charges that were removed and added, or None if
+                every cached result is invalidated.
+        """
+
+        self.version += 1
+        self._changes.append(change)
+
+        if len(self._changes) > GraphWindow.MAX_CHANGES:
+            del self._changes[0]
+            self._changes_start += 1
+
+    def _connect_charge(self, charge: BaseCharge) -> None:
+        """
+        Listen for changes to a charge, keeping the charge store in sync before notifying listeners.
+
+        Args:
+            charge (BaseCharge): The charge to listen to.
+        """
+
+        charge.charge_updated = functools.partial(self._charge_updated, charge)
+        self._snapshots[id(charge)] = charge.snapshot()
+
+    def _disconnect_charge(self, charge: BaseCharge) -> None:
+        """
+        Stop listening for changes to a charge.
+
+        Args:
+            charge (BaseCharge): The charge to stop listening to.
+        """
+
+        charge.charge_updated = lambda: None
+        self._snapshots.pop(id(charge), None)
+
+    def _charge_updated(self, charge: BaseCharge) -> None:
+        """
+        A charge has changed, so update its stored parameters and emit ``charges_updated``.
+
+        Nothing is emitted if the charge's parameters are the same as before.
+
+        Args:
+            charge (BaseCharge): The charge that changed.
+        """
+
+        snapshot = charge.snapshot()
+        old_snapshot = self._snapshots.get(id(charge))
+        if snapshot == old_snapshot:
+            return
+
+        self._snapshots[id(charge)] = snapshot
+        self._store.update(charge)
+
+        self._record_change(ChargeChanges([old_snapshot] if old_snapshot is not None else [],
+                                          [snapshot]))
+        self.charges_updated()
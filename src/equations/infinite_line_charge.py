@@ -10,13 +10,19 @@ from PyQt6 import QtCore, QtWidgets
 from sympy.abc import x, y
 
 # pylint: disable=import-error
-from equations.base_charge import BaseCharge
-from equations.constants import COULOMB_CONSTANT, COULOMB_CONSTANT_SYM, Point2D
-from equations.sympy_helper import clean_inequality
+from equations.base_charge import BaseCharge, FieldEquations, memoize_templates
+from equations.constants import (COULOMB_CONSTANT, COULOMB_CONSTANT_SYM,
+                                 POTENTIAL_REFERENCE_DISTANCE, Point2D)
+from equations.sympy_helper import bounded_simplify, clean_inequality
 from view.multi_line_input_dialog import MultiLineInputDialog
 
 # pylint: enable=import-error
 
+# The parameters of the equations shared by every infinite line charge. The coefficients are
+# magnitudes, with their signs fixed by each set of equations.
+_X_COEF, _Y_COEF = sympy.symbols("a b", positive=True)
+_OFFSET, _CHARGE_DENSITY = sympy.symbols("c lambda", real=True)
+
 
 class InfiniteLineCharge(BaseCharge):
     """
@@ -50,6 +56,18 @@ class InfiniteLineCharge(BaseCharge):
         self.offset = offset
         self.charge_density = charge_density
 
+    def parameters(self) -> Tuple[float, float, float, float]:
+        """
+        The arguments that construct an infinite line charge identical to this one.
+
+        Returns:
+            Tuple[float, float, float, float]: The x coefficient, y coefficient, offset and charge
+            density.
+        """
+
+        return (float(self.x_coef), float(self.y_coef), float(self.offset),
+                float(self.charge_density))
+
     def electric_field_magnitude(self, point: Point2D) -> float:
         """
         The net magnitude of the electric field at the given point.
@@ -112,6 +130,114 @@ class InfiniteLineCharge(BaseCharge):
 
         return magnitude
 
+    def electric_field(self, xs: np.ndarray, ys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Calculate both components of the electric field generated by the infinite line charge at
+        many points at once.
+
+        Args:
+            xs (ndarray): x positions of the test points.
+            ys (ndarray): y positions of the test points.
+
+        Returns:
+            Tuple[ndarray, ndarray]: x and y components of the electric field at each point.
+        """
+
+        return InfiniteLineCharge.field_from_coefficients(xs, ys, self.x_coef, self.y_coef,
+                                                          self.offset, self.charge_density)
+
+    @staticmethod
+    def field_from_coefficients(xs: np.ndarray, ys: np.ndarray, x_coef: np.ndarray,
+                                y_coef: np.ndarray, offset: np.ndarray,
+                                charge_density: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Calculate the electric field components of infinite line charges, given in the form
+        ``ax + by + c = 0``.
+
+        All arguments are broadcast against each other, so many charges can be evaluated at many
+        points at once.
+
+        Args:
+            xs (ndarray): x positions of the test points.
+            ys (ndarray): y positions of the test points.
+            x_coef (ndarray): The coefficients on x (a).
+            y_coef (ndarray): The coefficients on y (b).
+            offset (ndarray): The offsets (c).
+            charge_density (ndarray): The charge densities, in C/m.
+
+        Returns:
+            Tuple[ndarray, ndarray]: x and y components of the electric field.
+        """
+
+        # The field points along the normal (a, b) / sqrt(a^2 + b^2), away from the line, with
+        # magnitude 2k λ / r, where r = |ax + by + c| / sqrt(a^2 + b^2). Combining the two, the
+        # signed field is 2k λ (a, b) / (ax + by + c), which also handles the direction flip.
+        line_value = (x_coef * np.asarray(xs, dtype=float)
+                      + y_coef * np.asarray(ys, dtype=float) + offset)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scale = np.where(line_value != 0.0, 2 * COULOMB_CONSTANT * charge_density / line_value,
+                             0.0)
+
+        return scale * x_coef, scale * y_coef
+
+    def potential(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """
+        Calculate the electric potential generated by the infinite line charge at many points at
+        once.
+
+        Args:
+            xs (ndarray): x positions of the test points.
+            ys (ndarray): y positions of the test points.
+
+        Returns:
+            ndarray: The electric potential at each point, in V.
+        """
+
+        return InfiniteLineCharge.potential_from_coefficients(xs, ys, self.x_coef, self.y_coef,
+                                                              self.offset, self.charge_density)
+
+    @staticmethod
+    def potential_from_coefficients(
+            xs: np.ndarray,
+            ys: np.ndarray,
+            x_coef: np.ndarray,
+            y_coef: np.ndarray,
+            offset: np.ndarray,
+            charge_density: np.ndarray,
+            reference_distance: float = POTENTIAL_REFERENCE_DISTANCE) -> np.ndarray:
+        """
+        Calculate the electric potential of infinite line charges, given in the form
+        ``ax + by + c = 0``.
+
+        All arguments are broadcast against each other, so many charges can be evaluated at many
+        points at once.
+
+        Args:
+            xs (ndarray): x positions of the test points.
+            ys (ndarray): y positions of the test points.
+            x_coef (ndarray): The coefficients on x (a).
+            y_coef (ndarray): The coefficients on y (b).
+            offset (ndarray): The offsets (c).
+            charge_density (ndarray): The charge densities, in C/m.
+            reference_distance (float): The distance from each line at which its potential is 0.
+                Defaults to ``POTENTIAL_REFERENCE_DISTANCE``.
+
+        Returns:
+            ndarray: The electric potential, in V.
+        """
+
+        radial_distance = (np.abs(x_coef * np.asarray(xs, dtype=float)
+                                  + y_coef * np.asarray(ys, dtype=float) + offset)
+                           / np.hypot(x_coef, y_coef))
+
+        # Integrating E = 2k λ / r from the reference distance gives V = -2k λ ln(r / r_ref)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(
+                radial_distance > 0.0,
+                -2 * COULOMB_CONSTANT * charge_density * np.log(radial_distance
+                                                                / reference_distance), 0.0)
+
     def open_menu(self, pos: QtCore.QPointF) -> bool:
         """
         Open a context menu for this charge.
@@ -167,6 +293,69 @@ class InfiniteLineCharge(BaseCharge):
                  / sympy.sqrt(self.x_coef**2 + self.y_coef**2))
         return 2 * COULOMB_CONSTANT_SYM * self.charge_density / r_sym
 
+    def field_equations(self) -> FieldEquations:
+        """
+        Build every equation of this infinite line charge's electric field.
+
+        The magnitude and the half-planes on either side of the line are substituted from equations
+        shared by every line whose coefficients have the same signs, then resolved along the
+        direction perpendicular to this line.
+
+        Returns:
+            FieldEquations: The simplified equations.
+        """
+
+        values = {
+            _X_COEF: sympy.Float(abs(self.x_coef)),
+            _Y_COEF: sympy.Float(abs(self.y_coef)),
+            _OFFSET: sympy.Float(self.offset),
+            _CHARGE_DENSITY: sympy.Float(self.charge_density)
+        }
+
+        template = InfiniteLineCharge._field_template(int(np.sign(self.x_coef)),
+                                                      int(np.sign(self.y_coef)))
+        magnitude, pos_eq, neg_eq = (eqn.xreplace(values) for eqn in template[:3])
+        angle = self._line_angle() + np.pi / 2
+
+        def component(direction: float) -> sympy.Basic:
+            signed_magnitude = magnitude * direction
+            if signed_magnitude == 0.0:
+                return sympy.S.Zero
+
+            return sympy.Piecewise((-signed_magnitude, neg_eq), (signed_magnitude, pos_eq))
+
+        return FieldEquations(magnitude, component(np.cos(angle)), component(np.sin(angle)),
+                              template[3])
+
+    @staticmethod
+    @memoize_templates
+    def _field_template(x_sign: int,
+                        y_sign: int) -> Tuple[sympy.Basic, sympy.Basic, sympy.Basic, bool]:
+        """
+        The simplified magnitude and half-planes of a line with symbolic coefficients, offset and
+        charge density, built once for each combination of the coefficients' signs.
+
+        Solving for the half-planes depends on the signs of the coefficients, so the coefficients
+        are written as their signs times positive symbols.
+
+        Args:
+            x_sign (int): The sign of the x coefficient: -1, 0 or 1.
+            y_sign (int): The sign of the y coefficient: -1, 0 or 1.
+
+        Returns:
+            Tuple[Basic, Basic, Basic, bool]: The signed magnitude, and the half-planes where the
+            field points along and against the line's normal, in terms of ``_X_COEF`` and
+            ``_Y_COEF`` (the absolute values of the coefficients), ``_OFFSET`` and
+            ``_CHARGE_DENSITY``; and whether they were all simplified within their time budgets.
+        """
+
+        line = InfiniteLineCharge(x_sign * _X_COEF, y_sign * _Y_COEF, _OFFSET, _CHARGE_DENSITY)
+
+        magnitude, magnitude_complete = bounded_simplify(line.electric_field_mag_eqn())
+        pos_eq, neg_eq, conditions_complete = line._flip_direction_eqn()
+
+        return magnitude, pos_eq, neg_eq, magnitude_complete and conditions_complete
+
     def electric_field_x_eqn(self) -> sympy.Basic:
         """
         Returns the position-independent electric field x-component equation for this infinite line
@@ -182,7 +371,7 @@ class InfiniteLineCharge(BaseCharge):
         if magnitude == 0.0:
             return sympy.S.Zero
 
-        pos_eq, neg_eq = self._flip_direction_eqn()
+        pos_eq, neg_eq, _ = self._flip_direction_eqn()
         return sympy.Piecewise((-magnitude, neg_eq), (magnitude, pos_eq))
 
     def electric_field_y_eqn(self) -> sympy.Basic:
@@ -200,7 +389,7 @@ class InfiniteLineCharge(BaseCharge):
         if magnitude == 0.0:
             return sympy.S.Zero
 
-        pos_eq, neg_eq = self._flip_direction_eqn()
+        pos_eq, neg_eq, _ = self._flip_direction_eqn()
         return sympy.Piecewise((-magnitude, neg_eq), (magnitude, pos_eq))
 
     def _radial_distance(self, point: Point2D) -> float:
@@ -300,27 +489,29 @@ class InfiniteLineCharge(BaseCharge):
 
         return x_pos, y_pos
 
-    def _flip_direction_eqn(self) -> Tuple[sympy.Basic, sympy.Basic]:
+    def _flip_direction_eqn(self) -> Tuple[sympy.Basic, sympy.Basic, bool]:
         """
         The inequalities for the positive and negative equations.
 
         Returns:
-            Tuple[Basic, Basic]: The positive and negative inequalities to be used, as boolean
-            compositions of relationals.
+            Tuple[Basic, Basic, bool]: The positive and negative inequalities to be used, as boolean
+            compositions of relationals, and whether they were simplified within their time
+            budgets.
         """
 
         x_closest, y_closest = self._closest_point_eqn()
 
         if self.x_coef == 0:
-            pos_eq = clean_inequality(y_closest <= y, y)
-            neg_eq = clean_inequality(y_closest >= y, y)
-        elif self.y_coef == 0:
-            pos_eq = clean_inequality(x_closest <= x, x)
-            neg_eq = clean_inequality(x_closest >= x, x)
-        else:
-            pos_eq = sympy.Or(clean_inequality([x_closest <= x, y_closest <= y], x),
-                              clean_inequality([x_closest >= x, y_closest <= y], x)).simplify()
-            neg_eq = sympy.Or(clean_inequality([x_closest >= x, y_closest >= y], x),
-                              clean_inequality([x_closest <= x, y_closest >= y], x)).simplify()
-
-        return pos_eq, neg_eq
+            return clean_inequality(y_closest <= y, y), clean_inequality(y_closest >= y, y), True
+
+        if self.y_coef == 0:
+            return clean_inequality(x_closest <= x, x), clean_inequality(x_closest >= x, x), True
+
+        pos_eq, pos_complete = bounded_simplify(
+            sympy.Or(clean_inequality([x_closest <= x, y_closest <= y], x),
+                     clean_inequality([x_closest >= x, y_closest <= y], x)))
+        neg_eq, neg_complete = bounded_simplify(
+            sympy.Or(clean_inequality([x_closest >= x, y_closest >= y], x),
+                     clean_inequality([x_closest <= x, y_closest >= y], x)))
+
+        return pos_eq, neg_eq, pos_complete and neg_complete
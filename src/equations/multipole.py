@@ -0,0 +1,237 @@
+"""
+A Barnes-Hut quadtree for quickly evaluating the electric field of many point charges.
+"""
+
+from typing import List, NamedTuple, Tuple
+
+import numpy as np
+
+# pylint: disable=import-error
+from equations.constants import COULOMB_CONSTANT
+from equations.point_charge import PointCharge
+
+# pylint: enable=import-error
+
+MultipoleField = NamedTuple("MultipoleField", [("e_x", np.ndarray), ("e_y", np.ndarray),
+                                               ("error", np.ndarray)])
+"""
+The x and y components of an electric field, and an upper estimate of the absolute error at each
+point.
+"""
+
+
+class _Node:
+    """
+    A single cell of the quadtree, holding the multipole expansion of the charges inside it.
+    """
+
+    # pylint: disable=too-few-public-methods,too-many-instance-attributes
+
+    __slots__ = ("center_x", "center_y", "radius", "charge", "abs_charge", "dipole_x", "dipole_y",
+                 "quad_xx", "quad_xy", "quad_yy", "children", "indices")
+
+    def __init__(self, xs: np.ndarray, ys: np.ndarray, charges: np.ndarray,
+                 indices: np.ndarray) -> None:
+        """
+        Compute the multipole expansion (up to the quadrupole) of a set of charges.
+
+        Args:
+            xs (ndarray): x positions of every charge in the tree.
+            ys (ndarray): y positions of every charge in the tree.
+            charges (ndarray): Every charge in the tree.
+            indices (ndarray): The indices of the charges inside this cell.
+        """
+
+        node_xs, node_ys, node_charges = xs[indices], ys[indices], charges[indices]
+
+        # Expand about the center of the charges' bounding box, which (unlike the center of charge)
+        # is well defined even when the net charge is zero.
+        self.center_x = (node_xs.min() + node_xs.max()) / 2
+        self.center_y = (node_ys.min() + node_ys.max()) / 2
+
+        offset_x, offset_y = node_xs - self.center_x, node_ys - self.center_y
+        offset_sq = offset_x**2 + offset_y**2
+
+        self.radius = float(np.sqrt(offset_sq.max()))
+        self.charge = float(node_charges.sum())
+        self.abs_charge = float(np.abs(node_charges).sum())
+
+        self.dipole_x = float(np.dot(node_charges, offset_x))
+        self.dipole_y = float(np.dot(node_charges, offset_y))
+
+        # In-plane components of the traceless quadrupole, q (3 s_i s_j - |s|^2 δ_ij)
+        self.quad_xx = float(np.dot(node_charges, 3 * offset_x**2 - offset_sq))
+        self.quad_xy = float(np.dot(node_charges, 3 * offset_x * offset_y))
+        self.quad_yy = float(np.dot(node_charges, 3 * offset_y**2 - offset_sq))
+
+        self.children: List["_Node"] = []
+        self.indices = indices
+
+
+class PointChargeTree:
+    """
+    A Barnes-Hut quadtree over a set of point charges.
+
+    Cells that are far enough away from a test point, compared to their size, are replaced by their
+    multipole expansion (monopole, dipole and quadrupole). Everything else is summed directly. The
+    ``accuracy`` parameter is the opening angle: the ratio of a cell's radius to its distance below
+    which the expansion is used. Smaller values are more accurate and slower.
+    """
+
+    LEAF_SIZE = 32
+    """
+    The maximum number of charges held by a cell before it is split in four.
+    """
+
+    MAX_DEPTH = 32
+    """
+    The maximum depth of the tree, reached only when many charges share a position.
+    """
+
+    def __init__(self, xs: np.ndarray, ys: np.ndarray, charges: np.ndarray,
+                 accuracy: float) -> None:
+        """
+        Build the tree over a set of point charges.
+
+        Args:
+            xs (ndarray): x positions of the charges.
+            ys (ndarray): y positions of the charges.
+            charges (ndarray): The charges, in C.
+            accuracy (float): The opening angle, between 0 and 1.
+        """
+
+        if not 0.0 < accuracy < 1.0:
+            raise RuntimeError(f"Multipole accuracy {accuracy} must be between 0 and 1")
+
+        self.accuracy = accuracy
+
+        self._xs = np.array(xs, dtype=float)
+        self._ys = np.array(ys, dtype=float)
+        self._charges = np.array(charges, dtype=float)
+
+        self._root = self._build(np.arange(self._xs.size), 0) if self._xs.size > 0 else None
+
+    def electric_field(self, xs: np.ndarray, ys: np.ndarray) -> MultipoleField:
+        """
+        Calculate both components of the net electric field of every charge in the tree.
+
+        Args:
+            xs (ndarray): 1-dimensional array of x positions to measure the electric field at.
+            ys (ndarray): 1-dimensional array of y positions to measure the electric field at.
+
+        Returns:
+            MultipoleField: The x and y components of the electric field at each point, and an
+            estimate of the largest possible absolute error in the field at each point.
+        """
+
+        e_x, e_y, error = np.zeros(xs.shape), np.zeros(xs.shape), np.zeros(xs.shape)
+
+        if self._root is None:
+            return MultipoleField(e_x, e_y, error)
+
+        # Walk the tree with every test point at once, splitting the points off as their cells
+        # become far enough away.
+        stack: List[Tuple[_Node, np.ndarray]] = [(self._root, np.arange(xs.size))]
+        while stack:
+            node, targets = stack.pop()
+
+            offset_x = xs[targets] - node.center_x
+            offset_y = ys[targets] - node.center_y
+            distance = np.sqrt(offset_x**2 + offset_y**2)
+
+            far = node.radius < self.accuracy * distance
+            if far.any():
+                far_targets = targets[far]
+                x_inc, y_inc, err_inc = PointChargeTree._expansion_field(
+                    node, offset_x[far], offset_y[far], distance[far])
+                e_x[far_targets] += x_inc
+                e_y[far_targets] += y_inc
+                error[far_targets] += err_inc
+
+            near_targets = targets[~far]
+            if near_targets.size == 0:
+                continue
+
+            if node.children:
+                stack.extend((child, near_targets) for child in node.children)
+            else:
+                x_inc, y_inc = PointCharge.field_from_offsets(
+                    xs[near_targets, None] - self._xs[node.indices],
+                    ys[near_targets, None] - self._ys[node.indices], self._charges[node.indices])
+                e_x[near_targets] += np.where(np.isfinite(x_inc), x_inc, 0.0).sum(axis=1)
+                e_y[near_targets] += np.where(np.isfinite(y_inc), y_inc, 0.0).sum(axis=1)
+
+        return MultipoleField(e_x, e_y, error)
+
+    def _build(self, indices: np.ndarray, depth: int) -> _Node:
+        """
+        Recursively build a cell and its children.
+
+        Args:
+            indices (ndarray): The indices of the charges inside the cell.
+            depth (int): The depth of the cell in the tree.
+
+        Returns:
+            _Node: The cell.
+        """
+
+        node = _Node(self._xs, self._ys, self._charges, indices)
+
+        if indices.size <= PointChargeTree.LEAF_SIZE or depth >= PointChargeTree.MAX_DEPTH:
+            return node
+
+        right = self._xs[indices] > node.center_x
+        top = self._ys[indices] > node.center_y
+
+        for quadrant in (~right & ~top, right & ~top, ~right & top, right & top):
+            if quadrant.any():
+                node.children.append(self._build(indices[quadrant], depth + 1))
+
+        # Every charge at the same position, so it cannot be split any further.
+        if len(node.children) == 1:
+            node.children = []
+
+        return node
+
+    @staticmethod
+    def _expansion_field(node: _Node, offset_x: np.ndarray, offset_y: np.ndarray,
+                         distance: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Calculate the electric field of a cell's multipole expansion.
+
+        Args:
+            node (_Node): The cell.
+            offset_x (ndarray): x offsets from the cell's center to the test points.
+            offset_y (ndarray): y offsets from the cell's center to the test points.
+            distance (ndarray): Distances from the cell's center to the test points.
+
+        Returns:
+            Tuple[ndarray, ndarray, ndarray]: The x and y components of the electric field, and the
+            truncation error bound at each point.
+        """
+
+        inv_r = 1 / distance
+        inv_r3 = inv_r**3
+        inv_r5 = inv_r3 * inv_r**2
+
+        # Monopole: Q r / r^3
+        e_x = node.charge * offset_x * inv_r3
+        e_y = node.charge * offset_y * inv_r3
+
+        # Dipole: 3 (p . r) r / r^5 - p / r^3
+        p_dot_r = node.dipole_x * offset_x + node.dipole_y * offset_y
+        e_x += 3 * p_dot_r * offset_x * inv_r5 - node.dipole_x * inv_r3
+        e_y += 3 * p_dot_r * offset_y * inv_r5 - node.dipole_y * inv_r3
+
+        # Quadrupole: -Q r / r^5 + 5/2 (r . Q r) r / r^7
+        quad_r_x = node.quad_xx * offset_x + node.quad_xy * offset_y
+        quad_r_y = node.quad_xy * offset_x + node.quad_yy * offset_y
+        r_quad_r = offset_x * quad_r_x + offset_y * quad_r_y
+        e_x += -quad_r_x * inv_r5 + 2.5 * r_quad_r * offset_x * inv_r5 * inv_r**2
+        e_y += -quad_r_y * inv_r5 + 2.5 * r_quad_r * offset_y * inv_r5 * inv_r**2
+
+        # The first neglected (octupole) term is bounded by roughly 4 |q| a^3 / (r^3 (r - a)^2).
+        ratio = node.radius * inv_r
+        error = 4 * node.abs_charge * ratio**3 / (distance - node.radius)**2
+
+        return (COULOMB_CONSTANT * e_x, COULOMB_CONSTANT * e_y, COULOMB_CONSTANT * error)
@@ -2,18 +2,25 @@
 Calculate the electric field of a point charge.
 """
 
+from typing import Tuple
+
 import numpy as np
 import sympy
 from PyQt6 import QtCore, QtWidgets
 from sympy.abc import x, y
 
 # pylint: disable=import-error
-from equations.base_charge import BaseCharge
+from equations.base_charge import (BaseCharge, FieldEquations, memoize_templates,
+                                     substitute_parameters)
 from equations.constants import COULOMB_CONSTANT, COULOMB_CONSTANT_SYM, Point2D
+from equations.sympy_helper import bounded_simplify
 from view.multi_line_input_dialog import MultiLineInputDialog
 
 # pylint: enable=import-error
 
+# The parameters of the equations shared by every point charge.
+_X_POSITION, _Y_POSITION, _CHARGE = sympy.symbols("x_0 y_0 q", real=True)
+
 
 class PointCharge(BaseCharge):
     """
@@ -24,6 +31,16 @@ class PointCharge(BaseCharge):
         self.position = position
         self.charge = charge
 
+    def parameters(self) -> Tuple[Point2D, float]:
+        """
+        The arguments that construct a point charge identical to this one.
+
+        Returns:
+            Tuple[Point2D, float]: The position and the charge.
+        """
+
+        return (Point2D(float(self.position.x), float(self.position.y)), float(self.charge))
+
     def electric_field_magnitude(self, point: Point2D) -> float:
         """
         Return the electric field magnitude generated by this point charge at a given point.
@@ -71,6 +88,92 @@ class PointCharge(BaseCharge):
 
         return self.electric_field_magnitude(point) * np.sin(self._theta(point))
 
+    def electric_field(self, xs: np.ndarray, ys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Calculate both components of the electric field generated by the point charge at many
+        points at once.
+
+        Args:
+            xs (ndarray): x positions of the test points.
+            ys (ndarray): y positions of the test points.
+
+        Returns:
+            Tuple[ndarray, ndarray]: x and y components of the electric field at each point.
+        """
+
+        return PointCharge.field_from_offsets(
+            np.asarray(xs, dtype=float) - self.position.x,
+            np.asarray(ys, dtype=float) - self.position.y, self.charge)
+
+    @staticmethod
+    def field_from_offsets(x_dist: np.ndarray, y_dist: np.ndarray,
+                           charge: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Calculate the electric field components of point charges from the offsets of the test
+        points to the charges.
+
+        All arguments are broadcast against each other, so many charges can be evaluated at many
+        points at once.
+
+        Args:
+            x_dist (ndarray): x offsets from the charges to the test points.
+            y_dist (ndarray): y offsets from the charges to the test points.
+            charge (ndarray): The charges, in C.
+
+        Returns:
+            Tuple[ndarray, ndarray]: x and y components of the electric field.
+        """
+
+        radius_sq = x_dist**2 + y_dist**2
+
+        # E = k q / r^2 along (x_dist, y_dist) / r, so each component is k q dist / r^3.
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scale = np.where(radius_sq > 0.0,
+                             COULOMB_CONSTANT * charge / (radius_sq * np.sqrt(radius_sq)), 0.0)
+
+        return scale * x_dist, scale * y_dist
+
+    def potential(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """
+        Calculate the electric potential generated by the point charge at many points at once.
+
+        Args:
+            xs (ndarray): x positions of the test points.
+            ys (ndarray): y positions of the test points.
+
+        Returns:
+            ndarray: The electric potential at each point, in V.
+        """
+
+        return PointCharge.potential_from_offsets(
+            np.asarray(xs, dtype=float) - self.position.x,
+            np.asarray(ys, dtype=float) - self.position.y, self.charge)
+
+    @staticmethod
+    def potential_from_offsets(x_dist: np.ndarray, y_dist: np.ndarray,
+                               charge: np.ndarray) -> np.ndarray:
+        """
+        Calculate the electric potential of point charges from the offsets of the test points to the
+        charges, taking the potential at infinity to be 0.
+
+        All arguments are broadcast against each other, so many charges can be evaluated at many
+        points at once.
+
+        Args:
+            x_dist (ndarray): x offsets from the charges to the test points.
+            y_dist (ndarray): y offsets from the charges to the test points.
+            charge (ndarray): The charges, in C.
+
+        Returns:
+            ndarray: The electric potential, in V.
+        """
+
+        radius = np.hypot(x_dist, y_dist)
+
+        # V = k q / r
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(radius > 0.0, COULOMB_CONSTANT * charge / radius, 0.0)
+
     def open_menu(self, pos: QtCore.QPointF) -> bool:
         """
         Open a context menu for this charge.
@@ -125,6 +228,53 @@ class PointCharge(BaseCharge):
 
         return COULOMB_CONSTANT_SYM * self.charge / (x_dist + y_dist)
 
+    def field_equations(self) -> FieldEquations:
+        """
+        Build every equation of this point charge's electric field, by substituting its position and
+        charge into the equations shared by every point charge.
+
+        Returns:
+            FieldEquations: The simplified equations.
+        """
+
+        values = {
+            _X_POSITION: sympy.Float(self.position.x),
+            _Y_POSITION: sympy.Float(self.position.y),
+            _CHARGE: sympy.Float(self.charge)
+        }
+
+        return substitute_parameters(PointCharge._field_template(), values)
+
+    @staticmethod
+    @memoize_templates
+    def _field_template() -> FieldEquations:
+        """
+        The simplified equations of a point charge with a symbolic position and charge, built once.
+
+        Returns:
+            FieldEquations: The equations, in terms of ``_X_POSITION``, ``_Y_POSITION`` and
+            ``_CHARGE``.
+        """
+
+        return PointCharge(Point2D(_X_POSITION, _Y_POSITION), _CHARGE)._build_field_equations()
+
+    def _build_field_equations(self) -> FieldEquations:
+        """
+        Build every equation of this point charge's electric field, simplifying the magnitude once
+        (within a time budget) and resolving it along the direction from the charge.
+
+        Returns:
+            FieldEquations: The simplified equations.
+        """
+
+        x_dist, y_dist = x - self.position.x, y - self.position.y
+        radius = sympy.sqrt(x_dist**2 + y_dist**2)
+
+        # cos(theta) and sin(theta) of the angle from the charge, without the atan2
+        magnitude, complete = bounded_simplify(self.electric_field_mag_eqn())
+        return FieldEquations(magnitude, magnitude * x_dist / radius, magnitude * y_dist / radius,
+                              complete)
+
     def electric_field_x_eqn(self) -> sympy.Basic:
         """
         Returns the position-independent electric field x-component equation for this point charge.
@@ -0,0 +1,105 @@
+"""
+A bounded cache of rounded, printed equations, such as their LaTeX.
+"""
+
+import collections
+from typing import Callable, Dict, NamedTuple, Tuple
+
+import sympy
+
+# pylint: disable=import-error
+from equations.base_charge import FieldEquations
+from equations.sympy_helper import round_symbolic
+
+# pylint: enable=import-error
+
+PrintedEquations = NamedTuple("PrintedEquations", [("mag", str), ("x", str), ("y", str),
+                                                   ("complete", bool)])
+"""
+A charge's rounded equations, printed (for example, as LaTeX), and whether they were fully
+simplified (see ``FieldEquations``).
+"""
+
+
+class PrintedEquationCache:
+    """
+    Equations rounded to some number of digits and printed, keyed by the equation and the digits.
+
+    Rounding (``round_symbolic``) and printing (for example, ``sympy.latex``) both walk the whole
+    equation, so repeating them for every equation whenever anything changes is slow. The least
+    recently used printed equations are evicted once there are more than ``max_size``.
+    """
+
+    DEFAULT_MAX_SIZE = 1024
+    """
+    The default number of printed equations kept.
+    """
+
+    def __init__(self,
+                 printer: Callable[[sympy.Basic], str] = sympy.latex,
+                 max_size: int = DEFAULT_MAX_SIZE) -> None:
+        """
+        Initialize an empty cache.
+
+        Args:
+            printer (Callable[[Basic], str]): Prints an equation. Defaults to ``sympy.latex``.
+            max_size (int): The number of printed equations kept. Defaults to
+                ``DEFAULT_MAX_SIZE``.
+        """
+
+        self.printer = printer
+        self.max_size = max_size
+
+        self._printed: Dict[Tuple[sympy.Basic, int], str] = collections.OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._printed)
+
+    def print(self, expression: sympy.Basic, digits: int) -> str:
+        """
+        Print an expression rounded to some number of digits, only if it is not cached.
+
+        Args:
+            expression (Basic): The unrounded expression.
+            digits (int): The number of digits after the decimal point.
+
+        Returns:
+            str: The printed, rounded expression.
+        """
+
+        key = (expression, digits)
+
+        printed = self._printed.get(key)
+        if printed is not None:
+            self._printed.move_to_end(key)
+            return printed
+
+        printed = self.printer(round_symbolic(expression, digits))
+
+        self._printed[key] = printed
+        while len(self._printed) > self.max_size:
+            self._printed.popitem(last=False)
+
+        return printed
+
+    def render(self, equations: FieldEquations, digits: int) -> PrintedEquations:
+        """
+        Print every equation of a charge, rounded to some number of digits.
+
+        Args:
+            equations (FieldEquations): The unrounded equations.
+            digits (int): The number of digits after the decimal point.
+
+        Returns:
+            PrintedEquations: The printed, rounded equations.
+        """
+
+        return PrintedEquations(self.print(equations.mag, digits), self.print(equations.x, digits),
+                                self.print(equations.y, digits), equations.complete)
+
+    def clear(self) -> None:
+        """
+        Remove every printed equation.
+        """
+
+        self._printed.clear()
@@ -2,18 +2,28 @@
 A cylindrical hollow ring of charge.
 """
 
+from typing import Any, Optional, Tuple
+
 import numpy as np
 import sympy
 from PyQt6 import QtCore, QtWidgets
 from sympy.abc import x, y
 
 # pylint: disable=import-error
-from equations.base_charge import BaseCharge
-from equations.constants import COULOMB_CONSTANT, COULOMB_CONSTANT_SYM, Point2D
+from equations.base_charge import (BaseCharge, FieldEquations, memoize_templates,
+                                     substitute_parameters)
+from equations.constants import (COULOMB_CONSTANT, COULOMB_CONSTANT_SYM,
+                                 POTENTIAL_REFERENCE_DISTANCE, Point2D)
+from equations.sympy_helper import bounded_simplify
 from view.multi_line_input_dialog import MultiLineInputDialog
 
 # pylint: enable=import-error
 
+# The parameters of the equations shared by every ring with a constant charge density. The outer
+# radius is the inner radius plus the width.
+_X_CENTER, _Y_CENTER, _CHARGE_DENSITY = sympy.symbols("x_0 y_0 rho", real=True)
+_INNER_RADIUS, _WIDTH = sympy.symbols("r_1 w", positive=True)
+
 
 class RingCharge(BaseCharge):
     """
@@ -50,6 +60,23 @@ class RingCharge(BaseCharge):
         self.outer_radius = outer_radius
         self.charge_density = charge_density
 
+    def parameters(self) -> Tuple[Any, ...]:
+        """
+        The arguments that construct a ring of charge identical to this one.
+
+        A charge density given as a sympy expression (see ``_constant_density``) is kept as it is,
+        since sympy expressions are already immutable and hashable.
+
+        Returns:
+            Tuple[Any, ...]: The center, inner radius, outer radius and charge density.
+        """
+
+        charge_density = (self.charge_density if isinstance(self.charge_density, sympy.Basic)
+                          else float(self.charge_density))
+
+        return (Point2D(float(self.center.x), float(self.center.y)), float(self.inner_radius),
+                float(self.outer_radius), charge_density)
+
     def electric_field_magnitude(self, point: Point2D) -> float:
         """
         Return the electric field magnitude generated by this ring of charge at a given point.
@@ -109,6 +136,146 @@ class RingCharge(BaseCharge):
 
         return self.electric_field_magnitude(point) * np.sin(self._theta(point))
 
+    def numeric_density(self) -> Optional[float]:
+        """
+        The charge density as a number, for evaluating the field numerically.
+
+        Returns:
+            Optional[float]: The charge density, or None if it is not a number, such as an
+            expression in the radius (see ``_constant_density``) or a symbol.
+        """
+
+        try:
+            return float(self.charge_density)
+        except TypeError:
+            return None
+
+    def electric_field(self, xs: np.ndarray, ys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Calculate both components of the electric field generated by the ring of charge at many
+        points at once.
+
+        A ring whose charge density is not a number (see ``numeric_density``) has no numeric field,
+        so its field is NaN wherever it is not 0.
+
+        Args:
+            xs (ndarray): x positions of the test points.
+            ys (ndarray): y positions of the test points.
+
+        Returns:
+            Tuple[ndarray, ndarray]: x and y components of the electric field at each point.
+        """
+
+        density = self.numeric_density()
+
+        return RingCharge.field_from_offsets(np.asarray(xs, dtype=float) - self.center.x,
+                                             np.asarray(ys, dtype=float) - self.center.y,
+                                             self.inner_radius, self.outer_radius,
+                                             density if density is not None else np.nan)
+
+    @staticmethod
+    def field_from_offsets(x_dist: np.ndarray, y_dist: np.ndarray, inner_radius: np.ndarray,
+                           outer_radius: np.ndarray,
+                           charge_density: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Calculate the electric field components of rings of charge from the offsets of the test
+        points to the centers of the rings.
+
+        All arguments are broadcast against each other, so many charges can be evaluated at many
+        points at once.
+
+        Args:
+            x_dist (ndarray): x offsets from the centers to the test points.
+            y_dist (ndarray): y offsets from the centers to the test points.
+            inner_radius (ndarray): The inner radii of the rings.
+            outer_radius (ndarray): The outer radii of the rings.
+            charge_density (ndarray): The charge densities, in C/m^2.
+
+        Returns:
+            Tuple[ndarray, ndarray]: x and y components of the electric field.
+        """
+
+        radius_sq = x_dist**2 + y_dist**2
+
+        # Clipping the radius to [inner, outer] covers all 3 Gauss's Law regions at once, since the
+        # enclosed charge is 0 inside the inner radius.
+        effective_rad = np.clip(np.sqrt(radius_sq), inner_radius, outer_radius)
+        q_enc = charge_density * np.pi * (effective_rad**2 - inner_radius**2)
+
+        # E = k * q_enc / 2 * pi * r, along (x_dist, y_dist) / r
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scale = np.where(radius_sq > 0.0, COULOMB_CONSTANT * q_enc / (2 * np.pi * radius_sq),
+                             0.0)
+
+        return scale * x_dist, scale * y_dist
+
+    def potential(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """
+        Calculate the electric potential generated by the ring of charge at many points at once.
+
+        Like the field, the potential of a ring whose charge density is not a number is NaN.
+
+        Args:
+            xs (ndarray): x positions of the test points.
+            ys (ndarray): y positions of the test points.
+
+        Returns:
+            ndarray: The electric potential at each point, in V.
+        """
+
+        density = self.numeric_density()
+
+        return RingCharge.potential_from_offsets(np.asarray(xs, dtype=float) - self.center.x,
+                                                 np.asarray(ys, dtype=float) - self.center.y,
+                                                 self.inner_radius, self.outer_radius,
+                                                 density if density is not None else np.nan)
+
+    @staticmethod
+    def potential_from_offsets(
+            x_dist: np.ndarray,
+            y_dist: np.ndarray,
+            inner_radius: np.ndarray,
+            outer_radius: np.ndarray,
+            charge_density: np.ndarray,
+            reference_distance: float = POTENTIAL_REFERENCE_DISTANCE) -> np.ndarray:
+        """
+        Calculate the electric potential of rings of charge from the offsets of the test points to
+        the centers of the rings.
+
+        All arguments are broadcast against each other, so many charges can be evaluated at many
+        points at once.
+
+        Args:
+            x_dist (ndarray): x offsets from the centers to the test points.
+            y_dist (ndarray): y offsets from the centers to the test points.
+            inner_radius (ndarray): The inner radii of the rings.
+            outer_radius (ndarray): The outer radii of the rings.
+            charge_density (ndarray): The charge densities, in C/m^2.
+            reference_distance (float): The distance from each center at which the potential
+                outside the ring is 0. Defaults to ``POTENTIAL_REFERENCE_DISTANCE``.
+
+        Returns:
+            ndarray: The electric potential, in V.
+        """
+
+        # Integrating E = k q_enc / (2 pi r) inwards over the same 3 Gauss's Law regions as the
+        # field, with the potential continuous across each boundary:
+        # r >= outer: V = -k Q / (2 pi) ln(r / r_ref), where Q is the ring's total charge
+        # inner <= r <= outer: V = V(outer) - k ρ / 2 ((r^2 - outer^2) / 2 - inner^2 ln(r / outer))
+        # r <= inner: V = V(inner), since there is no field inside the ring
+        scale = COULOMB_CONSTANT * charge_density / 2
+        total_charge = np.pi * (outer_radius**2 - inner_radius**2)
+
+        effective_rad = np.clip(np.hypot(x_dist, y_dist), inner_radius, outer_radius)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            outer = -scale / np.pi * total_charge * np.log(
+                np.maximum(np.hypot(x_dist, y_dist), outer_radius) / reference_distance)
+            inner_log = np.where(inner_radius > 0.0,
+                                 inner_radius**2 * np.log(effective_rad / outer_radius), 0.0)
+
+        return outer - scale * ((effective_rad**2 - outer_radius**2) / 2 - inner_log)
+
     def open_menu(self, pos: QtCore.QPointF) -> bool:
         """
         Open a context menu for this charge.
@@ -170,7 +337,7 @@ class RingCharge(BaseCharge):
         r_sym = sympy.sqrt((self.center.x - x)**2 + (self.center.y - y)**2)
 
         # q_enc = Integral[rho, {r, inner, rad}]
-        if isinstance(self.charge_density, (float, int)):
+        if self._constant_density():
             q_enc = self.charge_density * sympy.pi * (r_sym**2 - self.inner_radius**2)
             q_tot = self.charge_density * sympy.pi * (self.outer_radius**2 - self.inner_radius**2)
         else:
@@ -191,6 +358,85 @@ class RingCharge(BaseCharge):
         return sympy.Piecewise((eqn_outer, r_sym >= self.outer_radius), (eqn, middle_cond),
                                (0, inner_cond))
 
+    def field_equations(self) -> FieldEquations:
+        """
+        Build every equation of this ring's electric field.
+
+        With a constant charge density, the ring's parameters are substituted into the equations
+        shared by every ring (or every solid circle, without an inner radius). Otherwise, the
+        enclosed charge is an integral, so the equations are built and simplified from scratch.
+
+        Returns:
+            FieldEquations: The simplified equations.
+        """
+
+        if not self._constant_density():
+            return self._build_field_equations()
+
+        if self.charge_density == 0:
+            return FieldEquations(sympy.S.Zero, sympy.S.Zero, sympy.S.Zero, True)
+
+        values = {
+            _X_CENTER: sympy.Float(self.center.x),
+            _Y_CENTER: sympy.Float(self.center.y),
+            _INNER_RADIUS: sympy.Float(self.inner_radius),
+            _WIDTH: sympy.Float(self.outer_radius - self.inner_radius),
+            _CHARGE_DENSITY: sympy.Float(self.charge_density)
+        }
+
+        return substitute_parameters(RingCharge._field_template(self.inner_radius == 0), values)
+
+    @staticmethod
+    @memoize_templates
+    def _field_template(solid: bool) -> FieldEquations:
+        """
+        The simplified equations of a ring with a symbolic center, radii and constant charge
+        density, built once for each shape.
+
+        Args:
+            solid (bool): Whether the ring has no inner radius.
+
+        Returns:
+            FieldEquations: The equations, in terms of ``_X_CENTER``, ``_Y_CENTER``,
+            ``_INNER_RADIUS``, ``_WIDTH`` and ``_CHARGE_DENSITY``.
+        """
+
+        # The outer radius is written as the inner radius plus a positive width, so that it is known
+        # to be the larger of the two.
+        inner_radius = 0 if solid else _INNER_RADIUS
+        ring = RingCharge(Point2D(_X_CENTER, _Y_CENTER), inner_radius, inner_radius + _WIDTH,
+                          _CHARGE_DENSITY)
+
+        return ring._build_field_equations()
+
+    def _build_field_equations(self) -> FieldEquations:
+        """
+        Build every equation of this ring's electric field, simplifying the piecewise magnitude
+        once (within a time budget) and resolving each of its pieces along the direction from the
+        center.
+
+        Returns:
+            FieldEquations: The simplified equations.
+        """
+
+        x_dist, y_dist = x - self.center.x, y - self.center.y
+        radius = sympy.sqrt(x_dist**2 + y_dist**2)
+
+        magnitude, complete = bounded_simplify(self.electric_field_mag_eqn())
+        return FieldEquations(magnitude, sympy.piecewise_fold(magnitude * x_dist / radius),
+                              sympy.piecewise_fold(magnitude * y_dist / radius), complete)
+
+    def _constant_density(self) -> bool:
+        """
+        Whether the charge density is the same throughout the ring.
+
+        Returns:
+            bool: True if the charge density is a number (or a symbol standing for one), False if it
+            is an expression in the radius.
+        """
+
+        return isinstance(self.charge_density, (float, int, sympy.Symbol))
+
     def electric_field_x_eqn(self) -> sympy.Basic:
         """
         Returns the position-independent electric field x-component equation for this ring charge.
@@ -0,0 +1,281 @@
+"""
+The net electric field at fixed sets of points, updated one charge at a time as charges change.
+"""
+
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+# pylint: disable=import-error
+from equations.charge_store import ChargeStore
+from equations.graph_window import ChargeChanges, GraphWindow
+
+# pylint: enable=import-error
+
+CHUNK_POINTS = 2**16
+"""
+The number of points evaluated together between checks for cancellation. Larger chunks are no
+faster, since the charge store already splits each evaluation to fit its memory budget.
+"""
+
+
+def changes_field(changes: ChargeChanges, xs: np.ndarray,
+                  ys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Calculate how some changes to the charges change the net electric field.
+
+    By superposition, this is the field of the added charges less the field of the removed ones.
+    Non-finite contributions are dropped, matching ``ChargeStore.electric_field``.
+
+    Args:
+        changes (ChargeChanges): The charges removed and added.
+        xs (ndarray): 1-dimensional array of x positions to measure the change at.
+        ys (ndarray): 1-dimensional array of y positions to measure the change at.
+
+    Returns:
+        Tuple[ndarray, ndarray]: The change of the x and y components of the net electric field at
+        each point.
+    """
+
+    e_x, e_y = ChargeStore(snapshot.to_charge()
+                           for snapshot in changes.added).electric_field(xs, ys)
+    removed_x, removed_y = ChargeStore(snapshot.to_charge()
+                                       for snapshot in changes.removed).electric_field(xs, ys)
+
+    return e_x - removed_x, e_y - removed_y
+
+
+class SuperpositionGrid:
+    """
+    The net electric field at a fixed set of points, of which only the points needed so far are
+    evaluated.
+
+    By superposition, when a charge is added, removed or changed only that charge's contribution to
+    the net field changes. Syncing with a ``GraphWindow`` therefore adds the field of every charge
+    added since the last sync and subtracts the field of every charge removed (an edited charge is
+    removed with its old parameters and added with its new ones), instead of re-evaluating every
+    charge. Only the net field is kept, so a grid costs the same memory however many charges there
+    are.
+
+    If too many charges changed at once, or the changes are no longer known, the net field is
+    recomputed from scratch. Grids are synced with ``sync_grids``, which evaluates the points of
+    several grids together.
+    """
+
+    RESUM_INTERVAL = 64
+    """
+    The number of incremental updates after which the net field is recomputed from scratch, so that
+    rounding errors cannot build up.
+    """
+
+    BYTES_PER_POINT = 2 * np.dtype(float).itemsize + np.dtype(bool).itemsize
+    """
+    The number of bytes held by a grid for each of its points.
+    """
+
+    def __init__(self, xs: np.ndarray, ys: np.ndarray) -> None:
+        """
+        Initialize a grid with no points evaluated yet.
+
+        Args:
+            xs (ndarray): 1-dimensional array of x positions to measure the electric field at.
+            ys (ndarray): 1-dimensional array of y positions to measure the electric field at.
+        """
+
+        self.xs = xs
+        self.ys = ys
+
+        self.version = -1
+        """
+        The version of the ``GraphWindow`` the net field was last synced with.
+        """
+
+        self.known = np.zeros(xs.shape, dtype=bool)
+        """
+        Whether each point holds the net field as of ``version``.
+        """
+
+        self.e_x = np.zeros(xs.shape)
+        self.e_y = np.zeros(ys.shape)
+
+        self.error = 0.0
+        """
+        The estimated relative error of the net field, which is 0 unless the multipole evaluator
+        was used.
+        """
+
+        self._incremental_updates = 0
+
+    @property
+    def nbytes(self) -> int:
+        """
+        The number of bytes of field values held by this grid.
+        """
+
+        return self.xs.size * SuperpositionGrid.BYTES_PER_POINT
+
+    def sync(self, graph_window: GraphWindow) -> None:
+        """
+        Evaluate every point, and bring them up to date with the charges of a graph window.
+
+        Args:
+            graph_window (GraphWindow): The charges to evaluate.
+        """
+
+        sync_grids(graph_window, [(self, np.ones(self.xs.shape, dtype=bool))])
+
+    def seed(self, source: "SuperpositionGrid", source_indices: np.ndarray,
+             indices: np.ndarray) -> None:
+        """
+        Copy the points a new grid shares with another grid, instead of evaluating them.
+
+        The copied points are as up to date as they were in ``source``, and are brought up to date
+        with the rest of the grid when it is next synced.
+
+        Args:
+            source (SuperpositionGrid): A grid to copy from. Only its known points are copied.
+            source_indices (ndarray): The indices of the shared points in ``source``.
+            indices (ndarray): The indices of the shared points in this grid.
+        """
+
+        shared = source.known[source_indices]
+        source_indices, indices = source_indices[shared], indices[shared]
+
+        self.known[:] = False
+        self.known[indices] = True
+        self.e_x[indices] = source.e_x[source_indices]
+        self.e_y[indices] = source.e_y[source_indices]
+
+        self.error = source.error
+        self._incremental_updates = source._incremental_updates
+        self.version = source.version
+
+
+def sync_grids(graph_window: GraphWindow,
+               grids: Sequence[Tuple[SuperpositionGrid, np.ndarray]],
+               cancelled: Optional[Callable[[], bool]] = None) -> bool:
+    """
+    Bring the needed points of several grids up to date with the charges of a graph window.
+
+    The points each grid already knows are updated by the charges changed since, or recomputed (see
+    ``SuperpositionGrid``), and the needed points it does not know yet are evaluated. The points of
+    every grid are gathered and evaluated together, so many small grids cost about as much as one
+    grid holding all of their points.
+
+    Args:
+        graph_window (GraphWindow): The charges to evaluate.
+        grids (Sequence[Tuple[SuperpositionGrid, ndarray]]): Each grid, and a boolean mask of its
+            points that are needed.
+        cancelled (Optional[Callable[[], bool]]): Checked between chunks of points; once it returns
+            True, evaluation stops and no grid is changed. Defaults to never cancelling.
+
+    Returns:
+        bool: Whether every grid was synced, rather than cancelled.
+    """
+
+    # The indices of the points of each grid to evaluate, and of the points to update, grouped by
+    # the version they are known at.
+    evaluated: List[Tuple[SuperpositionGrid, np.ndarray]] = []
+    updated: Dict[int, List[Tuple[SuperpositionGrid, np.ndarray]]] = {}
+    changes_since: Dict[int, Optional[ChargeChanges]] = {}
+    recomputed: Set[SuperpositionGrid] = set()
+
+    for grid, needed in grids:
+        known = grid.known
+
+        if grid.version != graph_window.version and known.any():
+            if grid.version not in changes_since:
+                changes_since[grid.version] = graph_window.charge_changes(grid.version)
+            changes = changes_since[grid.version]
+
+            # Re-evaluating more than half of the charges one at a time is slower than starting
+            # over.
+            if (changes is None or grid._incremental_updates >= SuperpositionGrid.RESUM_INTERVAL
+                    or 2 * (len(changes.removed) + len(changes.added)) > len(
+                        graph_window.charges)):
+                recomputed.add(grid)
+                known = np.zeros(known.shape, dtype=bool)
+            else:
+                updated.setdefault(grid.version, []).append((grid, np.flatnonzero(known)))
+        elif grid.version != graph_window.version:
+            recomputed.add(grid)
+
+        evaluated.append((grid, np.flatnonzero(needed & ~known)))
+
+    fields = _evaluate(graph_window, None, evaluated, cancelled)
+    if fields is None:
+        return False
+
+    increments = {}
+    for version, points in updated.items():
+        increments[version] = _evaluate(graph_window, changes_since[version], points, cancelled)
+        if increments[version] is None:
+            return False
+
+    for version, points in updated.items():
+        for (grid, indices), (x_inc, y_inc, _) in zip(points, increments[version]):
+            grid.e_x[indices] += x_inc
+            grid.e_y[indices] += y_inc
+            grid._incremental_updates += 1
+
+    for (grid, indices), (e_x, e_y, error) in zip(evaluated, fields):
+        if grid in recomputed:
+            grid.known[:] = False
+            grid.error = 0.0
+            grid._incremental_updates = 0
+
+        grid.known[indices] = True
+        grid.e_x[indices] = e_x
+        grid.e_y[indices] = e_y
+        if indices.size:
+            grid.error = max(grid.error, error)
+
+        grid.version = graph_window.version
+
+    return True
+
+
+def _evaluate(
+    graph_window: GraphWindow, changes: Optional[ChargeChanges],
+    points: List[Tuple[SuperpositionGrid, np.ndarray]], cancelled: Optional[Callable[[], bool]]
+) -> Optional[List[Tuple[np.ndarray, np.ndarray, float]]]:
+    """
+    Evaluate the net electric field, or how some changes change it, at some points of several
+    grids, all together.
+
+    Args:
+        graph_window (GraphWindow): The charges to evaluate.
+        changes (Optional[ChargeChanges]): The changes to evaluate, or None to evaluate the net
+            field.
+        points (List[Tuple[SuperpositionGrid, ndarray]]): Each grid, and the indices of its points
+            to evaluate.
+        cancelled (Optional[Callable[[], bool]]): Checked between chunks of points; once it returns
+            True, evaluation stops.
+
+    Returns:
+        Optional[List[Tuple[ndarray, ndarray, float]]]: The x and y components at each grid's
+        points, and the estimated relative error of the evaluation, or None if evaluation was
+        cancelled.
+    """
+
+    xs = np.concatenate([grid.xs[indices] for grid, indices in points] or [np.empty(0)])
+    ys = np.concatenate([grid.ys[indices] for grid, indices in points] or [np.empty(0)])
+
+    e_x, e_y = np.empty(xs.shape), np.empty(ys.shape)
+    error = 0.0
+
+    for start in range(0, xs.size, CHUNK_POINTS):
+        if cancelled is not None and cancelled():
+            return None
+
+        chunk = slice(start, start + CHUNK_POINTS)
+        if changes is None:
+            e_x[chunk], e_y[chunk] = graph_window.electric_field_grid(xs[chunk], ys[chunk])
+            error = max(error, graph_window.multipole_error)
+        else:
+            e_x[chunk], e_y[chunk] = changes_field(changes, xs[chunk], ys[chunk])
+
+    splits = np.cumsum([indices.size for _, indices in points])[:-1]
+
+    return [(x_part, y_part, error)
+            for x_part, y_part in zip(np.split(e_x, splits), np.split(e_y, splits))]
@@ -2,7 +2,10 @@
 A helper module providing convenience functions for sympy.
 """
 
-from typing import Iterable, List, Union
+import contextlib
+import ctypes
+import threading
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Sequence, Tuple, Union
 
 import sympy
 import sympy.core.numbers as nums
@@ -42,43 +45,124 @@ def clean_inequality(inequality: Union[sympy.Rel, Iterable[sympy.Rel]],
     return sympy.And(*ineqs)
 
 
-def round_symbolic(expression: sympy.Basic, digits: int) -> sympy.Basic:
+class SimplifyTimeout(Exception):
     """
-    Rounds floats within sympy expression to given digits.
+    Raised inside a ``time_limit`` block that runs out of time.
     """
 
-    if digits < 0:
-        return expression
 
-    return expression.xreplace(
-        {n.evalf(): round(n, digits) for n in expression.atoms(sympy.Number)})
+SimplifyResult = NamedTuple("SimplifyResult", [("expression", sympy.Basic), ("complete", bool)])
+"""
+The simplest form of an expression found, and whether simplification finished within its budget
+(rather than stopping at the best form so far).
+"""
+
+SIMPLIFY_BUDGET = 2.0
+"""
+The default time, in seconds, that ``bounded_simplify`` spends on each expression.
+"""
+
+CHEAP_PASSES: Tuple[Callable[[sympy.Basic], sympy.Basic], ...] = (sympy.piecewise_fold,
+                                                                  sympy.cancel, sympy.powsimp)
+"""
+The targeted simplifications ``bounded_simplify`` tries before the general-purpose ``simplify``.
+They are usually fast, and often find most of what ``simplify`` would.
+"""
+
+
+@contextlib.contextmanager
+def time_limit(seconds: float) -> Iterator[None]:
+    """
+    Interrupt the code inside the block, by raising ``SimplifyTimeout``, once it runs for too long.
+
+    The exception is raised asynchronously in the calling thread by a timer thread, so it
+    interrupts pure Python code (such as sympy) at any point, on any platform and in any thread.
+    It can also be raised while leaving the block, so callers should catch it around the whole
+    block.
+
+    Args:
+        seconds (float): The time allowed, in seconds.
 
+    Raises:
+        SimplifyTimeout: The block ran out of time.
+    """
 
-def make_source(full_eqn: str) -> str:
+    thread_id = threading.get_ident()
+    lock = threading.Lock()
+    active = True
+
+    def interrupt() -> None:
+        with lock:
+            if active:
+                ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_ulong(thread_id),
+                                                           ctypes.py_object(SimplifyTimeout))
+
+    timer = threading.Timer(max(seconds, 0.0), interrupt)
+    timer.daemon = True
+    timer.start()
+
+    try:
+        yield
+    finally:
+        timer.cancel()
+        with lock:
+            active = False
+            # Withdraw an interruption that was scheduled but has not been raised yet.
+            ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_ulong(thread_id), None)
+
+
+def bounded_simplify(expression: sympy.Basic,
+                     budget: float = SIMPLIFY_BUDGET,
+                     passes: Sequence[Callable[[sympy.Basic], sympy.Basic]] = CHEAP_PASSES
+                     ) -> SimplifyResult:
     """
-    Makes a MathJax string representation of a LaTeX equation string.
+    Simplify an expression within a time budget.
+
+    Each of ``passes`` is tried in turn, keeping its result if it is no more complex (by
+    ``count_ops``) than the best so far. The general-purpose ``simplify`` then runs on the best form
+    with whatever time is left. Once the budget runs out, the best form so far is returned.
 
     Args:
-        full_eqn (str): The full LaTeX equation to render.
+        expression (Basic): The expression to simplify.
+        budget (float): The time allowed, in seconds. Defaults to ``SIMPLIFY_BUDGET``.
+        passes (Sequence[Callable[[Basic], Basic]]): The targeted simplifications tried first.
+            Defaults to ``CHEAP_PASSES``.
 
     Returns:
-        str: The MathJax HTML to render, containing the relevant equation.
+        SimplifyResult: The simplest form found, and whether simplification finished.
     """
 
-    return f"""
-<!DOCTYPE html>
-<html>
-<head>
-  <meta charset="utf-8">
-  <meta name="viewport" content="width=device-width">
-  <title>MathJax example</title>
-  <script src="https://polyfill.io/v3/polyfill.min.js?features=es6"></script>
-  <script id="MathJax-script" async
-          src="https://cdn.jsdelivr.net/npm/mathjax@3/es5/tex-mml-chtml.js">
-  </script>
-</head>
-<body>
-    <p>$${full_eqn}$$</p>
-</body>
-</html>
-"""
+    best = expression
+    best_ops = sympy.count_ops(best)
+
+    try:
+        with time_limit(budget):
+            for simplification in passes:
+                try:
+                    candidate = simplification(best)
+                except (sympy.PolynomialError, ValueError, TypeError):
+                    # Passes only apply to some kinds of expressions.
+                    continue
+
+                candidate_ops = sympy.count_ops(candidate)
+                if candidate_ops <= best_ops:
+                    best, best_ops = candidate, candidate_ops
+
+            best = sympy.simplify(best)
+    except SimplifyTimeout:
+        return SimplifyResult(best, False)
+
+    return SimplifyResult(best, True)
+
+
+def round_symbolic(expression: sympy.Basic, digits: int) -> sympy.Basic:
+    """
+    Rounds floats within sympy expression to given digits.
+    """
+
+    if digits < 0:
+        return expression
+
+    return expression.xreplace(
+        {n.evalf(): round(n, digits) for n in expression.atoms(sympy.Number)})
+
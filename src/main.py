@@ -2,21 +2,43 @@
 Instantiate the graphical user interface.
 """
 
+import argparse
 import ctypes
 import os
 import sys
 
 from PyQt6 import QtCore, QtWidgets, QtGui
 
-from view.main_window import MainWindow
-
 
 def main():
     """
     Start the graphical user interface.
     """
 
-    app = QtWidgets.QApplication(sys.argv)
+    # Imported here rather than at the top, since the equation worker processes import this module
+    # too and never show a window.
+    # pylint: disable=import-outside-toplevel
+    from view.equation_view import EquationRenderer
+    from view.main_window import MainWindow
+
+    # pylint: enable=import-outside-toplevel
+
+    parser = argparse.ArgumentParser(description="Electric field simulation.")
+    parser.add_argument("--equations",
+                        choices=[renderer.value for renderer in EquationRenderer],
+                        help="how to show equations: typeset with MathJax (the default, if it "
+                        "is bundled in view/mathjax), or as plain text (the default otherwise), "
+                        "which starts faster and uses far less memory")
+    # Anything else is left for Qt.
+    args, qt_args = parser.parse_known_args()
+
+    renderer = (EquationRenderer(args.equations)
+                if args.equations is not None else EquationRenderer.default())
+
+    # Qt WebEngine (if used) must be imported before the application is created.
+    renderer.view_type()
+
+    app = QtWidgets.QApplication(sys.argv[:1] + qt_args)
 
     # Disable all Qt messages
     QtCore.qInstallMessageHandler(lambda _, __, ___: None)
@@ -32,7 +54,7 @@ def main():
         win_app_id = "PHYS495.wavee"  # arbitrary string
         ctypes.windll.shell32.SetCurrentProcessExplicitAppUserModelID(win_app_id)
 
-    _ = MainWindow()
+    _ = MainWindow(renderer)
 
     sys.exit(app.exec())
 
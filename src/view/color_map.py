@@ -0,0 +1,146 @@
+"""
+Colormaps, mapping whole arrays of values to colors at once through a lookup table.
+"""
+
+import enum
+from typing import Sequence, Tuple
+
+import numpy as np
+
+
+class ColorMap:
+    """
+    A colormap, precomputed as a lookup table of evenly spaced colors.
+
+    Values are first normalized to [0, 1] with one of several ``Normalization`` schemes, then
+    mapped to the nearest entry of the lookup table, so coloring any number of values takes a few
+    array operations.
+    """
+
+    class Normalization(enum.Enum):
+        """
+        Ways of normalizing values before they are mapped to colors.
+        """
+
+        RANK = enum.auto()
+        """
+        Each value's rank among all the values, so colors are spread evenly however the values are
+        distributed.
+        """
+
+        LINEAR = enum.auto()
+        """
+        Linearly between the smallest and the largest value.
+        """
+
+        LOG = enum.auto()
+        """
+        Linearly between the logarithms of the smallest and the largest positive value.
+        """
+
+        PERCENTILE = enum.auto()
+        """
+        Linearly between two percentiles of the values (``PERCENTILE_CLIP``), clipping the rest.
+        """
+
+    LOOKUP_TABLE_SIZE = 256
+    """
+    The number of colors in the lookup table.
+    """
+
+    PERCENTILE_CLIP = (1.0, 99.0)
+    """
+    The percentiles mapped to the first and the last color by ``Normalization.PERCENTILE``.
+    """
+
+    def __init__(self, stops: Sequence[float], colors: Sequence[Tuple[int, int, int]]) -> None:
+        """
+        Build the lookup table of a colormap, interpolating linearly between colors.
+
+        Args:
+            stops (Sequence[float]): The increasing positions of the colors, from 0 to 1.
+            colors (Sequence[Tuple[int, int, int]]): The RGB color at each stop.
+        """
+
+        positions = np.linspace(0.0, 1.0, ColorMap.LOOKUP_TABLE_SIZE)
+        rgb = np.array(colors, dtype=float)
+
+        self.lookup_table = np.empty((ColorMap.LOOKUP_TABLE_SIZE, 4), dtype=np.ubyte)
+        """
+        The RGBA color of each entry, of shape (``LOOKUP_TABLE_SIZE``, 4).
+        """
+
+        for channel in range(3):
+            self.lookup_table[:, channel] = np.round(np.interp(positions, stops, rgb[:, channel]))
+        self.lookup_table[:, 3] = 255
+
+    def map(self, values: np.ndarray, normalization: "ColorMap.Normalization") -> np.ndarray:
+        """
+        Map values to colors.
+
+        Args:
+            values (ndarray): The values to color, of any shape.
+            normalization (ColorMap.Normalization): How to normalize the values.
+
+        Returns:
+            ndarray: The RGBA color of each value, of shape ``values.shape + (4,)``.
+        """
+
+        indices = np.round(ColorMap.normalize(values, normalization)
+                           * (ColorMap.LOOKUP_TABLE_SIZE - 1)).astype(np.intp)
+
+        return self.lookup_table[indices]
+
+    @staticmethod
+    def normalize(values: np.ndarray, normalization: "ColorMap.Normalization") -> np.ndarray:
+        """
+        Normalize values to [0, 1].
+
+        Args:
+            values (ndarray): The values to normalize, of any shape.
+            normalization (ColorMap.Normalization): How to normalize the values.
+
+        Returns:
+            ndarray: The normalized values, of the same shape. Non-finite values (and non-positive
+            values, for ``Normalization.LOG``) normalize to 0.
+        """
+
+        values = np.asarray(values, dtype=float)
+        normalized = np.zeros(values.shape)
+
+        if normalization is ColorMap.Normalization.LOG:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                values = np.where(values > 0.0, np.log10(values), np.nan)
+
+        valid = np.isfinite(values)
+        if not valid.any():
+            return normalized
+
+        finite = values[valid]
+
+        if normalization is ColorMap.Normalization.RANK:
+            # The fraction of values at or below each value, so equal values share a color.
+            # Searching for the values in sorted order is much faster than in their original order.
+            order = np.argsort(finite)
+            ordered = finite[order]
+            ranks = np.empty(finite.size)
+            ranks[order] = np.searchsorted(ordered, ordered, side="right")
+            normalized[valid] = ranks / finite.size
+            return normalized
+
+        if normalization is ColorMap.Normalization.PERCENTILE:
+            low, high = np.percentile(finite, ColorMap.PERCENTILE_CLIP)
+        else:
+            low, high = finite.min(), finite.max()
+
+        if high > low:
+            normalized[valid] = np.clip((finite - low) / (high - low), 0.0, 1.0)
+
+        return normalized
+
+
+FIELD_COLOR_MAP = ColorMap([0.0, 0.5, 1.0], [(0, 255, 0), (255, 255, 0), (255, 0, 0)])
+"""
+The colormap of the electric field magnitude, from the weakest field (green) through yellow to the
+strongest (red), shared by the arrows and the heatmap.
+"""
@@ -2,47 +2,64 @@
 A PlotWidget that can be dropped into.
 """
 
+import math
 import sys
-from typing import List, NamedTuple, Optional, Tuple
+from typing import List, NamedTuple, Optional, Tuple, Union
 
 import numpy as np
 import pyqtgraph
 from PyQt6 import QtCore, QtGui, QtWidgets
 
 # pylint: disable=import-error
+from equations.adaptive_sampling import AdaptiveField
 from equations.circle_charge import CircleCharge
 from equations.constants import Point2D
+from equations.contours import Contours
+from equations.field_lines import FieldLines
+from equations.field_magnitude import MagnitudeGrid
+from equations.field_tile_cache import FieldTileCache, LatticeField
+from equations.field_worker import FieldWorker
 from equations.graph_window import GraphWindow
 from equations.infinite_line_charge import InfiniteLineCharge
 from equations.point_charge import PointCharge
 from equations.ring_charge import RingCharge
+from view.color_map import FIELD_COLOR_MAP, ColorMap
 from view.draggable_label import DraggableLabel
+from view.vector_field_item import VectorFieldItem
 
 # pylint: enable=import-error
 
-RGBTuple = NamedTuple("RGBTuple", [("r", int), ("g", int), ("b", int)])
 GraphBounds = NamedTuple("GraphBounds", [("top_left", Point2D), ("bottom_right", Point2D)])
 
 
-class ArrowTailItem(pyqtgraph.ArrowItem):
+class DroppablePlotWidget(pyqtgraph.PlotWidget):
     """
-    An ArrowItem that loads its position from the tail (end) of the arrow, not from the head of the
-    arrow.
+    A PlotWidget that can be dropped into.
     """
 
-    def paint(self, p: QtGui.QPainter, *args) -> None:
-        p.translate(-2 * self.boundingRect().center())
-        return super().paint(p, *args)
+    DEFAULT_GRAPH_RESOLUTION = 20
+    """
+    The default number of x-axis points to render.
+    """
 
+    REFINEMENT_PASSES = 4
+    """
+    The number of passes the arrows are refined over, each doubling the resolution of the last.
+    """
 
-class DroppablePlotWidget(pyqtgraph.PlotWidget):
+    EQUIPOTENTIAL_PIXELS = 4
     """
-    A PlotWidget that can be dropped into.
+    The number of pixels between the grid points the equipotential contours are extracted from.
     """
 
-    DEFAULT_GRAPH_RESOLUTION = 20
+    HEATMAP_ARROW_DIVISOR = 2
     """
-    The default number of x-axis points to render.
+    How many times sparser the arrows are when drawn over the heatmap.
+    """
+
+    RANGE_CHANGE_INTERVAL = 33
+    """
+    The shortest time, in milliseconds, between rebuilding the arrows while the view is moving.
     """
 
     def __init__(self,
@@ -65,6 +82,55 @@ class DroppablePlotWidget(pyqtgraph.PlotWidget):
         The number of x-axis points to render.
         """
 
+        self.adaptive_sampling = False
+        """
+        Whether arrows are placed adaptively, concentrated where the field varies, instead of on a
+        uniform grid. The same number of field evaluations is used either way. Calling
+        ``toggle_adaptive_sampling`` toggles this value.
+        """
+
+        self.heatmap = False
+        """
+        Whether the field magnitude is drawn as a heatmap, evaluated at every ``heatmap_pixels``
+        pixels, under sparser arrows. Calling ``toggle_heatmap`` toggles this value.
+        """
+
+        self.heatmap_pixels = 1
+        """
+        The width and height, in pixels, of each cell of the heatmap. Set by
+        ``set_heatmap_pixels``.
+        """
+
+        self.color_normalization = ColorMap.Normalization.RANK
+        """
+        How field magnitudes are normalized before they are colored, for both the arrows and the
+        heatmap. Set by ``set_color_normalization``.
+        """
+
+        self.heatmap_arrows = True
+        """
+        Whether arrows are drawn over the heatmap. Calling ``toggle_heatmap_arrows`` toggles this
+        value.
+        """
+
+        self.show_field_lines = False
+        """
+        Whether field lines are traced from every charge, on top of the arrows. Calling
+        ``toggle_field_lines`` toggles this value.
+        """
+
+        self.show_equipotentials = False
+        """
+        Whether equipotential contours are drawn, on top of the arrows. Calling
+        ``toggle_equipotentials`` toggles this value.
+        """
+
+        self.equipotential_spacing: Optional[float] = None
+        """
+        The difference in potential between neighboring equipotential contours, or None to choose
+        the contours automatically. Set by ``set_equipotential_spacing``.
+        """
+
         self.graph_window = GraphWindow([
             PointCharge(Point2D(1, 4), 10),
             PointCharge(Point2D(-3, 5), 8),
@@ -78,6 +144,70 @@ class DroppablePlotWidget(pyqtgraph.PlotWidget):
             RingCharge(Point2D(0, 0), 0, 1, 20)
         ])
 
+        self.vector_field_item = VectorFieldItem()
+        """
+        The single item holding every electric field arrow, updated in place on each rebuild.
+        """
+
+        self.field_worker = FieldWorker(self)
+        """
+        Evaluates the electric field off the GUI thread, emitting only the newest result.
+        """
+        self.field_worker.field_ready.connect(self._field_ready)
+
+        self.field_line_item = pyqtgraph.PlotCurveItem(pen={"color": "w", "width": 1})
+        """
+        The single item holding every field line, updated in place on each rebuild.
+        """
+
+        self.field_line_worker = FieldWorker(self)
+        """
+        Traces field lines off the GUI thread, separately from the arrows so neither supersedes the
+        other.
+        """
+        self.field_line_worker.field_ready.connect(self._field_lines_ready)
+
+        self.equipotential_item = pyqtgraph.PlotCurveItem(pen={"color": "c", "width": 1})
+        """
+        The single item holding every equipotential contour segment, updated in place on each
+        rebuild.
+        """
+
+        self.equipotential_worker = FieldWorker(self)
+        """
+        Extracts equipotential contours off the GUI thread, keeping recent potential grids so that
+        changing the contour spacing does not re-evaluate the potential.
+        """
+        self.equipotential_worker.field_ready.connect(self._equipotentials_ready)
+
+        self.heatmap_item = pyqtgraph.ImageItem()
+        """
+        The image of the field magnitude, drawn below every other item.
+        """
+        self.heatmap_item.setZValue(-1)
+
+        self.heatmap_worker = FieldWorker(self)
+        """
+        Evaluates the heatmap off the GUI thread, separately from the arrows so neither supersedes
+        the other.
+        """
+        self.heatmap_worker.field_ready.connect(self._heatmap_ready)
+
+        self._max_mag_length = 20.0
+
+        # Rebuild the arrows at most once per interval while the view is panned or zoomed.
+        self._range_change_timer = QtCore.QTimer(self)
+        self._range_change_timer.setSingleShot(True)
+        self._range_change_timer.setInterval(DroppablePlotWidget.RANGE_CHANGE_INTERVAL)
+        self._range_change_timer.timeout.connect(self._range_changed)
+        self.get_pi_vb()[1].sigRangeChanged.connect(self._throttle_range_change)
+
+        self.multipole_error = 0.0
+        """
+        The estimated relative error of the currently plotted arrows, which is 0 unless the
+        multipole evaluator was used.
+        """
+
     def get_pi_vb(self) -> Tuple[pyqtgraph.PlotItem, pyqtgraph.ViewBox]:
         """
         Get the PlotItem & ViewBox.
@@ -207,11 +337,18 @@ class DroppablePlotWidget(pyqtgraph.PlotWidget):
             plot_item.getAxis(axis).setGrid(255)
 
         default_dimensions = self._plot_charges()
+        self.addItem(self.vector_field_item)
+        self.addItem(self.field_line_item, ignoreBounds=True)
+        self.addItem(self.equipotential_item, ignoreBounds=True)
+        self.addItem(self.heatmap_item, ignoreBounds=True)
 
         # Build the dimensions based solely on the charges, or the provided dimensions.
         dimensions = dimensions or default_dimensions
 
         self._plot_arrows(dimensions, max_mag_length)
+        self._plot_field_lines(dimensions)
+        self._plot_equipotentials(dimensions)
+        self._plot_heatmap(dimensions)
 
         if should_autoscale:
             # Enable autoscaling if no dimension set.
@@ -219,7 +356,14 @@ class DroppablePlotWidget(pyqtgraph.PlotWidget):
 
     def _plot_arrows(self, dimensions: GraphBounds, max_mag_length: float) -> None:
         """
-        Plot electric field magnitude arrows.
+        Request the electric field magnitude arrows, which are plotted once the field has been
+        evaluated in the background. Until then, the previous arrows stay visible.
+
+        The arrows are refined over ``REFINEMENT_PASSES`` passes, from a coarse lattice up to
+        ``graph_resolution``, so that something is shown quickly. With ``adaptive_sampling``, the
+        arrows are instead placed at the leaves of an adaptive quadtree. Over the heatmap, arrows
+        are ``HEATMAP_ARROW_DIVISOR`` times sparser, or not drawn at all without
+        ``heatmap_arrows``.
 
         Args:
             dimensions (GraphBounds): The bounding dimensions of the graph window.
@@ -228,77 +372,215 @@ class DroppablePlotWidget(pyqtgraph.PlotWidget):
 
         # Draw arrows at uniform test points based current view and resolution
         x_indices = self.graph_resolution
+        if self.heatmap:
+            x_indices = (x_indices // DroppablePlotWidget.HEATMAP_ARROW_DIVISOR
+                         if self.heatmap_arrows else 0)
         y_indices = max(int(self.height() / self.width() * x_indices), 1)
 
+        if x_indices <= 0:
+            self.field_worker.cancel()
+            self.vector_field_item.clear()
+            return
+
         x_distance = dimensions.bottom_right.x - dimensions.top_left.x
         y_distance = dimensions.top_left.y - dimensions.bottom_right.y
 
-        p_x = [[0.0] * y_indices for _ in range(x_indices)]
-        p_y = [[0.0] * y_indices for _ in range(x_indices)]
-
-        mag_x = [[0.0] * y_indices for _ in range(x_indices)]
-        mag_y = [[0.0] * y_indices for _ in range(x_indices)]
-        net_mag = [[0.0] * y_indices for _ in range(x_indices)]
-
-        for i in range(x_indices):
-            try:
-                x_percentage = i / (x_indices - 1)
-            except ZeroDivisionError:
-                x_percentage = 0.5
-
-            x_pos = x_percentage * x_distance + dimensions.top_left.x
-
-            for j in range(y_indices):
-                try:
-                    y_percentage = j / (y_indices - 1)
-                except ZeroDivisionError:
-                    y_percentage = 0.5
-
-                y_pos = y_percentage * y_distance + dimensions.bottom_right.y
-
-                p_x[i][j] = x_pos
-                p_y[i][j] = y_pos
-
-                try:
-                    ef_mag_x = self.graph_window.electric_field_x(Point2D(x_pos, y_pos))
-                    ef_mag_y = self.graph_window.electric_field_y(Point2D(x_pos, y_pos))
-
-                except ZeroDivisionError:
-                    continue
-
-                ef_mag_net = np.sqrt(ef_mag_x**2 + ef_mag_y**2)
-                mag_x[i][j] = ef_mag_x
-                mag_y[i][j] = ef_mag_y
-                net_mag[i][j] = ef_mag_net
-
-        # Build sorted array holding indexes of magnitude
-        MagIndexes = NamedTuple("MagIndexes", [("magnitude", float), ("x", int), ("y", int)])
-        flat_arr: List[MagIndexes] = []
-        for i in range(x_indices):
-            for j in range(y_indices):
-                flat_arr.append(MagIndexes(net_mag[i][j], i, j))
-        flat_arr.sort(key=lambda mag_idx: mag_idx.magnitude)
-
-        net_mag_idx = [[0] * y_indices for _ in range(x_indices)]
-        for idx, mag_idx in enumerate(flat_arr):
-            # Now build mapping from unsorted net_mag array to sorted array
-            net_mag_idx[mag_idx.x][mag_idx.y] = idx
-
-        # Plot the vector arrows
-        for i in range(x_indices):
-            for j in range(y_indices):
-                if net_mag[i][j] <= 0.0:
-                    continue
-
-                angle = 180 - np.rad2deg(np.arctan2(mag_y[i][j], mag_x[i][j]))
-                normalized_mag = net_mag[i][j] / flat_arr[-1].magnitude
-                scaled_mag = normalized_mag * max_mag_length
-                brush_color = self._get_color_from_mag(net_mag_idx[i][j], len(flat_arr))
-                arrow_item = ArrowTailItem(pos=(p_x[i][j], p_y[i][j]),
-                                           tailLen=scaled_mag,
-                                           brush=brush_color,
-                                           angle=angle)
-                self.addItem(arrow_item)
+        self._max_mag_length = max_mag_length
+
+        x_range = (dimensions.top_left.x, dimensions.bottom_right.x)
+        y_range = (dimensions.bottom_right.y, dimensions.top_left.y)
+
+        if self.adaptive_sampling:
+            # Keep cells at least an arrow head across, so arrows do not pile up on each other.
+            pixel_width, pixel_height = self.get_pi_vb()[1].viewPixelSize()
+            min_cell_size = (VectorFieldItem.HEAD_LENGTH * pixel_width,
+                             VectorFieldItem.HEAD_LENGTH * pixel_height)
+
+            self.field_worker.request_adaptive(self.graph_window.snapshot(),
+                                               self.graph_window.multipole_accuracy, x_range,
+                                               y_range, x_indices * y_indices, min_cell_size)
+            return
+
+        # Sample on a world-aligned lattice so that tiles evaluated for earlier views are reused.
+        # Each coarser pass is an octave coarser, so its points are shared with the next pass.
+        x_level = FieldTileCache.lattice_level(x_distance, x_indices)
+        y_level = FieldTileCache.lattice_level(y_distance, y_indices)
+        octave = FieldTileCache.LEVELS_PER_OCTAVE
+        levels = [(x_level + octave * step, y_level + octave * step)
+                  for step in range(DroppablePlotWidget.REFINEMENT_PASSES - 1, -1, -1)]
+
+        self.field_worker.request(self.graph_window.snapshot(),
+                                  self.graph_window.multipole_accuracy, x_range, y_range, levels)
+
+    def _plot_field_lines(self, dimensions: GraphBounds) -> None:
+        """
+        Request the field lines, which are plotted once they have been traced in the background.
+        Until then, the previous lines stay visible.
+
+        Args:
+            dimensions (GraphBounds): The bounding dimensions of the graph window.
+        """
+
+        if not self.show_field_lines:
+            self.field_line_worker.cancel()
+            self.field_line_item.clear()
+            return
+
+        self.field_line_worker.request_field_lines(
+            self.graph_window.snapshot(), self.graph_window.multipole_accuracy,
+            (dimensions.top_left.x, dimensions.bottom_right.x),
+            (dimensions.bottom_right.y, dimensions.top_left.y))
+
+    def _plot_equipotentials(self, dimensions: GraphBounds) -> None:
+        """
+        Request the equipotential contours, which are plotted once they have been extracted in the
+        background. Until then, the previous contours stay visible.
+
+        Args:
+            dimensions (GraphBounds): The bounding dimensions of the graph window.
+        """
+
+        if not self.show_equipotentials:
+            self.equipotential_worker.cancel()
+            self.equipotential_item.clear()
+            return
+
+        shape = (max(self.width() // DroppablePlotWidget.EQUIPOTENTIAL_PIXELS, 2),
+                 max(self.height() // DroppablePlotWidget.EQUIPOTENTIAL_PIXELS, 2))
+
+        self.equipotential_worker.request_equipotentials(
+            self.graph_window.snapshot(), (dimensions.top_left.x, dimensions.bottom_right.x),
+            (dimensions.bottom_right.y, dimensions.top_left.y), shape, self.equipotential_spacing)
+
+    def _plot_heatmap(self, dimensions: GraphBounds) -> None:
+        """
+        Request the field magnitude heatmap, which is plotted once it has been evaluated in the
+        background. Until then, the previous heatmap stays visible.
+
+        Args:
+            dimensions (GraphBounds): The bounding dimensions of the graph window.
+        """
+
+        if not self.heatmap:
+            self.heatmap_worker.cancel()
+            self.heatmap_item.clear()
+            return
+
+        x_range = (dimensions.top_left.x, dimensions.bottom_right.x)
+        y_range = (dimensions.bottom_right.y, dimensions.top_left.y)
+
+        # One cell per heatmap_pixels screen pixels
+        pixel_width, pixel_height = self.get_pi_vb()[1].viewPixelSize()
+        shape = (max(math.ceil((x_range[1] - x_range[0]) / (pixel_width * self.heatmap_pixels)), 1),
+                 max(math.ceil((y_range[1] - y_range[0]) / (pixel_height * self.heatmap_pixels)),
+                     1))
+
+        self.heatmap_worker.request_magnitude(self.graph_window.snapshot(),
+                                              self.graph_window.multipole_accuracy, x_range,
+                                              y_range, shape)
+
+    def _throttle_range_change(self) -> None:
+        """
+        The view is being panned or zoomed, so rebuild the arrows once the interval since the last
+        rebuild is up.
+        """
+
+        if not self._range_change_timer.isActive():
+            self._range_change_timer.start()
+
+    def _range_changed(self) -> None:
+        """
+        The view has been panned or zoomed, so rebuild the arrows, field lines and equipotentials
+        for the new view.
+        """
+
+        dimensions = self._get_graph_bounds()
+        self._plot_arrows(dimensions, self._max_mag_length)
+        self._plot_field_lines(dimensions)
+        self._plot_equipotentials(dimensions)
+        self._plot_heatmap(dimensions)
+
+    def _field_ready(self, generation: int, field: Union[LatticeField, AdaptiveField]) -> None:
+        """
+        Plot the electric field magnitude arrows from a newly evaluated field.
+
+        Args:
+            generation (int): The generation of the request the field was evaluated for.
+            field (Union[LatticeField, AdaptiveField]): The electric field on the sample lattice,
+                or at the adaptively sampled points.
+        """
+
+        if generation != self.field_worker.generation:
+            return
+
+        if isinstance(field, AdaptiveField):
+            p_x, p_y = field.xs, field.ys
+        else:
+            # Grids are indexed [x_index, y_index]
+            p_x, p_y = np.meshgrid(field.xs, field.ys, indexing="ij")
+
+        mag_x, mag_y = field.e_x, field.e_y
+        net_mag = np.hypot(mag_x, mag_y)
+        self.multipole_error = field.error
+
+        flat_mag = net_mag.ravel()
+        # There may be no sample points at all.
+        max_mag = flat_mag.max() if flat_mag.size else 0.0
+        angles = np.arctan2(mag_y, mag_x).ravel()
+        scaled_mags = flat_mag / max_mag * self._max_mag_length if max_mag > 0.0 else flat_mag
+        colors = FIELD_COLOR_MAP.map(flat_mag, self.color_normalization)
+
+        # Plot the vector arrows, skipping any without a field
+        visible = flat_mag > 0.0
+        self.vector_field_item.set_data(p_x.ravel()[visible],
+                                        p_y.ravel()[visible], angles[visible],
+                                        scaled_mags[visible], colors[visible])
+
+    def _field_lines_ready(self, generation: int, lines: FieldLines) -> None:
+        """
+        Plot newly traced field lines.
+
+        Args:
+            generation (int): The generation of the request the lines were traced for.
+            lines (FieldLines): The traced lines.
+        """
+
+        if generation != self.field_line_worker.generation:
+            return
+
+        self.field_line_item.setData(lines.xs, lines.ys, connect=lines.connect)
+
+    def _equipotentials_ready(self, generation: int, contours: Contours) -> None:
+        """
+        Plot newly extracted equipotential contours.
+
+        Args:
+            generation (int): The generation of the request the contours were extracted for.
+            contours (Contours): The extracted contours.
+        """
+
+        if generation != self.equipotential_worker.generation:
+            return
+
+        self.equipotential_item.setData(contours.xs, contours.ys, connect="pairs")
+
+    def _heatmap_ready(self, generation: int, grid: MagnitudeGrid) -> None:
+        """
+        Plot a newly evaluated field magnitude heatmap.
+
+        Args:
+            generation (int): The generation of the request the heatmap was evaluated for.
+            grid (MagnitudeGrid): The field magnitude on the heatmap's grid.
+        """
+
+        if generation != self.heatmap_worker.generation:
+            return
+
+        self.heatmap_item.setImage(FIELD_COLOR_MAP.map(grid.magnitude, self.color_normalization),
+                                   autoLevels=False)
+        self.heatmap_item.setRect(
+            QtCore.QRectF(grid.x_range[0], grid.y_range[0], grid.x_range[1] - grid.x_range[0],
+                          grid.y_range[1] - grid.y_range[0]))
 
     def reset_resolution(self) -> None:
         """
@@ -336,6 +618,108 @@ class DroppablePlotWidget(pyqtgraph.PlotWidget):
         # Regenerate the plots with the new positions (and same charges)
         self.build_plots(dimensions=self._get_graph_bounds())
 
+    def toggle_adaptive_sampling(self) -> None:
+        """
+        Toggle placing arrows adaptively, and rebuild the plots based on currently viewable
+        dimensions.
+        """
+
+        self.adaptive_sampling = not self.adaptive_sampling
+        self.build_plots(dimensions=self._get_graph_bounds())
+
+    def toggle_heatmap(self) -> None:
+        """
+        Toggle drawing the field magnitude heatmap, and rebuild the plots based on currently
+        viewable dimensions.
+        """
+
+        self.heatmap = not self.heatmap
+        self.build_plots(dimensions=self._get_graph_bounds())
+
+    def set_color_normalization(self, normalization: ColorMap.Normalization) -> None:
+        """
+        Set how field magnitudes are normalized before they are colored, and rebuild the plots
+        based on currently viewable dimensions.
+
+        Args:
+            normalization (ColorMap.Normalization): The new normalization.
+        """
+
+        self.color_normalization = normalization
+        self.build_plots(dimensions=self._get_graph_bounds())
+
+    def toggle_heatmap_arrows(self) -> None:
+        """
+        Toggle drawing arrows over the heatmap, and rebuild the plots based on currently viewable
+        dimensions.
+        """
+
+        self.heatmap_arrows = not self.heatmap_arrows
+        self.build_plots(dimensions=self._get_graph_bounds())
+
+    def set_heatmap_pixels(self) -> None:
+        """
+        Ask for the size of each heatmap cell, in pixels, and rebuild the plots with it.
+        """
+
+        pixels, success = QtWidgets.QInputDialog().getInt(self, "Set Heatmap Pixel Size",
+                                                          "Pixels per heatmap cell",
+                                                          self.heatmap_pixels, 1, 64)
+
+        if success:
+            self.heatmap_pixels = pixels
+            self.build_plots(dimensions=self._get_graph_bounds())
+
+    def toggle_field_lines(self) -> None:
+        """
+        Toggle tracing field lines, and rebuild the plots based on currently viewable dimensions.
+        """
+
+        self.show_field_lines = not self.show_field_lines
+        self.build_plots(dimensions=self._get_graph_bounds())
+
+    def toggle_equipotentials(self) -> None:
+        """
+        Toggle drawing equipotential contours, and rebuild the plots based on currently viewable
+        dimensions.
+        """
+
+        self.show_equipotentials = not self.show_equipotentials
+        self.build_plots(dimensions=self._get_graph_bounds())
+
+    def set_equipotential_spacing(self) -> None:
+        """
+        Ask for the difference in potential between neighboring equipotential contours and redraw
+        them. Only the contours are redrawn, since the potential of the current view is cached.
+
+        A spacing of 0 chooses the contours automatically.
+        """
+
+        spacing, success = QtWidgets.QInputDialog().getDouble(
+            self, "Set Equipotential Spacing",
+            "Potential between contours (V, 0 chooses them automatically)",
+            self.equipotential_spacing or 0.0, 0.0, 1e30, 3)
+
+        if success:
+            self.equipotential_spacing = spacing if spacing > 0.0 else None
+            self._plot_equipotentials(self._get_graph_bounds())
+
+    def set_multipole_accuracy(self) -> None:
+        """
+        Ask for the opening angle of the multipole evaluator and rebuild the plots with it.
+
+        An opening angle of 0 disables the multipole evaluator, summing every charge directly.
+        """
+
+        accuracy, success = QtWidgets.QInputDialog().getDouble(
+            self, "Set Multipole Accuracy",
+            "Opening angle (smaller is more accurate, 0 sums every charge directly)",
+            self.graph_window.multipole_accuracy or 0.0, 0.0, 0.95, 2)
+
+        if success:
+            self.graph_window.multipole_accuracy = accuracy if accuracy > 0.0 else None
+            self.build_plots(dimensions=self._get_graph_bounds())
+
     def center_origin(self) -> None:
         """
         Center the ViewBox around the origin without changing the scale factors.
@@ -510,68 +894,6 @@ class DroppablePlotWidget(pyqtgraph.PlotWidget):
 
         return GraphBounds(top_left, bottom_right)
 
-    def _get_color_from_mag(self, index: int, length: int) -> RGBTuple:
-        """
-        Return the color from the given index. We use 3 different colors to draw brush our vectors
-        with:
-        green -> yellow | (low magnitude)
-        yellow -> red   | (high magnitude)
-
-        Args:
-            index (int): The index into the sorted array.
-            length (int): The length of the sorted array.
-
-        Returns:
-            RGBTuple: An RGBTuple of R, G, B colors to brush the arrow with.
-        """
-
-        low_mag_color = RGBTuple(0, 255, 0)
-        med_mag_color = RGBTuple(255, 255, 0)
-        high_mag_color = RGBTuple(255, 0, 0)
-
-        percentile = (index + 1) / length
-
-        # Green -> Yellow
-        if percentile <= 0.50:
-            return self._gradient_color_map(percentile * 2, low_mag_color, med_mag_color)
-
-        # Yellow -> Red
-        return self._gradient_color_map((percentile - 0.50) * 2, med_mag_color, high_mag_color)
-
-    def _gradient_color_map(self, percentile: float, min_color: RGBTuple,
-                            max_color: RGBTuple) -> RGBTuple:
-        """
-        Takes in a percentile of an array and maps it to the expected color given the start and end
-        color of a gradient.
-
-        Args:
-            percentile (float): The percentile of this index.
-            min_color (RGBTuple): Left most color of gradient.
-            max_color (RGBTuple): Right most color of gradient.
-
-        Returns:
-            RGBTuple: An RGBTuple of R, G, B colors as integers.
-        """
-
-        if percentile <= 0.0:
-            return min_color
-
-        if percentile >= 1.0:
-            return max_color
-
-        # calculate how far to shift each color value
-        r_diff = min_color.r - max_color.r
-        g_diff = min_color.g - max_color.g
-        b_diff = min_color.b - max_color.b
-        r_shift = r_diff * percentile
-        g_shift = g_diff * percentile
-        b_shift = b_diff * percentile
-
-        red = min_color.r - r_shift
-        green = min_color.g - g_shift
-        blue = min_color.b - b_shift
-        return RGBTuple(int(red), int(green), int(blue))
-
     def charges_updated(self) -> None:
         """
         When charges change, reload the graphs.
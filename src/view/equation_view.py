@@ -0,0 +1,110 @@
+"""
+The ways of showing equations, and the interface of the widgets showing them.
+"""
+
+import enum
+import importlib
+import os
+import sys
+from typing import List, Optional, Protocol, Type
+
+from sympy import Basic
+
+# pylint: disable=import-error
+from equations.printed_equations import PrintedEquations
+
+# pylint: enable=import-error
+
+MATHJAX_SCRIPT_PATH = "view/mathjax/es5/tex-chtml.js"
+"""
+The path of the bundled copy of MathJax, relative to the source directory. MathJax is not part of
+the repository (see ``view/mathjax/README.md``), so it may be missing.
+"""
+
+
+class EquationView(Protocol):
+    """
+    A widget showing one component (see ``COMPONENTS``) of the equations of every charge.
+    """
+
+    @staticmethod
+    def printer(expression: Basic) -> str:
+        """
+        Print an equation the way this widget shows it.
+
+        Args:
+            expression (Basic): The equation.
+
+        Returns:
+            str: The printed equation.
+        """
+
+    def show_equations(self, component: str,
+                       equations: List[Optional[PrintedEquations]]) -> None:
+        """
+        Show one component of the equations of every charge, as printed by ``printer``.
+
+        The magnitudes are shown as one equation per charge, and the x and y components as their
+        sum over every charge.
+
+        Args:
+            component (str): The component shown, one of ``COMPONENTS``.
+            equations (List[Optional[PrintedEquations]]): The printed equations of each charge, or
+                None while they are being built.
+        """
+
+    def show_loading(self) -> None:
+        """
+        Show that no equations are ready yet.
+        """
+
+
+class EquationRenderer(enum.Enum):
+    """
+    The ways of showing equations, chosen at startup.
+    """
+
+    MATHJAX = "mathjax"
+    """
+    Typeset LaTeX with MathJax, in web views. Each view runs its own Chromium renderer process.
+    """
+
+    TEXT = "text"
+    """
+    Print Unicode text with sympy's pretty printer, in text browsers. Starts faster and uses far
+    less memory, since Qt WebEngine is never imported.
+    """
+
+    @staticmethod
+    def default() -> "EquationRenderer":
+        """
+        The way of showing equations unless another is chosen: with MathJax if a copy is bundled,
+        and as text otherwise, since without MathJax the web views could only show LaTeX source.
+
+        Returns:
+            EquationRenderer: The default way of showing equations.
+        """
+
+        if os.path.isfile(os.path.join(sys.path[0], MATHJAX_SCRIPT_PATH)):
+            return EquationRenderer.MATHJAX
+
+        return EquationRenderer.TEXT
+
+    def view_type(self) -> Type[EquationView]:
+        """
+        Import the widget showing equations this way.
+
+        Qt WebEngine must be imported before the application is created, so this should be called
+        before creating the application.
+
+        Returns:
+            Type[EquationView]: The type of the widget.
+        """
+
+        if self is EquationRenderer.MATHJAX:
+            module_name, class_name = "view.mathjax_equation_view", "MathJaxEquationView"
+        else:
+            module_name, class_name = "view.text_equation_view", "TextEquationView"
+
+        # Imported only when chosen, so that Qt WebEngine is only loaded if it is used.
+        return getattr(importlib.import_module(module_name), class_name)
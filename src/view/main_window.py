@@ -3,18 +3,20 @@ The main window.
 """
 import os
 import sys
-from typing import Tuple
+from typing import Dict, List, Optional, Tuple
 
 import pyqtgraph
-from PyQt6 import QtCore, QtGui, QtWebEngineWidgets, QtWidgets, uic
-from sympy import latex
+from PyQt6 import QtCore, QtGui, QtWidgets, uic
 
 # pylint: disable=import-error
 from equations.constants import Point2D
+from equations.equation_disk_cache import EquationDiskCache
 from equations.equation_thread import EquationThread
-from equations.sympy_helper import make_source
+from equations.printed_equations import PrintedEquations
+from view.color_map import ColorMap
 from view.draggable_label import DraggableLabel
 from view.droppable_plot_widget import DroppablePlotWidget
+from view.equation_view import EquationRenderer, EquationView
 
 # pylint: enable=import-error
 
@@ -28,9 +30,10 @@ class MainWindow(QtWidgets.QMainWindow):
     central_widget: QtWidgets.QWidget
     grid_layout: QtWidgets.QGridLayout
     graph_widget: DroppablePlotWidget
-    net_mag_equation_label: QtWebEngineWidgets.QWebEngineView
-    x_equation_label: QtWebEngineWidgets.QWebEngineView
-    y_equation_label: QtWebEngineWidgets.QWebEngineView
+    equation_layout: QtWidgets.QHBoxLayout
+    net_mag_equation_label: EquationView
+    x_equation_label: EquationView
+    y_equation_label: EquationView
     point_charge_circle: DraggableLabel
     line_charge_drawing: DraggableLabel
     circle_charge_drawing: DraggableLabel
@@ -39,14 +42,35 @@ class MainWindow(QtWidgets.QMainWindow):
     menu_bar: QtWidgets.QMenuBar
     status_bar: QtWidgets.QStatusBar
 
-    def __init__(self) -> None:
+    def __init__(self, renderer: EquationRenderer = EquationRenderer.MATHJAX) -> None:
+        """
+        Initialize the window, and show it.
+
+        Args:
+            renderer (EquationRenderer): How the equations are shown. Defaults to MathJax.
+        """
+
         super().__init__()
 
         uic.load_ui.loadUi(os.path.join(sys.path[0], "view/ui/main_window.ui"), self)
 
-        self.equations_thread = EquationThread(self.graph_widget.graph_window, self)
-        self.equations_thread.started.connect(self._clear_equations)
-        self.equations_thread.finished.connect(self._update_equations)
+        equation_view_type = renderer.view_type()
+        self.net_mag_equation_label = equation_view_type(self)
+        self.x_equation_label = equation_view_type(self)
+        self.y_equation_label = equation_view_type(self)
+        for label in (self.net_mag_equation_label, self.x_equation_label, self.y_equation_label):
+            label.setMinimumHeight(100)
+            self.equation_layout.addWidget(label)
+
+        self.graph_widget.graph_window.equation_cache.disk_cache = EquationDiskCache()
+
+        # The printed equations of each charge, as last announced by the equations thread.
+        self._printed_equations: List[Optional[PrintedEquations]] = []
+
+        self.equations_thread = EquationThread(self.graph_widget.graph_window, self,
+                                               printer=equation_view_type.printer)
+        self.equations_thread.equations_changed.connect(self._equations_changed)
+        QtWidgets.QApplication.instance().aboutToQuit.connect(self.equations_thread.stop)
 
         self.graph_widget.graph_window.charges_updated = self._charges_updated
 
@@ -59,7 +83,7 @@ class MainWindow(QtWidgets.QMainWindow):
         self._add_menus()
         self._paint_shapes()
         self.graph_widget.build_plots()
-        self.equations_thread.start()
+        self._request_equations()
 
         self.setWindowState(QtCore.Qt.WindowState.WindowMaximized)
 
@@ -82,6 +106,39 @@ class MainWindow(QtWidgets.QMainWindow):
         graph_menu.addAction("Default range", "Ctrl+D", self.graph_widget.default_range)
         graph_menu.addAction("Toggle fixed aspect ratio", "Ctrl+A",
                              self.graph_widget.toggle_even_aspect_ratio)
+        graph_menu.addAction("Set multipole accuracy", self.graph_widget.set_multipole_accuracy)
+        adaptive_action = graph_menu.addAction("Adaptive sampling",
+                                               self.graph_widget.toggle_adaptive_sampling)
+        adaptive_action.setCheckable(True)
+        adaptive_action.setChecked(self.graph_widget.adaptive_sampling)
+        heatmap_action = graph_menu.addAction("Heatmap", self.graph_widget.toggle_heatmap)
+        heatmap_action.setCheckable(True)
+        heatmap_action.setChecked(self.graph_widget.heatmap)
+        heatmap_arrows_action = graph_menu.addAction("Arrows over heatmap",
+                                                     self.graph_widget.toggle_heatmap_arrows)
+        heatmap_arrows_action.setCheckable(True)
+        heatmap_arrows_action.setChecked(self.graph_widget.heatmap_arrows)
+        graph_menu.addAction("Set heatmap pixel size", self.graph_widget.set_heatmap_pixels)
+        color_scale_menu = graph_menu.addMenu("Color scale")
+        color_scale_group = QtGui.QActionGroup(color_scale_menu)
+        for normalization in ColorMap.Normalization:
+            color_scale_action = color_scale_menu.addAction(
+                normalization.name.capitalize(),
+                lambda normalization=normalization: self.graph_widget.set_color_normalization(
+                    normalization))
+            color_scale_action.setCheckable(True)
+            color_scale_action.setChecked(normalization == self.graph_widget.color_normalization)
+            color_scale_group.addAction(color_scale_action)
+        field_lines_action = graph_menu.addAction("Field lines",
+                                                  self.graph_widget.toggle_field_lines)
+        field_lines_action.setCheckable(True)
+        field_lines_action.setChecked(self.graph_widget.show_field_lines)
+        equipotentials_action = graph_menu.addAction("Equipotentials",
+                                                     self.graph_widget.toggle_equipotentials)
+        equipotentials_action.setCheckable(True)
+        equipotentials_action.setChecked(self.graph_widget.show_equipotentials)
+        graph_menu.addAction("Set equipotential spacing",
+                             self.graph_widget.set_equipotential_spacing)
 
         # ---- CHARGES MENU OPTIONS ----
         charge_menu = self.menu_bar.addMenu("Charges")
@@ -208,6 +265,9 @@ class MainWindow(QtWidgets.QMainWindow):
             y_fs = "e" if abs(y_pos) > 1e5 or (y_pos != 0.0 and abs(y_pos) < 1e-2) else "f"
             text = f"X: {x_pos:+.2{x_fs}} Y: {y_pos:+.2{y_fs}} Magnitude: {ef_mag_net:.6g}"
 
+            if self.graph_widget.multipole_error > 0.0:
+                text += f" Multipole error: {self.graph_widget.multipole_error:.2%}"
+
             self.graph_widget.setToolTip(text)
             self.status_bar.showMessage(text)
 
@@ -220,49 +280,58 @@ class MainWindow(QtWidgets.QMainWindow):
         """
 
         self.graph_widget.charges_updated()
-        self.equations_thread.start()
+        self._request_equations()
 
-    def _update_equations(self) -> None:
+    def _request_equations(self) -> None:
         """
-        Read the values from the equations thread and update the labels.
+        Rebuild the equations of the current charges in the background, abandoning any equations
+        still being built for earlier charges.
         """
 
-        mag_eqns = self.equations_thread.mag_eqns
-        x_eqns = self.equations_thread.x_eqns
-        y_eqns = self.equations_thread.y_eqns
+        self.equations_thread.request(self.graph_widget.graph_window.snapshot())
 
-        mag_html = ""
-        for i, mag_eqn in enumerate(mag_eqns):
-            mag_html += f"E_{i}={latex(mag_eqn)},"
+    def _equations_changed(self, count: int,
+                           changes: Dict[int, Optional[PrintedEquations]]) -> None:
+        """
+        Apply the equations that changed, then update the labels.
 
-        x_html = "E_x(x,y)="
-        for i, x_eqn in enumerate(x_eqns):
-            if len(x_eqns) > 1:
-                x_html += f"\\left({latex(x_eqn)}\\right)+"
-            else:
-                x_html += f"{latex(x_eqn)}+"
+        Args:
+            count (int): The number of charges.
+            changes (Dict[int, Optional[PrintedEquations]]): The printed equations of each charge
+                whose equations changed, or None while they are being built.
+        """
 
-        y_html = "E_y(x,y)="
-        for i, y_eqn in enumerate(y_eqns):
-            if len(y_eqns) > 1:
-                y_html += f"\\left({latex(y_eqn)}\\right)+"
-            else:
-                y_html += f"{latex(y_eqn)}+"
+        del self._printed_equations[count:]
+        self._printed_equations.extend([None] * (count - len(self._printed_equations)))
 
-        self.net_mag_equation_label.setHtml(make_source(mag_html[:-1]) if mag_eqns else "")
-        self.x_equation_label.setHtml(make_source(x_html[:-1]) if x_eqns else "")
-        self.y_equation_label.setHtml(make_source(y_html[:-1]) if y_eqns else "")
+        for index, printed in changes.items():
+            self._printed_equations[index] = printed
 
-    def _clear_equations(self) -> None:
+        self._update_equations()
+
+    def _update_equations(self) -> None:
         """
-        When the equations thread is running, clear the current equations.
+        Update the labels from the printed equations of each charge.
         """
 
-        loading_html = "<center>Loading...</center>"
+        equations = self._printed_equations
+
+        if equations and all(printed is None for printed in equations):
+            self._clear_equations()
+            return
+
+        self.net_mag_equation_label.show_equations("mag", equations)
+        self.x_equation_label.show_equations("x", equations)
+        self.y_equation_label.show_equations("y", equations)
 
-        self.net_mag_equation_label.setHtml(loading_html)
-        self.x_equation_label.setHtml(loading_html)
-        self.y_equation_label.setHtml(loading_html)
+    def _clear_equations(self) -> None:
+        """
+        While no equations are ready, show that they are loading.
+        """
+
+        self.net_mag_equation_label.show_loading()
+        self.x_equation_label.show_loading()
+        self.y_equation_label.show_loading()
 
     def _increment_equations_digits(self):
         """
@@ -270,8 +339,7 @@ class MainWindow(QtWidgets.QMainWindow):
         """
 
         self.equations_thread.change_rounding(1)
-        self.equations_thread.update_rounding()
-        self._update_equations()
+        self._request_equations()
 
     def _decrement_equations_digits(self):
         """
@@ -279,5 +347,4 @@ class MainWindow(QtWidgets.QMainWindow):
         """
 
         self.equations_thread.change_rounding(-1)
-        self.equations_thread.update_rounding()
-        self._update_equations()
+        self._request_equations()
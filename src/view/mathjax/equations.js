@@ -0,0 +1,146 @@
+/*
+ * A persistent page of equations, updated in place from MathJaxEquationView.
+ *
+ * The page is loaded once. Each update only names the entries that changed, so only those are
+ * typeset again, and entries are only typeset once they scroll into view.
+ */
+
+"use strict";
+
+window.MathJax = {
+  startup: {
+    // Nothing on the page is typeset by scanning it, only entry by entry.
+    typeset: false,
+    ready: () => {
+      MathJax.startup.defaultReady();
+      MathJax.startup.promise.then(() => {
+        mathJaxReady = true;
+        entries.forEach(scheduleTypeset);
+      });
+    },
+  },
+};
+
+// Whether MathJax has started. Until it has (or if it never does), entries show their TeX.
+let mathJaxReady = false;
+
+// Every entry element, by key, each with its TeX in `tex`, whether that TeX is yet to be typeset in
+// `dirty`, and whether it is scrolled into view in `visible`.
+const entries = new Map();
+
+// Typesetting is asynchronous, so it is done one entry at a time, in order.
+let typesetQueue = Promise.resolve();
+
+const observer = new IntersectionObserver((records) => {
+  for (const record of records) {
+    record.target.visible = record.isIntersecting;
+    scheduleTypeset(record.target);
+  }
+}, {rootMargin: "100px"});
+
+/**
+ * Typeset an entry later, if its TeX changed, it is visible and MathJax is ready.
+ *
+ * @param {HTMLElement} element The entry.
+ */
+function scheduleTypeset(element) {
+  if (!mathJaxReady || !element.dirty || !element.visible || element.queued) {
+    return;
+  }
+
+  element.queued = true;
+  typesetQueue = typesetQueue.then(() => typeset(element)).catch((error) => console.error(error));
+}
+
+/**
+ * Typeset an entry's current TeX, replacing its contents.
+ *
+ * @param {HTMLElement} element The entry.
+ * @returns {Promise} Resolved once the entry is typeset.
+ */
+function typeset(element) {
+  element.queued = false;
+  if (!element.dirty || !element.isConnected) {
+    return Promise.resolve();
+  }
+
+  const tex = element.tex;
+  element.dirty = false;
+
+  return MathJax.tex2chtmlPromise(tex, {display: true}).then((node) => {
+    // The TeX may have changed again while typesetting, in which case it is typeset again.
+    if (element.tex !== tex) {
+      return;
+    }
+
+    element.replaceChildren(node);
+    element.classList.remove("pending");
+
+    // Add the styles of any characters new to the page.
+    MathJax.startup.document.clear();
+    MathJax.startup.document.updateDocument();
+  });
+}
+
+/**
+ * Change the TeX of an entry, typesetting it once it is visible.
+ *
+ * Until then, a new entry shows its TeX, and an existing entry keeps showing its old equation.
+ *
+ * @param {HTMLElement} element The entry.
+ * @param {string} tex The new TeX.
+ */
+function setTex(element, tex) {
+  element.tex = tex;
+  element.dirty = true;
+
+  if (!mathJaxReady || element.classList.contains("pending")) {
+    element.textContent = tex;
+  }
+
+  scheduleTypeset(element);
+}
+
+/**
+ * Update the page to show some entries, in order.
+ *
+ * Entries not named in `keys` are removed, and entries not named in `changed` are left as they
+ * are, so that an unchanged equation is never typeset again.
+ *
+ * @param {string[]} keys The key of every entry, in order.
+ * @param {Object<string, string>} changed The TeX of every entry that is new or has changed.
+ * @param {string} message A message shown above the entries, or an empty string for none.
+ */
+function update(keys, changed, message) {
+  document.getElementById("message").textContent = message;
+
+  const keep = new Set(keys);
+  for (const [key, element] of entries) {
+    if (!keep.has(key)) {
+      observer.unobserve(element);
+      element.remove();
+      entries.delete(key);
+    }
+  }
+
+  const container = document.getElementById("entries");
+  keys.forEach((key, index) => {
+    let element = entries.get(key);
+    if (element === undefined) {
+      element = document.createElement("span");
+      element.className = "entry pending";
+      entries.set(key, element);
+    }
+
+    if (container.children[index] !== element) {
+      container.insertBefore(element, container.children[index] || null);
+    }
+
+    if (Object.prototype.hasOwnProperty.call(changed, key)) {
+      setTex(element, changed[key]);
+    }
+
+    // Observing an element that is already observed does nothing.
+    observer.observe(element);
+  });
+}
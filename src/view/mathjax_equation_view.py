@@ -0,0 +1,167 @@
+"""
+A web view typesetting equations with MathJax, updated in place.
+"""
+
+import json
+import os
+import sys
+from typing import Dict, List, Optional, Tuple
+
+import sympy
+from PyQt6 import QtCore, QtWebEngineWidgets, QtWidgets
+
+# pylint: disable=import-error
+from equations.printed_equations import PrintedEquations
+
+# pylint: enable=import-error
+
+
+class MathJaxEquationView(QtWebEngineWidgets.QWebEngineView):
+    """
+    A web view showing a list of LaTeX entries, each typeset with MathJax (see ``EquationView``).
+
+    The page (``view/mathjax/equations.html``) is loaded once, along with a copy of MathJax bundled
+    next to it, rather than reloaded for every change. Each update only sends the entries that
+    changed since the last one, by key, so only those are typeset again, and the page only typesets
+    entries once they are scrolled into view.
+    """
+
+    PAGE_PATH = "view/mathjax/equations.html"
+    """
+    The path of the page, relative to the source directory.
+    """
+
+    PENDING_LATEX = "\\ldots"
+    """
+    The LaTeX shown in place of equations that are still being built.
+    """
+
+    printer = staticmethod(sympy.latex)
+    """
+    Prints equations as LaTeX.
+    """
+
+    def __init__(self, parent: Optional[QtWidgets.QWidget] = None) -> None:
+        """
+        Initialize the view, and start loading the page.
+
+        Args:
+            parent (Optional[QWidget]): The parent widget that this widget is a child widget of.
+                Defaults to None.
+        """
+
+        super().__init__(parent)
+
+        # The entries and message to show, and the ones the page shows, or None until it has
+        # loaded.
+        self._entries: Dict[str, str] = {}
+        self._message = ""
+        self._shown_entries: Optional[Dict[str, str]] = None
+        self._shown_message = ""
+
+        self.loadFinished.connect(self._load_finished)
+        self.load(QtCore.QUrl.fromLocalFile(os.path.join(sys.path[0], self.PAGE_PATH)))
+
+    def show_equations(self, component: str,
+                       equations: List[Optional[PrintedEquations]]) -> None:
+        """
+        Show one component of the LaTeX of every charge's equations.
+
+        Each charge's part is a separate entry, keyed by the charge's index, so only the charges
+        whose equations changed are typeset again. Charges whose equations are still being built
+        are marked with an ellipsis, and charges whose equations ran out of time while simplifying
+        are marked with an asterisk.
+
+        Args:
+            component (str): The component shown, one of ``COMPONENTS``.
+            equations (List[Optional[PrintedEquations]]): The LaTeX of each charge's equations, or
+                None while they are being built.
+        """
+
+        if not equations:
+            self.set_entries([])
+            return
+
+        entries = []
+
+        if component == "mag":
+            for i, printed in enumerate(equations):
+                name = f"E_{i}" if printed is None or printed.complete else f"E_{i}^*"
+                mag = printed.mag if printed is not None else self.PENDING_LATEX
+                entries.append((str(i), f"{name}={mag}"))
+
+            if not all(printed is None or printed.complete for printed in equations):
+                entries.append(("incomplete", "\\text{*not fully simplified in time}"))
+        else:
+            entries.append(("name", f"E_{component}(x,y)="))
+
+            for i, printed in enumerate(equations):
+                if printed is None:
+                    latex = self.PENDING_LATEX
+                elif len(equations) > 1:
+                    latex = f"\\left({getattr(printed, component)}\\right)"
+                else:
+                    latex = getattr(printed, component)
+
+                entries.append((str(i), f"+{latex}" if i > 0 else latex))
+
+        self.set_entries(entries)
+
+    def show_loading(self) -> None:
+        """
+        Show that no equations are ready yet.
+        """
+
+        self.set_entries([], "Loading...")
+
+    def set_entries(self, entries: List[Tuple[str, str]], message: str = "") -> None:
+        """
+        Show some LaTeX entries, in order, typesetting only the ones that changed.
+
+        Args:
+            entries (List[Tuple[str, str]]): The key and LaTeX of each entry. An entry whose key
+                and LaTeX are both unchanged is left as it is.
+            message (str): A message shown above the entries, or an empty string for none. Defaults
+                to an empty string.
+        """
+
+        self._entries = dict(entries)
+        self._message = message
+
+        self._send()
+
+    def _send(self) -> None:
+        """
+        Send the page every entry that changed since the last update, if it has loaded.
+        """
+
+        if self._shown_entries is None:
+            return
+
+        changed = {
+            key: latex
+            for key, latex in self._entries.items()
+            if self._shown_entries.get(key) != latex
+        }
+        if (not changed and list(self._entries) == list(self._shown_entries)
+                and self._message == self._shown_message):
+            return
+
+        self.page().runJavaScript(f"update({json.dumps(list(self._entries))}, "
+                                  f"{json.dumps(changed)}, {json.dumps(self._message)});")
+
+        self._shown_entries = dict(self._entries)
+        self._shown_message = self._message
+
+    def _load_finished(self, ok: bool) -> None:
+        """
+        Once the page has (re)loaded, send it every entry.
+
+        Args:
+            ok (bool): Whether the page loaded.
+        """
+
+        self._shown_entries = {} if ok else None
+        self._shown_message = ""
+
+        self._send()
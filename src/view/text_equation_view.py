@@ -0,0 +1,135 @@
+"""
+A text browser showing equations as Unicode text.
+"""
+
+import functools
+from typing import List, Optional
+
+import sympy
+from PyQt6 import QtGui, QtWidgets
+
+# pylint: disable=import-error
+from equations.printed_equations import PrintedEquations
+
+# pylint: enable=import-error
+
+
+class TextEquationView(QtWidgets.QTextBrowser):
+    """
+    A text browser showing equations printed by sympy's pretty printer (see ``EquationView``).
+
+    Unlike ``MathJaxEquationView``, this needs no web engine, so it starts quickly and uses little
+    memory, at the cost of plainer equations.
+    """
+
+    INDENT = " " * 4
+    """
+    The indent of each equation below its name.
+    """
+
+    PENDING_TEXT = "…"
+    """
+    The text shown in place of equations that are still being built.
+    """
+
+    printer = staticmethod(functools.partial(sympy.pretty, use_unicode=True, wrap_line=False))
+    """
+    Prints equations as Unicode text, possibly spanning several lines, never wrapped.
+    """
+
+    def __init__(self, parent: Optional[QtWidgets.QWidget] = None) -> None:
+        """
+        Initialize the view.
+
+        Args:
+            parent (Optional[QWidget]): The parent widget that this widget is a child widget of.
+                Defaults to None.
+        """
+
+        super().__init__(parent)
+
+        # Pretty printed equations are drawn with characters, so they only line up when monospaced.
+        self.setFont(QtGui.QFontDatabase.systemFont(QtGui.QFontDatabase.SystemFont.FixedFont))
+        self.setLineWrapMode(QtWidgets.QTextEdit.LineWrapMode.NoWrap)
+
+    def show_equations(self, component: str,
+                       equations: List[Optional[PrintedEquations]]) -> None:
+        """
+        Show one component of the printed equations of every charge.
+
+        Each equation is shown below its name, since a printed equation may span several lines.
+        Charges whose equations are still being built are marked with an ellipsis, and charges
+        whose equations ran out of time while simplifying are marked with an asterisk.
+
+        Args:
+            component (str): The component shown, one of ``COMPONENTS``.
+            equations (List[Optional[PrintedEquations]]): The printed equations of each charge, or
+                None while they are being built.
+        """
+
+        lines = []
+
+        if component == "mag":
+            for i, printed in enumerate(equations):
+                name = sympy.pretty(sympy.Symbol(f"E_{i}"), use_unicode=True)
+                if printed is not None and not printed.complete:
+                    name += "*"
+
+                lines.append(f"{name} =")
+                lines.extend(self._indent(printed.mag if printed is not None else None))
+
+            if not all(printed is None or printed.complete for printed in equations):
+                lines.append("*not fully simplified in time")
+        elif equations:
+            x, y = sympy.symbols("x y")
+            lines.append(
+                f"{sympy.pretty(sympy.Function(f'E_{component}')(x, y), use_unicode=True)} =")
+
+            for i, printed in enumerate(equations):
+                if i > 0:
+                    lines.append("  +")
+                lines.extend(self._indent(getattr(printed, component)
+                                          if printed is not None else None))
+
+        self._set_text("\n".join(lines))
+
+    def show_loading(self) -> None:
+        """
+        Show that no equations are ready yet.
+        """
+
+        self._set_text("Loading...")
+
+    def _indent(self, printed: Optional[str]) -> List[str]:
+        """
+        Indent every line of a printed equation.
+
+        Args:
+            printed (Optional[str]): The printed equation, or None while it is being built.
+
+        Returns:
+            List[str]: The indented lines.
+        """
+
+        if printed is None:
+            printed = self.PENDING_TEXT
+
+        return [self.INDENT + line for line in printed.splitlines()]
+
+    def _set_text(self, text: str) -> None:
+        """
+        Show some text, unless it is already shown, keeping the scroll position.
+
+        Args:
+            text (str): The text.
+        """
+
+        if text == self.toPlainText():
+            return
+
+        horizontal, vertical = self.horizontalScrollBar().value(), self.verticalScrollBar().value()
+
+        self.setPlainText(text)
+
+        self.horizontalScrollBar().setValue(horizontal)
+        self.verticalScrollBar().setValue(vertical)
@@ -0,0 +1,244 @@
+"""
+A graphics item drawing an entire field of arrows at once.
+"""
+
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pyqtgraph
+from PyQt6 import QtCore, QtGui, QtWidgets
+
+
+class VectorFieldItem(pyqtgraph.GraphicsObject):
+    """
+    A batch of arrows, drawn in a single paint call.
+
+    Each arrow is positioned by its tail and sized in pixels, so arrows keep their size as the view
+    is zoomed. The arrows are grouped by color into a handful of ``QPainterPath`` objects, which are
+    cached until either the data or the view transform changes.
+    """
+
+    HEAD_LENGTH = 20.0
+    """
+    The length of each arrow head, in pixels.
+    """
+
+    TIP_ANGLE = 25.0
+    """
+    The angle of each arrow tip, in degrees.
+    """
+
+    TAIL_WIDTH = 3.0
+    """
+    The width of each arrow tail, in pixels.
+    """
+
+    def __init__(self, parent: Optional[QtWidgets.QGraphicsItem] = None) -> None:
+        super().__init__(parent)
+
+        self._x_pos = np.empty(0)
+        self._y_pos = np.empty(0)
+        self._angles = np.empty(0)
+        self._lengths = np.empty(0)
+        self._colors = np.empty((0, 4), dtype=np.ubyte)
+
+        self._pen = pyqtgraph.mkPen((200, 200, 200))
+
+        self._bounds: Optional[QtCore.QRectF] = None
+        self._paths: List[Tuple[QtGui.QBrush, QtGui.QPainterPath]] = []
+        self._paths_transform: Optional[Tuple[float, ...]] = None
+
+    def set_data(self, x_pos: np.ndarray, y_pos: np.ndarray, angles: np.ndarray,
+                 lengths: np.ndarray, colors: np.ndarray) -> None:
+        """
+        Replace the arrows drawn by this item.
+
+        Args:
+            x_pos (ndarray): x positions of the arrow tails, in data coordinates.
+            y_pos (ndarray): y positions of the arrow tails, in data coordinates.
+            angles (ndarray): The direction each arrow points, in radians counterclockwise from the
+                +x axis.
+            lengths (ndarray): The length of each arrow's tail, in pixels. The head is drawn in
+                addition to this length.
+            colors (ndarray): An (N, 3) or (N, 4) array of RGB(A) colors, one per arrow.
+        """
+
+        colors = np.asarray(colors, dtype=np.ubyte).reshape(-1, np.shape(colors)[-1])
+        if colors.shape[1] == 3:
+            colors = np.hstack((colors, np.full((colors.shape[0], 1), 255, dtype=np.ubyte)))
+
+        self.prepareGeometryChange()
+
+        self._x_pos = np.asarray(x_pos, dtype=float).ravel()
+        self._y_pos = np.asarray(y_pos, dtype=float).ravel()
+        self._angles = np.asarray(angles, dtype=float).ravel()
+        self._lengths = np.asarray(lengths, dtype=float).ravel()
+        self._colors = colors
+
+        self._bounds = None
+        self._paths_transform = None
+
+        self.informViewBoundsChanged()
+        self.update()
+
+    def clear(self) -> None:
+        """
+        Remove all arrows from this item.
+        """
+
+        empty = np.empty(0)
+        self.set_data(empty, empty, empty, empty, np.empty((0, 4), dtype=np.ubyte))
+
+    def dataBounds(self,  # pylint: disable=invalid-name
+                   ax: int,
+                   frac: float = 1.0,
+                   orthoRange: Optional[Tuple[float, float]] = None) -> Tuple[float, float]:
+        """
+        The range of the arrows along an axis, used by the ``ViewBox`` when autoscaling.
+
+        Arrows are laid out to fill the view, so letting them widen the view when autoscaling would
+        only lay out more arrows, widening the view again. They never contribute to autoscaling.
+
+        Args:
+            ax (int): Unused, 0 for the x axis and 1 for the y axis.
+            frac (float): Unused.
+            orthoRange (Optional[Tuple[float, float]]): Unused.
+
+        Returns:
+            Tuple[float, float]: NaN, excluding the arrows from autoscaling.
+        """
+
+        del ax, frac, orthoRange
+
+        return (np.nan, np.nan)
+
+    def pixelPadding(self) -> float:  # pylint: disable=invalid-name
+        """
+        The number of pixels arrows may extend past their tail positions.
+
+        Returns:
+            float: The length of the longest arrow, in pixels.
+        """
+
+        if self._lengths.size == 0:
+            return 0.0
+
+        return float(self._lengths.max()) + VectorFieldItem.HEAD_LENGTH
+
+    def viewTransformChanged(self) -> None:  # pylint: disable=invalid-name
+        """
+        Arrows are sized in pixels, so the bounding rectangle changes with the view.
+        """
+
+        self.prepareGeometryChange()
+        self._bounds = None
+
+    def boundingRect(self) -> QtCore.QRectF:  # pylint: disable=invalid-name
+        """
+        The bounding rectangle of all arrows, in data coordinates.
+
+        Returns:
+            QRectF: The rectangle bounding every arrow.
+        """
+
+        if self._x_pos.size == 0:
+            return QtCore.QRectF()
+
+        if self._bounds is None:
+            padding = self.pixelPadding()
+            pixel_width = self.pixelWidth() * padding if self.pixelWidth() else 0.0
+            pixel_height = self.pixelHeight() * padding if self.pixelHeight() else 0.0
+
+            left, right = self._x_pos.min() - pixel_width, self._x_pos.max() + pixel_width
+            bottom, top = self._y_pos.min() - pixel_height, self._y_pos.max() + pixel_height
+
+            self._bounds = QtCore.QRectF(left, bottom, right - left, top - bottom)
+
+        return self._bounds
+
+    def paint(self, p: QtGui.QPainter, *args) -> None:
+        """
+        Paint every arrow, rebuilding the cached paths if the view transform changed.
+
+        Args:
+            p (QPainter): The painter to paint with.
+        """
+
+        del args
+
+        if self._x_pos.size == 0:
+            return
+
+        transform = p.transform()
+        transform_key = (transform.m11(), transform.m12(), transform.m21(), transform.m22(),
+                         transform.dx(), transform.dy())
+        if transform_key != self._paths_transform:
+            self._paths = self._build_paths(transform)
+            self._paths_transform = transform_key
+
+        # The paths are already in device coordinates.
+        p.save()
+        p.resetTransform()
+        p.setRenderHint(QtGui.QPainter.RenderHint.Antialiasing)
+        p.setPen(self._pen)
+
+        for brush, path in self._paths:
+            p.setBrush(brush)
+            p.drawPath(path)
+
+        p.restore()
+
+    def _build_paths(self,
+                     transform: QtGui.QTransform) -> List[Tuple[QtGui.QBrush, QtGui.QPainterPath]]:
+        """
+        Build one path per arrow color, in device coordinates.
+
+        Args:
+            transform (QTransform): The transform from data coordinates to device coordinates.
+
+        Returns:
+            List[Tuple[QBrush, QPainterPath]]: Each color's brush and the path of all arrows with
+            that color.
+        """
+
+        # Tail positions in device coordinates
+        dev_x = transform.m11() * self._x_pos + transform.m21() * self._y_pos + transform.dx()
+        dev_y = transform.m12() * self._x_pos + transform.m22() * self._y_pos + transform.dy()
+
+        # Arrow directions keep their angle on screen, flipped to match the axes' orientation.
+        dir_x = np.cos(self._angles) * (1.0 if transform.m11() >= 0 else -1.0)
+        dir_y = np.sin(self._angles) * (1.0 if transform.m22() >= 0 else -1.0)
+
+        head_length = VectorFieldItem.HEAD_LENGTH
+        head_width = head_length * np.tan(np.deg2rad(VectorFieldItem.TIP_ANGLE) / 2)
+        half_tail = VectorFieldItem.TAIL_WIDTH / 2
+        total = self._lengths + head_length
+
+        # Each arrow is a closed 8 vertex polygon, given as (along, across) offsets from the tail.
+        head_base, tail_end = total - head_length, np.zeros_like(total)
+        along = np.stack(
+            [total, head_base, head_base, tail_end, tail_end, head_base, head_base, total], axis=1)
+        across = np.array([0.0, head_width, half_tail, half_tail, -half_tail, -half_tail,
+                           -head_width, 0.0])
+
+        vertices_x = dev_x[:, None] + along * dir_x[:, None] - across * dir_y[:, None]
+        vertices_y = dev_y[:, None] + along * dir_y[:, None] + across * dir_x[:, None]
+
+        # Connect every vertex to the next, except the last vertex of each arrow
+        connect = np.ones(vertices_x.shape, dtype=np.ubyte)
+        connect[:, -1] = 0
+
+        colors, color_indices = np.unique(self._colors, axis=0, return_inverse=True)
+        color_indices = color_indices.ravel()
+
+        paths = []
+        for color_index, color in enumerate(colors):
+            mask = color_indices == color_index
+            path = pyqtgraph.arrayToQPath(vertices_x[mask].ravel(),
+                                          vertices_y[mask].ravel(),
+                                          connect=connect[mask].ravel())
+            # Overlapping arrows of the same color must not cancel each other out.
+            path.setFillRule(QtCore.Qt.FillRule.WindingFill)
+            paths.append((QtGui.QBrush(QtGui.QColor(*color.tolist())), path))
+
+        return paths